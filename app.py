@@ -2,21 +2,21 @@ from flask import Flask, jsonify, request, render_template
 from flask_cors import CORS
 import os
 import asyncio
-from hypercorn.config import Config
-from hypercorn.asyncio import serve
-from functools import wraps
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
 import pyodbc
 from dotenv import load_dotenv
 import json
-from datetime import datetime
-import subprocess
 import sys
 import openai
-from typing import Optional, Dict, Any
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.utils import PlotlyJSONEncoder
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+from chart_prep import chart_figure
+from frame_fetch import fetch_frame
+from nl_to_sql import NaturalLanguageToSQL
+from result_store import ResultStore
+from schema_snapshot import SchemaSnapshot
 
 # Load environment variables
 load_dotenv()
@@ -33,48 +33,46 @@ config = {
     "openai_api_key": os.getenv("OPENAI_API_KEY")
 }
 
-# Initialize OpenAI client
-client = openai.OpenAI(api_key=config["openai_api_key"])
+# One event loop for the whole process, running on a background thread.
+# Chat requests run their pipelines on it, so the async OpenAI client and
+# its keep-alive connections are shared by every request.
+loop = asyncio.new_event_loop()
+threading.Thread(target=loop.run_forever, name="chat-loop", daemon=True).start()
+
+# Initialize OpenAI client; it is only used from the shared loop
+client = openai.AsyncOpenAI(api_key=config["openai_api_key"])
+
+# pyodbc calls block, so they run on a bounded pool of worker threads while
+# the loop keeps serving other chats
+db_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("MSSQL_MAX_CONCURRENCY", "16")),
+    thread_name_prefix="db"
+)
+
+async def run_db(fn, *args):
+    """Run a blocking database (or CPU-heavy formatting) call on the worker pool."""
+    return await asyncio.get_running_loop().run_in_executor(db_executor, partial(fn, *args))
 
 def get_connection_string(config):
     """Create a connection string for pyodbc."""
     return f"DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={config['server']};DATABASE={config['database']};UID={config['user']};PWD={config['password']}"
 
-def get_table_names():
-    """Get all table names from the database."""
-    try:
-        conn = pyodbc.connect(get_connection_string(config))
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT TABLE_NAME 
-            FROM INFORMATION_SCHEMA.TABLES 
-            WHERE TABLE_TYPE = 'BASE TABLE'
-        """)
-        tables = [row[0] for row in cursor.fetchall()]
-        cursor.close()
-        conn.close()
-        return tables
-    except Exception as e:
-        print(f"Error getting table names: {e}")
-        return []
+# Tables and columns, loaded with one query and refreshed when the schema changes
+schema = SchemaSnapshot(
+    lambda: pyodbc.connect(get_connection_string(config)),
+    ttl=float(os.getenv("MSSQL_SCHEMA_TTL", "300")),
+    check_interval=float(os.getenv("MSSQL_SCHEMA_CHECK_INTERVAL", "10"))
+)
+SCHEMA_TOP_K = int(os.getenv("MSSQL_SCHEMA_TOP_K", "8"))
 
-def get_table_columns(table_name):
-    """Get all column names for a specific table."""
-    try:
-        conn = pyodbc.connect(get_connection_string(config))
-        cursor = conn.cursor()
-        cursor.execute(f"""
-            SELECT COLUMN_NAME, DATA_TYPE
-            FROM INFORMATION_SCHEMA.COLUMNS 
-            WHERE TABLE_NAME = '{table_name}'
-        """)
-        columns = [(row[0], row[1]) for row in cursor.fetchall()]
-        cursor.close()
-        conn.close()
-        return columns
-    except Exception as e:
-        print(f"Error getting columns for table {table_name}: {e}")
-        return []
+# Simple count/list/distinct questions are answered by rules without calling the model
+rules = NaturalLanguageToSQL(
+    min_confidence=float(os.getenv("MSSQL_RULES_MIN_CONFIDENCE", "0.85")),
+    max_rows=int(os.getenv("MSSQL_RULES_MAX_ROWS", "1000"))
+)
+
+# Rows fetched per fetchmany call while filling a result's column arrays
+RESULT_FETCH_BATCH_SIZE = int(os.getenv("RESULT_FETCH_BATCH_SIZE", "5000"))
 
 def execute_sql_query(query):
     """Execute a SQL query and return the results."""
@@ -103,27 +101,14 @@ def execute_sql_query(query):
                     'type': str(column[1])
                 })
             
-            # Fetch all rows and convert to list of dictionaries
-            rows = []
-            for row in cursor.fetchall():
-                row_dict = {}
-                for i, value in enumerate(row):
-                    # Convert datetime objects to strings
-                    if hasattr(value, 'strftime'):
-                        value = value.strftime('%Y-%m-%d %H:%M:%S')
-                    # Convert Decimal objects to float
-                    elif hasattr(value, 'as_integer_ratio'):  # This checks for Decimal type
-                        value = float(value)
-                    # Convert None to 'NULL' string
-                    elif value is None:
-                        value = 'NULL'
-                    row_dict[columns[i]['name']] = value
-                rows.append(row_dict)
+            # Rows are read in batches straight into typed column arrays, so
+            # the DataFrame is the only full copy of the result in memory
+            frame = fetch_frame(cursor, RESULT_FETCH_BATCH_SIZE)
             
             return {
                 'columns': columns,
-                'rows': rows,
-                'row_count': len(rows)
+                'frame': frame,
+                'row_count': len(frame)
             }
         except pyodbc.Error as e:
             raise ValueError(f"Database error: {str(e)}")
@@ -151,13 +136,9 @@ async def get_openai_response(message: str, include_schema: bool = False) -> str
         # If we need to include schema information
         schema_info = ""
         if include_schema:
-            tables = get_table_names()
-            schema_info = "Available data includes:\n"
-            for table in tables:
-                columns = get_table_columns(table)
-                schema_info += f"\n{table}:\n"
-                for col_name, col_type in columns:
-                    schema_info += f"- {col_name} ({col_type})\n"
+            # Only the tables relevant to the question, one compact line each
+            schema_index = await run_db(schema.index)
+            schema_info = "Available data includes:\n" + schema_index.context(message, SCHEMA_TOP_K)
 
         system_message = """You are a business intelligence assistant that helps users understand their data through natural conversation. 
         Your role is to:
@@ -199,7 +180,7 @@ async def get_openai_response(message: str, include_schema: bool = False) -> str
             {"role": "user", "content": f"{schema_info}\n\n{message}"}
         ]
 
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model="gpt-3.5-turbo",
             messages=messages,
             max_tokens=1000,
@@ -230,9 +211,14 @@ def extract_sql_query(response: str) -> str:
         return None
 
 def async_route(f):
+    """Run an async view on the shared loop; the request thread waits for its result.
+
+    The task is scheduled from the request thread, so it runs in a copy of
+    that thread's context and sees Flask's request and app contexts.
+    """
     @wraps(f)
     def wrapper(*args, **kwargs):
-        return asyncio.run(f(*args, **kwargs))
+        return asyncio.run_coroutine_threadsafe(f(*args, **kwargs), loop).result()
     return wrapper
 
 @app.route('/')
@@ -240,74 +226,57 @@ def index():
     """Serve the main page."""
     return render_template('index.html')
 
+# Title, x-axis and y-axis titles per chart type
+CHART_LAYOUTS = {
+    "bar": ("Business Performance: {y} by {x}", "Category", "Value"),
+    "line": ("Business Trend: {y} over {x}", "Time Period", "Value"),
+    "pie": ("Business Distribution: {y} by {x}", None, None),
+}
+CHART_MAX_POINTS = int(os.getenv("CHART_MAX_POINTS", "1000"))
+CHART_TOP_N = int(os.getenv("CHART_TOP_N", "20"))
+
+# Table results are kept server-side and sent a page at a time
+RESULT_PAGE_SIZE = int(os.getenv("RESULT_PAGE_SIZE", "100"))
+result_store = ResultStore(
+    ttl=float(os.getenv("RESULT_TTL", "600")),
+    max_results=int(os.getenv("RESULT_CACHE_MAX_RESULTS", "32")),
+    max_bytes=int(os.getenv("RESULT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+)
+
 def format_query_response(query_result, query_type="table", explanation=""):
     """Format the query result in a business-friendly way."""
     try:
-        # Convert to pandas DataFrame for easier manipulation
-        df = pd.DataFrame(query_result['rows'])
+        df = query_result['frame']
         
         if query_type == "table":
-            # Create an HTML table with business-friendly styling
-            table_html = df.to_html(
-                classes='table table-striped table-bordered table-hover',
-                index=False,
-                border=1
-            )
+            # Only the first page is sent; the page fetches later pages (and
+            # sorted views) from /api/results/<result_id>
+            result_id = result_store.put(df)
+            page = result_store.page(result_id, 0, RESULT_PAGE_SIZE)
             return {
                 "type": "table",
-                "content": table_html,
-                "row_count": len(df),
+                **page,
+                "page_size": RESULT_PAGE_SIZE,
                 "explanation": explanation
             }
-        elif query_type == "bar":
-            # Create a business-focused bar chart
-            fig = px.bar(df, x=df.columns[0], y=df.columns[1],
-                        title=f"Business Performance: {df.columns[1]} by {df.columns[0]}",
-                        labels={df.columns[0]: df.columns[0], df.columns[1]: df.columns[1]})
-            fig.update_layout(
-                plot_bgcolor='white',
-                paper_bgcolor='white',
-                font=dict(size=12),
-                xaxis_title="Category",
-                yaxis_title="Value"
-            )
-            return {
-                "type": "chart",
-                "content": json.dumps(fig, cls=PlotlyJSONEncoder),
-                "chart_type": "bar",
-                "explanation": explanation
-            }
-        elif query_type == "line":
-            # Create a business trend line chart
-            fig = px.line(df, x=df.columns[0], y=df.columns[1],
-                         title=f"Business Trend: {df.columns[1]} over {df.columns[0]}",
-                         labels={df.columns[0]: df.columns[0], df.columns[1]: df.columns[1]})
-            fig.update_layout(
-                plot_bgcolor='white',
-                paper_bgcolor='white',
-                font=dict(size=12),
-                xaxis_title="Time Period",
-                yaxis_title="Value"
-            )
-            return {
-                "type": "chart",
-                "content": json.dumps(fig, cls=PlotlyJSONEncoder),
-                "chart_type": "line",
-                "explanation": explanation
+        elif query_type in CHART_LAYOUTS:
+            # Downsampled points or top-N categories as typed arrays, so the
+            # figure stays under a fixed size however many rows there are
+            title, xaxis_title, yaxis_title = CHART_LAYOUTS[query_type]
+            layout = {
+                "title": {"text": title.format(x=df.columns[0], y=df.columns[1])},
+                "plot_bgcolor": "white",
+                "paper_bgcolor": "white",
+                "font": {"size": 12}
             }
-        elif query_type == "pie":
-            # Create a business distribution pie chart
-            fig = px.pie(df, values=df.columns[1], names=df.columns[0],
-                        title=f"Business Distribution: {df.columns[1]} by {df.columns[0]}")
-            fig.update_layout(
-                plot_bgcolor='white',
-                paper_bgcolor='white',
-                font=dict(size=12)
-            )
+            if xaxis_title:
+                layout["xaxis"] = {"title": {"text": xaxis_title}}
+                layout["yaxis"] = {"title": {"text": yaxis_title}}
+            fig = chart_figure(df, query_type, layout, max_points=CHART_MAX_POINTS, top_n=CHART_TOP_N)
             return {
                 "type": "chart",
-                "content": json.dumps(fig, cls=PlotlyJSONEncoder),
-                "chart_type": "pie",
+                "content": json.dumps(fig, separators=(",", ":")),
+                "chart_type": query_type,
                 "explanation": explanation
             }
         else:
@@ -345,6 +314,28 @@ def determine_visualization_type(query, result):
     # Default to table
     return "table"
 
+@app.route('/api/results/<result_id>')
+def get_result_page(result_id):
+    """A page of a stored table result: ?offset=&limit=&sort=<column>&order=asc|desc."""
+    try:
+        offset = max(int(request.args.get('offset', 0)), 0)
+        limit = min(max(int(request.args.get('limit', RESULT_PAGE_SIZE)), 1), 1000)
+    except ValueError:
+        return jsonify({"type": "error", "content": "offset and limit must be integers"}), 400
+    try:
+        page = result_store.page(
+            result_id,
+            offset,
+            limit,
+            sort=request.args.get('sort') or None,
+            descending=request.args.get('order') == 'desc'
+        )
+    except KeyError as e:
+        return jsonify({"type": "error", "content": f"Unknown column: {e.args[0]}"}), 400
+    if page is None:
+        return jsonify({"type": "error", "content": "This result has expired; please run the query again"}), 404
+    return jsonify(page)
+
 @app.route('/api/chat', methods=['POST'])
 @async_route
 async def chat():
@@ -362,9 +353,9 @@ async def chat():
         # If it's a direct SQL query, execute it
         if is_sql_query(message):
             try:
-                result = execute_sql_query(message)
+                result = await run_db(execute_sql_query, message)
                 viz_type = determine_visualization_type(message, result)
-                formatted_result = format_query_response(result, viz_type)
+                formatted_result = await run_db(format_query_response, result, viz_type)
                 return jsonify(formatted_result)
             except Exception as e:
                 error_msg = str(e)
@@ -377,6 +368,13 @@ async def chat():
 
         # For natural language queries
         try:
+            rules.load_schema(await run_db(schema.table_info))
+            rule_sql = rules.confident_sql(message)
+            if rule_sql:
+                result = await run_db(execute_sql_query, rule_sql)
+                viz_type = determine_visualization_type(rule_sql, result)
+                return jsonify(await run_db(format_query_response, result, viz_type))
+            
             # Get response from OpenAI with schema information for transaction queries
             ai_response = await get_openai_response(message, include_schema=is_transaction_query(message))
             
@@ -386,9 +384,9 @@ async def chat():
             if sql_query:
                 try:
                     # Execute the extracted SQL query
-                    result = execute_sql_query(sql_query)
+                    result = await run_db(execute_sql_query, sql_query)
                     viz_type = determine_visualization_type(sql_query, result)
-                    formatted_result = format_query_response(result, viz_type)
+                    formatted_result = await run_db(format_query_response, result, viz_type)
                     
                     # Combine AI explanation with formatted result
                     response = {
@@ -426,4 +424,5 @@ async def chat():
 
 if __name__ == '__main__':
     print("Starting Flask development server...")
-    app.run(host='127.0.0.1', port=8080, debug=True) 
\ No newline at end of file
+    # threaded: each request waits on its own thread while the shared loop does the work
+    app.run(host='127.0.0.1', port=8080, debug=True, threaded=True) 
\ No newline at end of file
@@ -0,0 +1,112 @@
+"""Compare the chat app's execute_sql_query path from cursor to DataFrame before and after fetch_frame.
+
+Usage:
+    python benchmarks/bench_execute_sql_query.py [--rows 10000 100000] [--columns 40] [--memory]
+
+Rows are synthetic and shaped like a wide transactions table: the column
+types cycle through int, str, Decimal, datetime, float, date and a mostly
+NULL str column. They are built lazily by a fake cursor as a driver would,
+and row generation is included in both timings. "legacy" is the original
+path: fetchall, a loop with hasattr checks on every cell that turns NULL
+into 'NULL', and pd.DataFrame on the row dicts. "frame" is
+frame_fetch.fetch_frame, which fills typed column arrays from fetchmany
+batches.
+
+--memory also reports peak traced memory and the size of the DataFrame.
+"""
+import argparse
+import datetime
+import decimal
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import pandas as pd  # noqa: E402
+
+from frame_fetch import fetch_frame  # noqa: E402
+
+START = datetime.datetime(2024, 1, 1)
+COLUMN_TYPES = [
+    (int, lambda i: i),
+    (str, lambda i: f"Customer {i % 977}"),
+    (decimal.Decimal, lambda i: decimal.Decimal(i % 100000) / 100),
+    (datetime.datetime, lambda i: START + datetime.timedelta(minutes=i)),
+    (float, lambda i: i * 0.37),
+    (datetime.date, lambda i: (START + datetime.timedelta(days=i % 365)).date()),
+    (str, lambda i: None if i % 5 else "refund"),
+]
+
+
+def make_columns(columns):
+    description = []
+    makers = []
+    for j in range(columns):
+        python_type, make = COLUMN_TYPES[j % len(COLUMN_TYPES)]
+        description.append((f"{python_type.__name__}_{j}", python_type, None, 0, 0, 0, True))
+        makers.append(make)
+    return description, makers
+
+
+class FakeCursor:
+    """An executed cursor whose rows are only built as they are fetched."""
+
+    def __init__(self, rows, columns):
+        self.description, makers = make_columns(columns)
+        self._rows = (tuple(make(i) for make in makers) for i in range(rows))
+
+    def fetchall(self):
+        return list(self._rows)
+
+    def fetchmany(self, size):
+        return [row for _, row in zip(range(size), self._rows)]
+
+
+def legacy(cursor):
+    columns = [{'name': column[0], 'type': str(column[1])} for column in cursor.description]
+    results = []
+    for row in cursor.fetchall():
+        row_dict = {}
+        for i, value in enumerate(row):
+            if hasattr(value, 'strftime'):
+                value = value.strftime('%Y-%m-%d %H:%M:%S')
+            elif hasattr(value, 'as_integer_ratio'):
+                value = float(value)
+            elif value is None:
+                value = 'NULL'
+            row_dict[columns[i]['name']] = value
+        results.append(row_dict)
+    return pd.DataFrame(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--columns", type=int, default=40)
+    parser.add_argument("--memory", action="store_true", help="also measure peak memory (slower)")
+    args = parser.parse_args()
+
+    for count in args.rows:
+        print(f"{count:,} rows x {args.columns} columns, cursor to DataFrame")
+        for name, load in [("legacy", legacy), ("frame", fetch_frame)]:
+            started = time.perf_counter()
+            df = load(FakeCursor(count, args.columns))
+            elapsed = time.perf_counter() - started
+            line = f"  {name:<7} {elapsed * 1000:10.1f} ms  {count * args.columns / elapsed / 1e6:8.2f} M cells/s"
+            if args.memory:
+                del df
+                # Traced separately: tracing slows allocation-heavy code several times over
+                tracemalloc.start()
+                df = load(FakeCursor(count, args.columns))
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                line += (f"  peak {peak / 2**20:8.1f} MiB"
+                         f"  frame {df.memory_usage(deep=True).sum() / 2**20:8.1f} MiB")
+            print(line)
+            del df
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Compare the rule-based NL->SQL tier before and after indexing, on a wide schema.
+
+Usage:
+    python benchmarks/bench_nl_to_sql.py [--tables 250] [--columns-per-table 20] [--questions 2000]
+
+"legacy" is the original NaturalLanguageToSQL approach: the pattern dict is
+tried one re.match at a time and every table and column name is scanned
+linearly for each name in the question. "indexed" is nl_to_sql with its
+single precompiled dispatcher and trigram name indexes; its index build is
+timed separately. The default schema has 5,000 columns.
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from nl_to_sql import NaturalLanguageToSQL  # noqa: E402
+
+ENTITIES = ["Customer", "Transaction", "Product", "Merchant", "Invoice", "Shipment", "Refund", "Account",
+            "Payment", "Order", "Store", "Region", "Campaign", "Supplier", "Employee", "Ledger"]
+ATTRIBUTES = ["ID", "Name", "Amount", "Date", "Status", "Code", "Type", "Country", "City", "Total", "Count",
+              "Score", "Currency", "Channel", "Category", "Reference", "Balance", "Rate", "Notes", "Owner"]
+
+
+def make_schema(tables, columns_per_table):
+    schema = {}
+    for i in range(tables):
+        table = f"{ENTITIES[i % len(ENTITIES)]}{ENTITIES[(i // len(ENTITIES)) % len(ENTITIES)]}{i}"
+        schema[table] = [
+            f"{ENTITIES[(i + j) % len(ENTITIES)]}{ATTRIBUTES[j % len(ATTRIBUTES)]}{j // len(ATTRIBUTES) or ''}"
+            for j in range(columns_per_table)
+        ]
+    return schema
+
+
+def make_questions(schema, count, seed=0):
+    rng = random.Random(seed)
+    tables = list(schema)
+    shapes = [
+        lambda t, c: f"How many {t} are there?",
+        lambda t, c: f"count of records in {t}",
+        lambda t, c: f"what are the distinct {c} in {t}",
+        lambda t, c: f"list {c} from {t}",
+        lambda t, c: f"show all data from {t}",
+        lambda t, c: f"what was the average {c} per month",
+    ]
+    questions = []
+    for _ in range(count):
+        table = rng.choice(tables)
+        questions.append(rng.choice(shapes)(table, rng.choice(schema[table])))
+    return questions
+
+
+# The original pattern dict and linear name scans, condensed
+LEGACY_PATTERNS = [
+    (r'list all (.*) from (.*)', "select"), (r'show all (.*) from (.*)', "select"),
+    (r'get all (.*) from (.*)', "select"), (r'count (.*) in (.*)', "count"),
+    (r'what are the (.*) in (.*)', "distinct"), (r'how many (.*) in (.*)', "count"),
+    (r'list (.*) from (.*)', "select"), (r'show (.*) from (.*)', "select"), (r'get (.*) from (.*)', "select"),
+]
+
+
+def legacy_best(name, candidates):
+    name = name.strip().lower()
+    best, best_score = None, 0
+    for candidate in candidates:
+        score = 0
+        if name in candidate.lower():
+            score = len(name) / len(candidate)
+        elif candidate.lower() in name:
+            score = len(candidate) / len(name)
+        if score > best_score:
+            best, best_score = candidate, score
+    return best if best and best_score > 0.5 else f"[{name}]"
+
+
+def legacy(question, schema):
+    question = question.lower().strip()
+    for pattern, kind in LEGACY_PATTERNS:
+        match = re.match(pattern, question)
+        if match:
+            table = legacy_best(match.group(2), schema)
+            if kind == "count":
+                return f"SELECT COUNT(*) FROM {table}"
+            all_columns = (column for columns in schema.values() for column in columns)
+            return f"SELECT {legacy_best(match.group(1), all_columns)} FROM {table}"
+    words = question.split()
+    if len(words) >= 3 and words[0] in ("list", "show", "get"):
+        return f"SELECT * FROM {legacy_best(words[-1], schema)}"
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tables", type=int, default=250)
+    parser.add_argument("--columns-per-table", type=int, default=20)
+    parser.add_argument("--questions", type=int, default=2000)
+    args = parser.parse_args()
+
+    schema = make_schema(args.tables, args.columns_per_table)
+    questions = make_questions(schema, args.questions)
+    print(f"{len(schema):,} tables, {sum(map(len, schema.values())):,} columns, {len(questions):,} questions")
+
+    started = time.perf_counter()
+    for question in questions:
+        legacy(question, schema)
+    elapsed = time.perf_counter() - started
+    print(f"  legacy   {elapsed / len(questions) * 1e6:10.1f} us/question")
+
+    rules = NaturalLanguageToSQL()
+    rules.load_schema(schema)
+    started = time.perf_counter()
+    rules.translate(questions[0])
+    for table in schema:
+        rules._column(table, "")
+    print(f"  indexed  {(time.perf_counter() - started) * 1000:10.1f} ms to build all indexes")
+
+    started = time.perf_counter()
+    confident = sum(rules.confident_sql(question) is not None for question in questions)
+    elapsed = time.perf_counter() - started
+    print(f"  indexed  {elapsed / len(questions) * 1e6:10.1f} us/question, "
+          f"{confident / len(questions):.0%} answered without the LLM")
+
+
+if __name__ == "__main__":
+    main()
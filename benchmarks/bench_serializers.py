@@ -0,0 +1,89 @@
+"""Compare MCP result serializers against the original ",".join formatting.
+
+Usage:
+    python benchmarks/bench_serializers.py [--rows 10000 1000000] [--page-size 0]
+
+Rows are synthetic and shaped like the transactions table (int, str, Decimal,
+datetime, float and a nullable column). A page size of 0 serializes every row
+in one call; any other value serializes page by page as execute_sql does.
+"""
+import argparse
+import datetime
+import decimal
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from mssql_mcp_server.serializers import SERIALIZERS, get_serializer  # noqa: E402
+
+DESCRIPTION = [
+    ("TransactionID", int, None, 10, 10, 0, False),
+    ("CustomerName", str, None, 100, 100, 0, True),
+    ("Amount", decimal.Decimal, None, 18, 18, 2, True),
+    ("TransactionDate", datetime.datetime, None, 23, 23, 3, True),
+    ("Score", float, None, 53, 53, 0, True),
+    ("Notes", str, None, 200, 200, 0, True),
+]
+
+
+def make_rows(count):
+    start = datetime.datetime(2024, 1, 1)
+    return [
+        (
+            i,
+            f"Customer {i % 977}",
+            decimal.Decimal(i % 100000) / 100,
+            start + datetime.timedelta(minutes=i),
+            i * 0.37,
+            None if i % 3 else "refund, pending",
+        )
+        for i in range(count)
+    ]
+
+
+def legacy(rows):
+    columns = [column[0] for column in DESCRIPTION]
+    result = [",".join(map(str, row)) for row in rows]
+    return "\n".join([",".join(columns)] + result)
+
+
+def pages(rows, page_size):
+    if not page_size:
+        yield rows
+        return
+    for start in range(0, len(rows), page_size):
+        yield rows[start:start + page_size]
+
+
+def bench(name, rows, page_size):
+    if name == "legacy":
+        dumps = legacy
+    else:
+        try:
+            dumps = get_serializer(name, DESCRIPTION).dumps
+        except ValueError as e:
+            print(f"  {name:<8} skipped: {e}")
+            return
+    started = time.perf_counter()
+    size = sum(len(dumps(page)) for page in pages(rows, page_size))
+    elapsed = time.perf_counter() - started
+    print(f"  {name:<8} {elapsed * 1000:10.1f} ms  {len(rows) / elapsed:12,.0f} rows/s  {size / 1e6:9.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--page-size", type=int, default=0)
+    args = parser.parse_args()
+
+    for count in args.rows:
+        rows = make_rows(count)
+        print(f"{count:,} rows (page size {args.page_size or 'unbounded'})")
+        for name in ["legacy"] + sorted(SERIALIZERS):
+            bench(name, rows, args.page_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,44 @@
 import os
 import pyodbc
 import asyncio
-from flask import Flask, jsonify, request, render_template
-from flask_cors import CORS
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from quart import Quart, Response, jsonify, request, render_template, make_response
+from quart_cors import cors
 from dotenv import load_dotenv
 from hypercorn.config import Config
 from hypercorn.asyncio import serve
 from claude_integration import ClaudeSQLAssistant
+from nl_to_sql import NaturalLanguageToSQL
+from columnar import dumps
+from export_stream import EXPORT_FORMATS, export_chunks
+from query_limits import UNLIMITED, LimitedFetch, QueryLimits
+from schema_snapshot import SchemaSnapshot
+from natural_query_stream import format_sse, natural_query_events
+from translation_cache import TranslationCache
 
 # Load environment variables
 load_dotenv()
 
-app = Flask(__name__)
-CORS(app)
+app = Quart(__name__)
+app = cors(app)
 
-# Initialize Claude assistant
-claude_assistant = ClaudeSQLAssistant()
+# Initialize Claude assistant; simple questions are answered by rules and
+# repeated ones from the translation cache
+translation_cache_size = int(os.getenv('MSSQL_TRANSLATION_CACHE_SIZE', '1000'))
+claude_assistant = ClaudeSQLAssistant(
+    translation_cache=TranslationCache(
+        os.getenv('MSSQL_TRANSLATION_CACHE_PATH', 'translation_cache.sqlite3'),
+        max_entries=translation_cache_size
+    ) if translation_cache_size > 0 else None,
+    schema_top_k=int(os.getenv('MSSQL_SCHEMA_TOP_K', '8')),
+    analysis_max_bytes=int(os.getenv('MSSQL_ANALYSIS_MAX_BYTES', '16000')),
+    rules=NaturalLanguageToSQL(
+        min_confidence=float(os.getenv('MSSQL_RULES_MIN_CONFIDENCE', '0.85')),
+        max_rows=int(os.getenv('MSSQL_RULES_MAX_ROWS', '1000'))
+    )
+)
 
 # Database configuration
 DB_CONFIG = {
@@ -36,164 +59,250 @@ def get_db_connection():
         print(f"Error connecting to database: {str(e)}")
         return None
 
-def get_table_names():
-    try:
-        conn = get_db_connection()
-        if not conn:
-            return []
-        
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT TABLE_NAME 
-            FROM INFORMATION_SCHEMA.TABLES 
-            WHERE TABLE_TYPE = 'BASE TABLE'
-        """)
-        tables = [row[0] for row in cursor.fetchall()]
-        cursor.close()
-        conn.close()
-        return tables
-    except pyodbc.Error as e:
-        print(f"Error getting table names: {str(e)}")
-        return []
+# Tables and columns, loaded with one query and refreshed when the schema changes
+schema = SchemaSnapshot(
+    get_db_connection,
+    ttl=float(os.getenv('MSSQL_SCHEMA_TTL', '300')),
+    check_interval=float(os.getenv('MSSQL_SCHEMA_CHECK_INTERVAL', '10'))
+)
 
-def get_table_columns(table_name):
-    try:
-        conn = get_db_connection()
-        if not conn:
-            return []
-        
-        cursor = conn.cursor()
-        cursor.execute(f"""
-            SELECT COLUMN_NAME, DATA_TYPE 
-            FROM INFORMATION_SCHEMA.COLUMNS 
-            WHERE TABLE_NAME = ?
-        """, table_name)
-        columns = [{'name': row[0], 'type': row[1]} for row in cursor.fetchall()]
-        cursor.close()
-        conn.close()
-        return columns
-    except pyodbc.Error as e:
-        print(f"Error getting column names: {str(e)}")
-        return []
+# Row, byte and time limits per endpoint, so one unbounded query cannot
+# exhaust a worker's memory or hold locks on the server
+QUERY_LIMITS = QueryLimits.from_env('QUERY')
+NATURAL_QUERY_LIMITS = QueryLimits.from_env('NATURAL_QUERY')
+# Exports stream in constant memory, so they have no row or byte cap unless configured
+EXPORT_LIMITS = QueryLimits.from_env('EXPORT', max_rows=0, max_bytes=0)
+
+# pyodbc calls block, so they run on a bounded pool of worker threads while the
+# event loop keeps serving other requests
+db_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('MSSQL_MAX_CONCURRENCY', '16')),
+    thread_name_prefix='db'
+)
 
-def execute_query(query, params=None):
+async def run_db(fn, *args):
+    """Run a blocking database call on the worker pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, partial(fn, *args))
+
+def open_query(query, params=None, limits=None, batch_size=500, records=False):
+    """Execute a query under limits and return a LimitedFetch that owns the connection."""
+    limits = limits or UNLIMITED
+    conn = get_db_connection()
+    if not conn:
+        raise RuntimeError("Could not connect to the database")
     try:
-        conn = get_db_connection()
-        if not conn:
-            return None
-        
-        cursor = conn.cursor()
+        cursor = limits.open_cursor(conn)
         if params:
             cursor.execute(query, params)
         else:
             cursor.execute(query)
-        
-        # Get column names
-        columns = [column[0] for column in cursor.description]
-        
-        # Fetch results and handle datetime serialization
-        results = []
-        for row in cursor.fetchall():
-            row_dict = {}
-            for i, value in enumerate(row):
-                # Convert datetime objects to ISO format strings
-                if hasattr(value, 'isoformat'):
-                    row_dict[columns[i]] = value.isoformat()
-                else:
-                    row_dict[columns[i]] = value
-            results.append(row_dict)
-        
-        cursor.close()
+        return LimitedFetch(cursor, limits, batch_size, records, connection=conn)
+    except BaseException:
         conn.close()
-        return results
-    except pyodbc.Error as e:
+        raise
+
+def execute_query_columnar(query, params=None, limits=None):
+    """Execute a query and return its rows as a ColumnarResult, or None on a database error.
+
+    Fetching stops at the row or byte limit; the result is then marked truncated.
+    """
+    try:
+        fetch = open_query(query, params, limits)
+        try:
+            # Converters for dates, decimals etc. are picked once per column
+            return fetch.result()
+        finally:
+            fetch.close()
+    except (pyodbc.Error, RuntimeError) as e:
         print(f"Error executing query: {str(e)}")
         return None
 
+def execute_query(query, params=None, limits=None):
+    """Execute a query and return its rows as a list of dicts, or None on a database error."""
+    result = execute_query_columnar(query, params, limits)
+    return None if result is None else result.to_records()
+
+def iter_query_batches(query, batch_size=500, limits=None):
+    """Execute a query and return an iterator of row batches (lists of dicts) as they are fetched.
+
+    The iterator's truncated flag is set when a limit stopped the fetch early.
+    """
+    return open_query(query, limits=limits, batch_size=batch_size, records=True)
+
 @app.route('/')
-def index():
-    return render_template('index.html')
+async def index():
+    return await render_template('index.html')
 
 @app.route('/api/tables')
-def get_tables():
+async def get_tables():
     try:
-        tables = get_table_names()
-        table_info = {}
-        
-        # Get column information for each table
-        for table in tables:
-            columns = get_table_columns(table)
-            table_info[table] = [col['name'] for col in columns]
+        table_info = await run_db(schema.table_info)
+        tables = list(table_info)
         
         # Update Claude with table information
-        claude_assistant.update_table_info(table_info)
+        claude_assistant.update_table_info(table_info, await run_db(schema.index))
         
         return jsonify(tables)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/natural-query', methods=['POST'])
-def natural_language_query():
+async def natural_language_query():
     try:
-        data = request.get_json()
+        data = await request.get_json()
         if not data or 'query' not in data:
             return jsonify({'error': 'No query provided'}), 400
         
         # First ensure we have table information
-        tables = get_table_names()
-        if not tables:
+        table_info = await run_db(schema.table_info)
+        if not table_info:
             return jsonify({'error': 'No tables found in the database'}), 500
-            
-        table_info = {}
-        for table in tables:
-            columns = get_table_columns(table)
-            table_info[table] = [col['name'] for col in columns]
         
         # Update Claude with table information
-        claude_assistant.update_table_info(table_info)
+        claude_assistant.update_table_info(table_info, await run_db(schema.index))
         
         # Generate SQL query from natural language
         try:
-            sql_query = claude_assistant.generate_sql_query(data['query'])
+            sql_query = await claude_assistant.agenerate_sql_query(data['query'])
         except ValueError as e:
             return jsonify({'error': str(e)}), 400
         
         # Execute the generated SQL query
-        results = execute_query(sql_query)
-        if results is None:
+        result = await run_db(execute_query_columnar, sql_query, None, NATURAL_QUERY_LIMITS)
+        if result is None:
             return jsonify({'error': 'Failed to execute query'}), 500
+        results = result.to_records()
         
         # Analyze results using Claude
-        analysis = claude_assistant.analyze_results(data['query'], results)
+        analysis = await claude_assistant.aanalyze_results(data['query'], results)
         
         return jsonify({
             'sql_query': sql_query,
             'results': results,
+            'truncated': result.truncated,
             'analysis': analysis
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/natural-query/stream', methods=['POST'])
+async def natural_language_query_stream():
+    """Stream the generated SQL, result rows and analysis as server-sent events."""
+    data = await request.get_json()
+    if not data or 'query' not in data:
+        return jsonify({'error': 'No query provided'}), 400
+    
+    table_info = await run_db(schema.table_info)
+    if not table_info:
+        return jsonify({'error': 'No tables found in the database'}), 500
+    claude_assistant.update_table_info(table_info, await run_db(schema.index))
+    
+    batch_size = int(os.getenv('MSSQL_STREAM_BATCH_SIZE', '500'))
+    
+    async def events():
+        async for event, payload in natural_query_events(
+            data['query'],
+            claude_assistant,
+            partial(iter_query_batches, batch_size=batch_size, limits=NATURAL_QUERY_LIMITS),
+            run_db
+        ):
+            yield format_sse(event, payload)
+    
+    response = await make_response(events(), {
+        'Content-Type': 'text/event-stream',
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    # The analysis can take longer than the default response timeout
+    response.timeout = None
+    return response
+
 @app.route('/api/query', methods=['POST'])
-def execute_custom_query():
+async def execute_custom_query():
     try:
-        data = request.get_json()
+        data = await request.get_json()
         if not data or 'query' not in data:
             return jsonify({'error': 'No query provided'}), 400
             
         query = data['query']
-        results = execute_query(query)
-        if results is None:
+        result = await run_db(execute_query_columnar, query, None, QUERY_LIMITS)
+        if result is None:
             return jsonify({'error': 'Failed to execute query'}), 500
-            
-        return jsonify(results)
+        
+        # "columnar" returns one array per column instead of one object per row
+        if (data.get('format') or request.args.get('format')) == 'columnar':
+            payload = result.to_dict()
+        else:
+            payload = result.to_records()
+        # The list of rows has nowhere to carry the flag, so it goes in a header for both shapes
+        return Response(
+            await run_db(dumps, payload),
+            mimetype='application/json',
+            headers={'X-Result-Truncated': 'true' if result.truncated else 'false'}
+        )
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/query/stream', methods=['GET', 'POST'])
+async def export_query():
+    """Stream a query's rows as NDJSON or CSV straight from the cursor, optionally gzip-compressed."""
+    data = (await request.get_json(silent=True)) or {}
+    query = data.get('query') or request.args.get('query')
+    if not query:
+        return jsonify({'error': 'No query provided'}), 400
+    fmt = data.get('format') or request.args.get('format', 'ndjson')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f"Unsupported format '{fmt}', expected one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    compress = str(data.get('gzip', request.args.get('gzip', ''))).lower() in ('1', 'true', 'yes')
+    
+    batch_size = int(os.getenv('MSSQL_EXPORT_BATCH_SIZE', '2000'))
+    try:
+        fetch = await run_db(open_query, query, None, EXPORT_LIMITS, batch_size)
+    except (pyodbc.Error, RuntimeError) as e:
+        return jsonify({'error': str(e)}), 500
+    columns = [column[0] for column in fetch.cursor.description]
+    chunks = export_chunks(fetch, columns, fmt, compress)
+    
+    async def body():
+        pending = None
+        try:
+            while True:
+                pending = db_executor.submit(next, chunks, None)
+                chunk = await asyncio.wrap_future(pending)
+                if chunk is None:
+                    break
+                yield chunk
+        finally:
+            if pending is not None and not pending.done():
+                # The client went away mid-fetch: cancel the statement so the
+                # worker returns before the cursor is closed under it
+                fetch.cursor.cancel()
+                with contextlib.suppress(Exception):
+                    await asyncio.wrap_future(pending)
+            # Cancels the statement too if rows were still pending
+            await run_db(fetch.close)
+    
+    media_type, extension = EXPORT_FORMATS[fmt]
+    headers = {
+        'Content-Type': media_type,
+        'Content-Disposition': f'attachment; filename="export.{extension}"',
+        'X-Accel-Buffering': 'no'
+    }
+    if compress:
+        headers['Content-Encoding'] = 'gzip'
+    response = await make_response(body(), headers)
+    # Large exports take longer than the default response timeout
+    response.timeout = None
+    return response
+
 async def main():
     config = Config()
     config.bind = ["localhost:5000"]
-    await serve(app, config)
+    try:
+        await serve(app, config)
+    finally:
+        db_executor.shutdown(wait=False, cancel_futures=True)
 
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file
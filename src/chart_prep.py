@@ -0,0 +1,141 @@
+import base64
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_POINTS = 1000
+DEFAULT_TOP_N = 20
+# Category labels are clipped so many long labels cannot grow the payload
+MAX_LABEL_LENGTH = 60
+# Share of non-null x values that must parse before x is treated as dates or numbers
+MIN_PARSED_FRACTION = 0.9
+
+
+def typed_array(values: np.ndarray) -> Dict[str, str]:
+    """Encode numbers as {"dtype", "bdata"}: base64 of little-endian float64, the layout Plotly.js reads as a typed array."""
+    return {"dtype": "f8", "bdata": base64.b64encode(np.ascontiguousarray(values, dtype="<f8").tobytes()).decode("ascii")}
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices of at most threshold points chosen by Largest-Triangle-Three-Buckets.
+
+    The first and last points are kept; from each bucket in between, the point
+    forming the largest triangle with the previously kept point and the mean
+    of the next bucket is kept, which preserves peaks and troughs.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    every = (n - 2) / (threshold - 2)
+    edges = (np.arange(threshold - 1) * every).astype(int) + 1
+    edges[-1] = n - 1
+    selected = np.empty(threshold, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        following = slice(end, edges[i + 2] if i + 2 < len(edges) else n)
+        mean_x, mean_y = x[following].mean(), y[following].mean()
+        area = np.abs(
+            (x[previous] - mean_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (mean_y - y[previous])
+        )
+        previous = start + int(area.argmax())
+        selected[i + 1] = previous
+    return selected
+
+
+def _numeric(series: pd.Series) -> pd.Series:
+    return pd.to_numeric(series, errors="coerce")
+
+
+def _mostly(parsed: pd.Series, series: pd.Series) -> bool:
+    present = series.notna().sum()
+    return present > 0 and parsed.notna().sum() >= MIN_PARSED_FRACTION * present
+
+
+def _positions(series: pd.Series) -> Tuple[pd.Series, str]:
+    """x values as numbers, with what they stand for: "number", "date" or "category".
+
+    Dates become epoch milliseconds so they ride in a typed array too. Text
+    that is not mostly ISO dates or numbers (month names, quarters, product
+    names) is a category: x is the row position and the labels go in ticktext.
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(float), "number"
+    if pd.api.types.is_datetime64_any_dtype(series):
+        dates = series
+    else:
+        try:
+            # ISO only: dateutil would read "Jan" or "Mar" as dates in year 1
+            dates = pd.to_datetime(series, errors="coerce", format="ISO8601")
+        except (ValueError, OverflowError, TypeError):
+            dates = None
+    if dates is not None and _mostly(dates, series):
+        return (dates - pd.Timestamp(0)) / pd.Timedelta(milliseconds=1), "date"
+    numbers = _numeric(series)
+    if _mostly(numbers, series):
+        return numbers, "number"
+    return pd.Series(np.arange(len(series), dtype=float), index=series.index), "category"
+
+
+def line_series(x: pd.Series, y: pd.Series, max_points: int = DEFAULT_MAX_POINTS) -> Tuple[np.ndarray, np.ndarray, str]:
+    """Sorted, NaN-free x/y arrays downsampled with LTTB, and what x holds (see _positions)."""
+    positions, kind = _positions(x)
+    frame = pd.DataFrame({"x": positions, "y": _numeric(y)}).dropna().sort_values("x", kind="stable")
+    xs, ys = frame["x"].to_numpy(float), frame["y"].to_numpy(float)
+    keep = lttb(xs, ys, max_points)
+    return xs[keep], ys[keep], kind
+
+
+def top_categories(labels: pd.Series, values: pd.Series, top_n: int = DEFAULT_TOP_N) -> Tuple[List[str], np.ndarray]:
+    """Totals per category in the order they first appear, the query's ORDER BY.
+
+    Beyond top_n categories, the top_n - 1 largest are kept, largest first,
+    plus one bucket for all the others.
+    """
+    totals = _numeric(values).groupby(labels.astype(str).str.slice(0, MAX_LABEL_LENGTH), sort=False).sum()
+    if len(totals) > top_n:
+        totals = totals.sort_values(ascending=False, kind="stable")
+        rest = totals.iloc[top_n - 1:]
+        totals = pd.concat([totals.iloc[:top_n - 1], pd.Series({f"Other ({len(rest)} more)": rest.sum()})])
+    return [str(label) for label in totals.index], totals.to_numpy(float)
+
+
+def chart_figure(
+    df: pd.DataFrame,
+    chart_type: str,
+    layout: Optional[Dict[str, Any]] = None,
+    max_points: int = DEFAULT_MAX_POINTS,
+    top_n: int = DEFAULT_TOP_N,
+) -> Dict[str, Any]:
+    """A compact Plotly figure for the first two columns of df.
+
+    Line charts are downsampled to max_points and bar and pie charts keep
+    top_n categories, so the figure stays the same size however many rows
+    there are.
+    """
+    x, y = df[df.columns[0]], df[df.columns[1]]
+    layout = dict(layout or {})
+    if chart_type == "line":
+        xs, ys, kind = line_series(x, y, max_points)
+        trace = {"type": "scatter", "mode": "lines", "x": typed_array(xs), "y": typed_array(ys)}
+        if kind == "date":
+            layout.setdefault("xaxis", {})["type"] = "date"
+        elif kind == "category":
+            # Row positions on a linear axis, labelled with the kept points' labels
+            labels = x.iloc[xs.astype(int)].astype(str).str.slice(0, MAX_LABEL_LENGTH)
+            layout.setdefault("xaxis", {}).update(
+                type="linear", tickmode="array", tickvals=xs.tolist(), ticktext=labels.tolist()
+            )
+    elif chart_type == "bar":
+        names, totals = top_categories(x, y, top_n)
+        trace = {"type": "bar", "x": names, "y": typed_array(totals)}
+        layout.setdefault("xaxis", {})["type"] = "category"
+    elif chart_type == "pie":
+        names, totals = top_categories(x, y, top_n)
+        trace = {"type": "pie", "labels": names, "values": typed_array(totals)}
+    else:
+        raise ValueError(f"Unsupported chart type: {chart_type}")
+    return {"data": [trace], "layout": layout}
@@ -1,10 +1,13 @@
+import asyncio
 import os
-from anthropic import Anthropic
-import pandas as pd
-import json
-from typing import Dict, List, Optional
+from anthropic import Anthropic, AsyncAnthropic
+from typing import AsyncIterator, Dict, List, Optional
 import requests
 from dotenv import load_dotenv
+from nl_to_sql import NaturalLanguageToSQL
+from result_summary import summarize_results
+from schema_index import SchemaIndex
+from translation_cache import TranslationCache, schema_fingerprint
 
 def get_claude_api_key() -> str:
     """Get Claude API key from environment or prompt user."""
@@ -29,26 +32,71 @@ def get_claude_api_key() -> str:
     return api_key
 
 class ClaudeSQLAssistant:
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        translation_cache: Optional[TranslationCache] = None,
+        schema_top_k: int = 8,
+        analysis_max_bytes: int = 16_000,
+        rules: Optional[NaturalLanguageToSQL] = None
+    ):
         self.api_key = api_key or get_claude_api_key()
         if not self.api_key:
             raise ValueError("ANTHROPIC_API_KEY environment variable is required")
         self.client = Anthropic(api_key=self.api_key)
+        self.async_client = AsyncAnthropic(api_key=self.api_key)
+        self.translation_cache = translation_cache
+        self.schema_top_k = schema_top_k
+        self.analysis_max_bytes = analysis_max_bytes
+        # Simple questions the rules answer confidently never reach Claude
+        self.rules = rules
         self.table_info = {}
+        self.schema_index = SchemaIndex({})
+        self._schema_fingerprint = schema_fingerprint({})
 
-    def update_table_info(self, table_info: Dict[str, List[str]]):
-        """Update the table and column information for Claude to use."""
+    def update_table_info(self, table_info: Dict[str, List[str]], schema_index: Optional[SchemaIndex] = None):
+        """Update the table and column information for Claude to use.
+
+        Only the schema_top_k tables most relevant to each question are put in
+        the prompt; pass the schema snapshot's index to include foreign keys.
+        """
+        # A shared schema snapshot passes the same objects until the schema changes
+        if table_info is self.table_info and (schema_index is None or schema_index is self.schema_index):
+            return
+        self.schema_index = schema_index or SchemaIndex(table_info)
+        if table_info is self.table_info:
+            return
         self.table_info = table_info
+        if self.rules is not None:
+            self.rules.load_schema(table_info)
+        self._schema_fingerprint = schema_fingerprint(table_info)
+        if self.translation_cache is not None:
+            self.translation_cache.use_schema(self._schema_fingerprint)
 
-    def generate_sql_query(self, natural_language_query: str) -> str:
-        """Convert natural language to SQL query using Claude."""
+    def _known_sql(self, natural_language_query: str) -> Optional[str]:
+        """SQL from the rule-based tier or the translation cache, or None if Claude is needed."""
+        if not self.table_info:
+            return None
+        if self.rules is not None:
+            sql_query = self.rules.confident_sql(natural_language_query)
+            if sql_query is not None:
+                return sql_query
+        if self.translation_cache is None:
+            return None
+        return self.translation_cache.get(natural_language_query, self._schema_fingerprint)
+
+    def _remember_sql(self, natural_language_query: str, sql_query: str):
+        if self.translation_cache is not None:
+            self.translation_cache.put(natural_language_query, self._schema_fingerprint, sql_query)
+
+    def _sql_system_prompt(self, natural_language_query: str) -> str:
         if not self.table_info:
             raise ValueError("No table information available. Please call update_table_info first.")
             
-        system_prompt = f"""You are an expert SQL developer specializing in Microsoft SQL Server (MSSQL). Convert the user's natural language query into a valid MSSQL query.
+        return f"""You are an expert SQL developer specializing in Microsoft SQL Server (MSSQL). Convert the user's natural language query into a valid MSSQL query.
 
-Available tables and their columns:
-{json.dumps(self.table_info, indent=2)}
+Available tables and their columns, as Table(column type, ...):
+{self.schema_index.context(natural_language_query, self.schema_top_k)}
 
 IMPORTANT: You can ONLY use the tables listed above. If the user asks about tables not in this list, you must inform them that the table doesn't exist.
 
@@ -73,48 +121,71 @@ FROM [TableName]
 WHERE [TableName].[Column1] IS NOT NULL
 ORDER BY [TableName].[Column1] DESC;"""
 
-        try:
-            response = self.client.messages.create(
-                model="claude-3-opus-20240229",
-                max_tokens=1000,
-                temperature=0,
-                system=system_prompt,
-                messages=[
-                    {"role": "user", "content": natural_language_query}
-                ]
-            )
-            
-            # Clean up the response to ensure it's a valid SQL query
-            sql_query = response.content[0].text.strip()
-            
-            # Remove any non-SQL content (like explanations or markdown)
-            if "```sql" in sql_query:
-                sql_query = sql_query.split("```sql")[1].split("```")[0].strip()
-            elif "```" in sql_query:
-                sql_query = sql_query.split("```")[1].split("```")[0].strip()
-            
-            # Check if the response is an error message
-            if sql_query.startswith("ERROR:"):
-                raise ValueError(sql_query)
+    @staticmethod
+    def _clean_sql(text: str) -> str:
+        """Strip markdown fences and validate Claude's reply as a SQL query."""
+        sql_query = text.strip()
+        
+        # Remove any non-SQL content (like explanations or markdown)
+        if "```sql" in sql_query:
+            sql_query = sql_query.split("```sql")[1].split("```")[0].strip()
+        elif "```" in sql_query:
+            sql_query = sql_query.split("```")[1].split("```")[0].strip()
+        
+        # Check if the response is an error message
+        if sql_query.startswith("ERROR:"):
+            raise ValueError(sql_query)
+        
+        # Ensure the query has a semicolon at the end
+        if not sql_query.endswith(';'):
+            sql_query += ';'
             
-            # Ensure the query has a semicolon at the end
-            if not sql_query.endswith(';'):
-                sql_query += ';'
-                
+        return sql_query
+
+    def _sql_request(self, natural_language_query: str) -> Dict:
+        return {
+            "model": "claude-3-opus-20240229",
+            "max_tokens": 1000,
+            "temperature": 0,
+            "system": self._sql_system_prompt(natural_language_query),
+            "messages": [
+                {"role": "user", "content": natural_language_query}
+            ]
+        }
+
+    def generate_sql_query(self, natural_language_query: str) -> str:
+        """Convert natural language to SQL query using Claude."""
+        known = self._known_sql(natural_language_query)
+        if known is not None:
+            return known
+        try:
+            response = self.client.messages.create(**self._sql_request(natural_language_query))
+            sql_query = self._clean_sql(response.content[0].text)
+            self._remember_sql(natural_language_query, sql_query)
             return sql_query
-            
         except Exception as e:
             print(f"Error generating SQL query: {e}")
             raise
 
-    def analyze_results(self, query: str, results: List[Dict]) -> str:
-        """Analyze query results using Claude."""
-        if not results:
-            return "No results found for analysis."
+    async def agenerate_sql_query(self, natural_language_query: str) -> str:
+        """Convert natural language to SQL query using Claude without blocking the event loop."""
+        # The translation cache is SQLite, so lookups and writes run on a worker thread
+        known = await asyncio.to_thread(self._known_sql, natural_language_query)
+        if known is not None:
+            return known
+        try:
+            response = await self.async_client.messages.create(**self._sql_request(natural_language_query))
+            sql_query = self._clean_sql(response.content[0].text)
+            await asyncio.to_thread(self._remember_sql, natural_language_query, sql_query)
+            return sql_query
+        except Exception as e:
+            print(f"Error generating SQL query: {e}")
+            raise
 
-        # Convert results to a more readable format
-        df = pd.DataFrame(results)
-        summary = df.describe().to_string()
+    def _analysis_request(self, query: str, results: List[Dict]) -> Dict:
+        # A bounded profile of the results instead of the full rows, so the
+        # prompt stays the same size however many rows the query returned
+        summary = summarize_results(results, max_bytes=self.analysis_max_bytes)
         
         system_prompt = """You are a data analyst. Analyze the query results and provide insights.
 Focus on:
@@ -124,14 +195,41 @@ Focus on:
 4. Data quality observations
 5. Recommendations for further analysis"""
 
-        response = self.client.messages.create(
-            model="claude-3-opus-20240229",
-            max_tokens=1000,
-            temperature=0,
-            system=system_prompt,
-            messages=[
-                {"role": "user", "content": f"Query: {query}\n\nResults Summary:\n{summary}\n\nFull Results:\n{json.dumps(results, indent=2)}"}
+        return {
+            "model": "claude-3-opus-20240229",
+            "max_tokens": 1000,
+            "temperature": 0,
+            "system": system_prompt,
+            "messages": [
+                {"role": "user", "content": f"Query: {query}\n\nResults profile (JSON: row count, per-column statistics, time buckets and a stratified sample of rows):\n{summary}"}
             ]
-        )
-        
-        return response.content[0].text 
\ No newline at end of file
+        }
+
+    def analyze_results(self, query: str, results: List[Dict]) -> str:
+        """Analyze query results using Claude."""
+        if not results:
+            return "No results found for analysis."
+
+        response = self.client.messages.create(**self._analysis_request(query, results))
+        return response.content[0].text
+
+    async def aanalyze_results(self, query: str, results: List[Dict]) -> str:
+        """Analyze query results using Claude without blocking the event loop."""
+        if not results:
+            return "No results found for analysis."
+
+        # Summarizing a large result set is CPU-bound; keep it off the event loop
+        request = await asyncio.to_thread(self._analysis_request, query, results)
+        response = await self.async_client.messages.create(**request)
+        return response.content[0].text
+
+    async def astream_analysis(self, query: str, results: List[Dict]) -> AsyncIterator[str]:
+        """Stream the analysis of query results as Claude generates it."""
+        if not results:
+            yield "No results found for analysis."
+            return
+
+        request = await asyncio.to_thread(self._analysis_request, query, results)
+        async with self.async_client.messages.stream(**request) as stream:
+            async for text in stream.text_stream:
+                yield text
@@ -0,0 +1,121 @@
+import datetime
+import decimal
+import json
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder is used without it
+    orjson = None
+
+
+def _isoformat(value):
+    return value.isoformat()
+
+
+def _binary_to_hex(value):
+    return "0x" + bytes(value).hex()
+
+
+# JSON-ready converters keyed by the Python type pyodbc reports in cursor.description
+CONVERTERS_BY_TYPE: Dict[type, Callable] = {
+    decimal.Decimal: float,
+    datetime.datetime: _isoformat,
+    datetime.date: _isoformat,
+    datetime.time: _isoformat,
+    uuid.UUID: str,
+    bytes: _binary_to_hex,
+    bytearray: _binary_to_hex,
+}
+
+
+def _none_safe(convert):
+    """Wrap a converter so NULLs pass through untouched."""
+    return lambda value: None if value is None else convert(value)
+
+
+def converters_for(description, converters_by_type: Dict[type, Callable] = CONVERTERS_BY_TYPE) -> List[Optional[Callable]]:
+    """Pick one converter per column from cursor.description; None means use values as-is."""
+    converters = []
+    for column in description:
+        convert = converters_by_type.get(column[1])
+        converters.append(_none_safe(convert) if convert is not None else None)
+    return converters
+
+
+class ColumnarResult:
+    """A query result held as one list per column, with values already JSON-ready."""
+
+    __slots__ = ("columns", "types", "data", "row_count", "truncated")
+
+    def __init__(
+        self,
+        columns: List[str],
+        types: List[str],
+        data: List[List[Any]],
+        row_count: int,
+        truncated: bool = False,
+    ):
+        self.columns = columns
+        self.types = types
+        self.data = data
+        self.row_count = row_count
+        # Set when a row or byte limit stopped the fetch before the last row
+        self.truncated = truncated
+
+    @classmethod
+    def from_rows(cls, description, rows: Sequence[Sequence[Any]], converters=None) -> "ColumnarResult":
+        """Transpose fetched rows into columns, converting each column with a single map()."""
+        if converters is None:
+            converters = converters_for(description)
+        columns = [column[0] for column in description]
+        types = [getattr(column[1], "__name__", str(column[1])) for column in description]
+        if not rows:
+            return cls(columns, types, [[] for _ in columns], 0)
+        data = [
+            list(values) if convert is None else list(map(convert, values))
+            for convert, values in zip(converters, zip(*rows))
+        ]
+        return cls(columns, types, data, len(rows))
+
+    @classmethod
+    def from_cursor(cls, cursor) -> "ColumnarResult":
+        """Fetch every remaining row of an executed cursor."""
+        return cls.from_rows(cursor.description, cursor.fetchall())
+
+    @classmethod
+    def concat(cls, batches: Sequence["ColumnarResult"], truncated: bool = False) -> "ColumnarResult":
+        """Join batches fetched from the same cursor into one result."""
+        first = batches[0]
+        data = [[] for _ in first.columns]
+        for batch in batches:
+            for values, more in zip(data, batch.data):
+                values.extend(more)
+        return cls(first.columns, first.types, data, sum(batch.row_count for batch in batches), truncated)
+
+    def head(self, n: int) -> "ColumnarResult":
+        """The first n rows."""
+        return ColumnarResult(self.columns, self.types, [values[:n] for values in self.data], min(n, self.row_count))
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Rows as a list of dicts, the shape /api/query has always returned."""
+        columns = self.columns
+        return [dict(zip(columns, row)) for row in zip(*self.data)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The columnar response shape: column names and types plus one array per column."""
+        return {
+            "columns": self.columns,
+            "types": self.types,
+            "row_count": self.row_count,
+            "truncated": self.truncated,
+            "data": self.data,
+        }
+
+
+def dumps(payload: Any) -> bytes:
+    """Encode a response body as compact UTF-8 JSON, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(payload, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, default=str, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
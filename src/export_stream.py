@@ -0,0 +1,53 @@
+import csv
+import io
+import itertools
+import zlib
+from typing import Iterable, Iterator
+
+from columnar import ColumnarResult, dumps
+
+# Media type and file extension for each export format
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+}
+
+
+def ndjson_chunk(batch: ColumnarResult) -> bytes:
+    """One JSON object per row, each followed by a newline."""
+    return b"".join(dumps(row) + b"\n" for row in batch.to_records())
+
+
+def _csv_text(rows: Iterable) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\r\n").writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def csv_chunk(batch: ColumnarResult) -> bytes:
+    """RFC 4180 rows; NULLs become empty fields."""
+    return _csv_text(zip(*batch.data))
+
+
+def export_chunks(batches: Iterator[ColumnarResult], columns, fmt: str = "ndjson", compress: bool = False) -> Iterator[bytes]:
+    """Encode result batches as NDJSON or CSV chunks, optionally gzip-compressed.
+
+    Only one batch is held at a time, so memory stays flat however many rows
+    are exported. The caller owns batches and closes it when done.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    encode = csv_chunk if fmt == "csv" else ndjson_chunk
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    chunks = (encode(batch) for batch in batches)
+    if fmt == "csv":
+        chunks = itertools.chain([_csv_text([columns])], chunks)
+    for chunk in chunks:
+        if compressor is not None:
+            chunk = compressor.compress(chunk)
+        # An empty chunk would end a chunked response early
+        if chunk:
+            yield chunk
+    if compressor is not None:
+        yield compressor.flush()
+
@@ -0,0 +1,90 @@
+import datetime
+import decimal
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from columnar import converters_for
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+def _floats(values) -> np.ndarray:
+    # NULL becomes NaN; Decimals go through float()
+    return np.array(values, dtype=np.float64)
+
+
+def _masked(dtype):
+    """Values plus a NULL mask, for pandas' nullable integer and boolean arrays."""
+    def convert(values):
+        objects = np.array(values, dtype=object)
+        mask = objects == None  # noqa: E711 - elementwise comparison
+        return np.where(mask, 0, objects).astype(dtype), mask
+    return convert
+
+
+def _datetimes(unit: str):
+    return lambda values: np.array(values, dtype=f"datetime64[{unit}]")
+
+
+# How each pyodbc column type becomes a typed NumPy chunk; other types are
+# converted value by value (see columnar.CONVERTERS_BY_TYPE) into object arrays
+CHUNKERS_BY_TYPE: Dict[type, Callable] = {
+    int: _masked(np.int64),
+    bool: _masked(np.bool_),
+    float: _floats,
+    decimal.Decimal: _floats,
+    datetime.datetime: _datetimes("us"),
+    datetime.date: _datetimes("s"),
+}
+
+
+def _objects(convert):
+    def chunk(values):
+        array = np.empty(len(values), dtype=object)
+        array[:] = values if convert is None else list(map(convert, values))
+        return array
+    return chunk
+
+
+def _finish(python_type, chunks: List):
+    if python_type in (int, bool):
+        values = np.concatenate([values for values, _ in chunks])
+        mask = np.concatenate([mask for _, mask in chunks])
+        array_type = pd.arrays.IntegerArray if python_type is int else pd.arrays.BooleanArray
+        return array_type(values, mask)
+    return np.concatenate(chunks) if len(chunks) > 1 else chunks[0]
+
+
+def fetch_frame(cursor, batch_size: int = DEFAULT_BATCH_SIZE) -> pd.DataFrame:
+    """Read an executed cursor with fetchmany straight into a DataFrame.
+
+    Each batch is turned into one typed NumPy chunk per column and the
+    chunks are joined once at the end, so the rows exist as Python objects
+    only a batch at a time and the final arrays are wrapped without a copy.
+    Integer and boolean columns become nullable Int64/boolean, floats and
+    Decimals float64 with NaN for NULL, and dates datetime64.
+    """
+    description = cursor.description
+    types = [column[1] for column in description]
+    chunkers = [
+        CHUNKERS_BY_TYPE.get(python_type) or _objects(convert)
+        for python_type, convert in zip(types, converters_for(description))
+    ]
+    chunks: List[List] = [[] for _ in description]
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        for column_chunks, chunker, values in zip(chunks, chunkers, zip(*rows)):
+            column_chunks.append(chunker(values))
+
+    if not chunks or not chunks[0]:
+        columns = {i: pd.Series(dtype=object) for i in range(len(description))}
+    else:
+        columns = {i: _finish(python_type, column_chunks) for i, (python_type, column_chunks) in enumerate(zip(types, chunks))}
+    df = pd.DataFrame(columns, copy=False)
+    # Set afterwards: a dict keyed by name would drop duplicate column names
+    df.columns = [column[0] for column in description]
+    return df
@@ -0,0 +1,130 @@
+import logging
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger("mssql_mcp_server.cache")
+
+# String literals, quoted identifiers, comments, or runs of whitespace
+_TOKENS = re.compile(r"('(?:[^']|'')*'|\[[^\]]*\]|\"[^\"]*\"|--[^\n]*|/\*.*?\*/|\s+)", re.DOTALL)
+_WRITE_KEYWORDS = re.compile(
+    r"\b(INTO|INSERT|UPDATE|DELETE|MERGE|EXEC|EXECUTE|DROP|TRUNCATE|ALTER|CREATE|GRANT|REVOKE|DENY)\b",
+    re.IGNORECASE
+)
+
+
+def normalize_query(query):
+    """Collapse whitespace and drop comments outside literals so equivalent texts share a key."""
+    parts = []
+    for token in _TOKENS.split(query.strip()):
+        if not token:
+            continue
+        if token.isspace() or token.startswith("--") or token.startswith("/*"):
+            if parts and parts[-1] != " ":
+                parts.append(" ")
+            continue
+        parts.append(token)
+    return "".join(parts).strip().rstrip(";").rstrip()
+
+
+def is_cacheable_query(query):
+    """True for plain SELECT statements that cannot modify data."""
+    normalized = normalize_query(query)
+    if not normalized.upper().startswith("SELECT"):
+        return False
+    # Ignore keywords inside literals and quoted identifiers
+    code = _TOKENS.sub(" ", normalized)
+    return _WRITE_KEYWORDS.search(code) is None
+
+
+class ResultCache:
+    """LRU cache of serialized read-query results, bounded by total bytes.
+
+    Entries expire after ttl seconds. Sizes are the in-memory size of the
+    cached strings, so max_bytes bounds the cache's real memory use.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, ttl=60.0):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    @staticmethod
+    def make_key(database, query, params=(), **options):
+        """Build a cache key from the database, normalized query text, parameters and output options.
+
+        Each parameter is keyed with its type, since True == 1 == 1.0 in Python
+        but they bind as different SQL values.
+        """
+        typed_params = tuple((type(value).__name__, value) for value in params)
+        return (database, normalize_query(query), typed_params, tuple(sorted(options.items())))
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss or expired entry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[2] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """Cache a value, evicting least recently used entries to stay under max_bytes."""
+        size = sys.getsizeof(value)
+        if size > self.max_bytes:
+            return False
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, time.monotonic() + self.ttl)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+        return True
+
+    def invalidate(self):
+        """Drop every entry, e.g. after a write statement."""
+        with self._lock:
+            if self._entries:
+                logger.info(f"Invalidating {len(self._entries)} cached result(s)")
+            self._entries.clear()
+            self._bytes = 0
+            self.invalidations += 1
+
+    def stats(self):
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+            }
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
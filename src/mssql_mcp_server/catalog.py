@@ -0,0 +1,245 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+
+logger = logging.getLogger("mssql_mcp_server.catalog")
+
+# Cheap probe of user table and view DDL state: creating, dropping or altering
+# a table or view, or creating/altering one of its indexes, changes at least
+# one of these.
+FINGERPRINT_SQL = """
+SELECT COUNT(*), MAX(modify_date), CHECKSUM_AGG(CHECKSUM(object_id, modify_date))
+FROM sys.objects
+WHERE type IN ('U', 'V') AND is_ms_shipped = 0
+"""
+
+TABLES_SQL = """
+SELECT t.object_id, s.name, t.name, t.type
+FROM sys.objects t
+JOIN sys.schemas s ON s.schema_id = t.schema_id
+WHERE t.type IN ('U', 'V') AND t.is_ms_shipped = 0
+ORDER BY s.name, t.name
+"""
+
+COLUMNS_SQL = """
+SELECT c.object_id, c.name, ty.name, c.max_length, c.precision, c.scale, c.is_nullable, c.is_identity
+FROM sys.columns c
+JOIN sys.types ty ON ty.user_type_id = c.user_type_id
+JOIN sys.objects t ON t.object_id = c.object_id
+WHERE t.type IN ('U', 'V') AND t.is_ms_shipped = 0
+ORDER BY c.object_id, c.column_id
+"""
+
+INDEXES_SQL = """
+SELECT i.object_id, i.name, i.type_desc, i.is_unique, i.is_primary_key, c.name
+FROM sys.indexes i
+JOIN sys.index_columns ic ON ic.object_id = i.object_id AND ic.index_id = i.index_id
+JOIN sys.columns c ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+JOIN sys.objects t ON t.object_id = i.object_id
+WHERE t.type IN ('U', 'V') AND t.is_ms_shipped = 0 AND i.type > 0 AND ic.is_included_column = 0
+ORDER BY i.object_id, i.index_id, ic.key_ordinal
+"""
+
+_SIZED_TYPES = {"char", "varchar", "binary", "varbinary", "nchar", "nvarchar"}
+_PRECISION_TYPES = {"decimal", "numeric"}
+
+
+def quote_identifier(name):
+    """Quote a SQL Server identifier with square brackets."""
+    return "[" + name.replace("]", "]]") + "]"
+
+
+@dataclass(frozen=True)
+class ColumnInfo:
+    name: str
+    data_type: str
+    max_length: int
+    precision: int
+    scale: int
+    nullable: bool
+    is_identity: bool
+
+    @property
+    def type_display(self):
+        """Type as written in DDL, e.g. nvarchar(50) or decimal(18,2)."""
+        if self.data_type in _SIZED_TYPES:
+            if self.max_length == -1:
+                return f"{self.data_type}(max)"
+            length = self.max_length // 2 if self.data_type.startswith("n") else self.max_length
+            return f"{self.data_type}({length})"
+        if self.data_type in _PRECISION_TYPES:
+            return f"{self.data_type}({self.precision},{self.scale})"
+        return self.data_type
+
+
+@dataclass(frozen=True)
+class IndexInfo:
+    name: str
+    type_desc: str
+    is_unique: bool
+    is_primary_key: bool
+    columns: tuple
+
+
+@dataclass(frozen=True)
+class TableInfo:
+    schema: str
+    name: str
+    columns: tuple = ()
+    indexes: tuple = ()
+    is_view: bool = False
+
+    @property
+    def kind(self):
+        return "View" if self.is_view else "Table"
+
+    @property
+    def qualified_name(self):
+        return f"{self.schema}.{self.name}"
+
+    @property
+    def resource_name(self):
+        """Name used in resource URIs: bare for dbo tables, schema-qualified otherwise."""
+        return self.name if self.schema == "dbo" else self.qualified_name
+
+    @property
+    def sql_name(self):
+        return f"{quote_identifier(self.schema)}.{quote_identifier(self.name)}"
+
+    @property
+    def primary_key(self):
+        for index in self.indexes:
+            if index.is_primary_key:
+                return index.columns
+        return ()
+
+    def column(self, name):
+        """Look up a column by name, case-insensitively."""
+        lowered = name.lower()
+        for column in self.columns:
+            if column.name.lower() == lowered:
+                return column
+        return None
+
+
+class SchemaCatalog:
+    """In-process cache of tables and views with their columns, keys and indexes.
+
+    The catalog is reloaded only when the fingerprint in sys.objects changes,
+    and the fingerprint itself is checked at most once per refresh_interval,
+    so lookups between checks never touch the database.
+    """
+
+    def __init__(self, refresh_interval=10.0):
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._tables = {}
+        self._by_name = {}
+        self._fingerprint = None
+        self._checked_at = None
+
+    def is_stale(self):
+        """True when the fingerprint should be checked before the next lookup."""
+        checked_at = self._checked_at
+        return checked_at is None or time.monotonic() - checked_at >= self.refresh_interval
+
+    def invalidate(self):
+        """Force a fingerprint check on next use, e.g. after running DDL."""
+        self._checked_at = None
+
+    def refresh(self, cursor, force=False):
+        """Reload the catalog if the schema changed; returns True if it reloaded."""
+        cursor.execute(FINGERPRINT_SQL)
+        fingerprint = tuple(cursor.fetchone())
+        if not force and fingerprint == self._fingerprint:
+            self._checked_at = time.monotonic()
+            return False
+
+        started = time.monotonic()
+        tables = self._load(cursor)
+        by_name = {}
+        for table in tables.values():
+            by_name.setdefault(table.name.lower(), []).append(table)
+        with self._lock:
+            self._tables = tables
+            self._by_name = by_name
+            self._fingerprint = fingerprint
+            self._checked_at = time.monotonic()
+        logger.info(f"Loaded schema catalog: {len(tables)} tables and views in {time.monotonic() - started:.3f}s")
+        return True
+
+    def tables(self):
+        """Return all cached tables and views ordered by schema and name."""
+        return list(self._tables.values())
+
+    def get_table(self, name):
+        """Find a table or view by 'schema.table', '[schema].[table]' or a unique bare name."""
+        name = name.replace("[", "").replace("]", "").strip().lower()
+        if "." in name:
+            return self._tables.get(name)
+        matches = self._by_name.get(name, [])
+        if len(matches) == 1:
+            return matches[0]
+        # Ambiguous bare names resolve to the default schema, as SQL Server does
+        return self._tables.get(f"dbo.{name}")
+
+    def _load(self, cursor):
+        cursor.execute(TABLES_SQL)
+        names = {
+            object_id: (schema, name, object_type.strip() == "V")
+            for object_id, schema, name, object_type in cursor.fetchall()
+        }
+
+        columns = {}
+        cursor.execute(COLUMNS_SQL)
+        for object_id, name, data_type, max_length, precision, scale, nullable, identity in cursor.fetchall():
+            columns.setdefault(object_id, []).append(
+                ColumnInfo(name, data_type, max_length, precision, scale, bool(nullable), bool(identity))
+            )
+
+        indexes = {}
+        cursor.execute(INDEXES_SQL)
+        for object_id, name, type_desc, is_unique, is_primary_key, column in cursor.fetchall():
+            per_table = indexes.setdefault(object_id, {})
+            entry = per_table.setdefault(name, (type_desc, bool(is_unique), bool(is_primary_key), []))
+            entry[3].append(column)
+
+        tables = {}
+        for object_id, (schema, name, is_view) in names.items():
+            table = TableInfo(
+                schema=schema,
+                name=name,
+                columns=tuple(columns.get(object_id, ())),
+                indexes=tuple(
+                    IndexInfo(index_name, type_desc, is_unique, is_primary_key, tuple(index_columns))
+                    for index_name, (type_desc, is_unique, is_primary_key, index_columns)
+                    in indexes.get(object_id, {}).items()
+                ),
+                is_view=is_view,
+            )
+            tables[table.qualified_name.lower()] = table
+        return tables
+
+
+def describe_table(table):
+    """Render a table's or view's columns, primary key and indexes as plain text."""
+    lines = [f"{table.kind}: {table.qualified_name}"]
+    if table.primary_key:
+        lines.append(f"Primary key: {', '.join(table.primary_key)}")
+    lines.append("Columns:")
+    for column in table.columns:
+        flags = "NULL" if column.nullable else "NOT NULL"
+        if column.is_identity:
+            flags += " IDENTITY"
+        lines.append(f"  {column.name} {column.type_display} {flags}")
+    if table.indexes:
+        lines.append("Indexes:")
+        for index in table.indexes:
+            kind = [index.type_desc]
+            if index.is_unique:
+                kind.append("UNIQUE")
+            if index.is_primary_key:
+                kind.append("PRIMARY KEY")
+            lines.append(f"  {index.name} ({', '.join(index.columns)}) {' '.join(kind)}")
+    return "\n".join(lines)
@@ -0,0 +1,87 @@
+import logging
+import secrets
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger("mssql_mcp_server.cursors")
+
+
+def fetch_page(cursor, page_size, carry=None):
+    """Fetch up to page_size rows plus one lookahead row that signals more data.
+
+    Returns (rows, carry) where carry is the first row of the next page, or
+    None once the result set is exhausted.
+    """
+    rows = [carry] if carry is not None else []
+    rows.extend(cursor.fetchmany(page_size + 1 - len(rows)))
+    if len(rows) > page_size:
+        return rows[:page_size], rows[page_size]
+    return rows, None
+
+
+class OpenCursor:
+    """A detached statement whose remaining rows are fetched page by page."""
+
+    def __init__(self, statement, serializer, carry):
+        self.statement = statement
+        self.serializer = serializer
+        self.carry = carry
+        self.token = None
+        self.expires_at = 0.0
+
+
+class CursorRegistry:
+    """Open server-side cursors keyed by continuation token, with TTL expiry.
+
+    Every open cursor holds a pooled connection, so the registry is bounded:
+    registering past max_open evicts the least recently used cursor. The
+    registry is only touched from the event loop thread; callers are
+    responsible for closing the statements it hands back.
+    """
+
+    def __init__(self, ttl=120.0, max_open=4):
+        if max_open < 1:
+            raise ValueError(f"Invalid max_open: {max_open}")
+        self.ttl = ttl
+        self.max_open = max_open
+        self._cursors = OrderedDict()
+
+    def __len__(self):
+        return len(self._cursors)
+
+    def put(self, open_cursor):
+        """Store a cursor and return (token, evicted cursors that must be closed)."""
+        if open_cursor.token is None:
+            open_cursor.token = secrets.token_urlsafe(16)
+        open_cursor.expires_at = time.monotonic() + self.ttl
+        self._cursors[open_cursor.token] = open_cursor
+        self._cursors.move_to_end(open_cursor.token)
+
+        evicted = []
+        while len(self._cursors) > self.max_open:
+            _, oldest = self._cursors.popitem(last=False)
+            logger.info(f"Evicting open cursor {oldest.token} to stay within {self.max_open} open cursors")
+            evicted.append(oldest)
+        return open_cursor.token, evicted
+
+    def take(self, token):
+        """Remove and return the cursor for a token so the caller owns it exclusively."""
+        open_cursor = self._cursors.pop(token, None)
+        if open_cursor is None or open_cursor.expires_at < time.monotonic():
+            if open_cursor is not None:
+                # Put it back so the sweeper closes it like any other expired cursor
+                self._cursors[token] = open_cursor
+            raise ValueError(f"Unknown or expired continuation token: {token}")
+        return open_cursor
+
+    def pop_expired(self, now=None):
+        """Remove and return every cursor whose TTL has passed."""
+        now = time.monotonic() if now is None else now
+        expired = [token for token, c in self._cursors.items() if c.expires_at < now]
+        return [self._cursors.pop(token) for token in expired]
+
+    def clear(self):
+        """Remove and return all open cursors."""
+        cursors = list(self._cursors.values())
+        self._cursors.clear()
+        return cursors
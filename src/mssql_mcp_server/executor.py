@@ -0,0 +1,192 @@
+import asyncio
+import functools
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import pyodbc
+
+logger = logging.getLogger("mssql_mcp_server.executor")
+
+
+class QueryTimeoutError(RuntimeError):
+    """Raised when a statement does not finish within its timeout."""
+
+
+class QueryCancelledError(RuntimeError):
+    """Raised inside a worker when its statement was cancelled before it started."""
+
+
+class Statement:
+    """A cursor on a pooled connection that can be cancelled from another thread."""
+
+    def __init__(self, pool, on_phase=None):
+        self._pool = pool
+        self._on_phase = on_phase
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._closed = False
+        self.detached = False
+        self.connection = None
+        self.cursor = None
+        self._own_cursor = None
+        self._timeout = 0
+        self._prepared_sql = None
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    @contextmanager
+    def timed(self, phase):
+        """Report how long a block took as one phase of this statement."""
+        if self._on_phase is None:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._on_phase(phase, time.perf_counter() - started)
+
+    def open(self, timeout=None):
+        """Borrow a connection and create the cursor (runs on a worker thread)."""
+        with self.timed("acquire"):
+            conn = self._pool.acquire()
+        self._timeout = int(math.ceil(timeout)) if timeout else 0
+        try:
+            conn.timeout = self._timeout
+            cursor = conn.cursor()
+        except pyodbc.Error:
+            self._pool.release(conn, discard=True)
+            raise
+        with self._lock:
+            self.connection = conn
+            self.cursor = self._own_cursor = cursor
+            cancelled = self._cancelled
+        if cancelled:
+            self.close()
+            raise QueryCancelledError("Statement was cancelled before it started")
+        return self
+
+    def execute(self, sql, params=None):
+        """Execute sql, binding params and reusing the connection's prepared cursor for it."""
+        with self.timed("execute"):
+            if not params:
+                self.cursor.execute(sql)
+                return self.cursor
+            cache = self._pool.statement_cache(self.connection)
+            if cache is not None:
+                with self._lock:
+                    self.cursor = cache.cursor_for(sql, self._timeout)
+                    self._prepared_sql = sql
+            self.cursor.execute(sql, *params)
+            return self.cursor
+
+    def detach(self):
+        """Keep the cursor and connection open after the executor job finishes."""
+        self.detached = True
+
+    def cancel(self):
+        """Abort the statement running on the cursor, if any."""
+        with self._lock:
+            if self._cancelled or self._closed:
+                return
+            self._cancelled = True
+            cursor = self.cursor
+        if cursor is not None:
+            try:
+                cursor.cancel()
+                logger.info("Cancelled running statement")
+            except pyodbc.Error as e:
+                logger.warning(f"Failed to cancel statement: {e}")
+
+    def close(self, keep_prepared=True):
+        """Close the cursor and return the connection to the pool.
+
+        The connection's cached prepared cursor is kept for reuse only when
+        the statement ran to completion (not detached, cancelled or failed).
+        """
+        with self._lock:
+            if self._closed or self.connection is None:
+                self._closed = True
+                return
+            self._closed = True
+        try:
+            self._own_cursor.close()
+        except pyodbc.Error:
+            pass
+        if self._prepared_sql is not None and (not keep_prepared or self.detached or self._cancelled):
+            # The cached cursor may still hold unread rows that would keep the connection busy
+            cache = self._pool.statement_cache(self.connection)
+            if cache is not None:
+                cache.discard(self._prepared_sql, self._timeout)
+        self._pool.release(self.connection)
+
+
+class QueryExecutor:
+    """Runs blocking pyodbc work on a bounded thread pool off the event loop."""
+
+    def __init__(self, pool, max_concurrency=8, query_timeout=None, metrics=None):
+        if max_concurrency < 1:
+            raise ValueError(f"Invalid max_concurrency: {max_concurrency}")
+        self.max_concurrency = max_concurrency
+        self.query_timeout = query_timeout
+        self.metrics = metrics
+        self._pool = pool
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._threads = ThreadPoolExecutor(
+            max_workers=max_concurrency,
+            thread_name_prefix="mssql-worker",
+        )
+
+    async def call(self, fn, *args, timeout=None, on_cancel=None):
+        """Run fn(*args) on a worker thread, calling on_cancel if it is abandoned."""
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._threads, functools.partial(fn, *args))
+            try:
+                # shield() so a timeout does not orphan the future before on_cancel runs
+                return await asyncio.wait_for(asyncio.shield(future), timeout)
+            except asyncio.TimeoutError:
+                if on_cancel is not None:
+                    on_cancel()
+                raise QueryTimeoutError(f"Query timed out after {timeout}s")
+            except asyncio.CancelledError:
+                if on_cancel is not None:
+                    on_cancel()
+                raise
+
+    async def run(self, work, *, timeout=None, operation=None):
+        """Run work(statement) on a pooled connection and return its result.
+
+        The statement is closed afterwards unless work calls detach(), in which
+        case the caller takes over closing it. operation is a (kind, name)
+        pair under which the statement's phase timings are recorded.
+        """
+        timeout = self.query_timeout if timeout is None else timeout
+        on_phase = None
+        if self.metrics is not None and operation is not None:
+            on_phase = functools.partial(self.metrics.observe, *operation)
+        statement = Statement(self._pool, on_phase)
+
+        def job():
+            statement.open(timeout)
+            try:
+                result = work(statement)
+            except BaseException:
+                statement.close(keep_prepared=False)
+                raise
+            # A statement cancelled mid-flight is closed even if work detached it
+            if not statement.detached or statement.cancelled:
+                statement.close()
+            return result
+
+        return await self.call(job, timeout=timeout, on_cancel=statement.cancel)
+
+    def shutdown(self):
+        """Stop accepting work and drop anything still queued."""
+        self._threads.shutdown(wait=False, cancel_futures=True)
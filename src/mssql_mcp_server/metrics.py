@@ -0,0 +1,188 @@
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger("mssql_mcp_server.metrics")
+
+# Upper bounds in seconds; wide enough to separate sub-millisecond cache hits
+# from minute-long scans.
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+COUNTERS = ("calls", "errors", "rows", "bytes")
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram in the Prometheus style."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Estimate a quantile as the upper bound of the bucket that contains it."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "avg": round(self.sum / self.count, 6) if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe per-phase timings and counters for tools and resources.
+
+    Metrics are keyed by (kind, name): kind is "tool" or "resource" and name
+    is the tool or resource name. Timings are recorded per phase, e.g.
+    acquire, execute, fetch, serialize and total.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+        self._gauges = {}
+
+    def observe(self, kind, name, phase, seconds):
+        """Record the duration of one phase of a call."""
+        with self._lock:
+            histogram = self._histograms.get((kind, name, phase))
+            if histogram is None:
+                histogram = self._histograms[(kind, name, phase)] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def increment(self, kind, name, counter, amount=1):
+        """Add to one of the calls, errors, rows or bytes counters."""
+        with self._lock:
+            key = (kind, name, counter)
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def register_gauges(self, prefix, collect):
+        """Register a callable returning a dict of numeric values, read at snapshot time."""
+        self._gauges[prefix] = collect
+
+    @contextmanager
+    def timer(self, kind, name, phase):
+        """Time a block as one phase of a call."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(kind, name, phase, time.perf_counter() - started)
+
+    @contextmanager
+    def track(self, kind, name):
+        """Count a call and time it end to end, counting exceptions as errors."""
+        self.increment(kind, name, "calls")
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.increment(kind, name, "errors")
+            raise
+        finally:
+            self.observe(kind, name, "total", time.perf_counter() - started)
+
+    def _collect_gauges(self):
+        gauges = {}
+        for prefix, collect in list(self._gauges.items()):
+            try:
+                values = collect()
+            except Exception as e:
+                logger.warning(f"Failed to collect {prefix} gauges: {e}")
+                continue
+            for key, value in values.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    gauges[f"{prefix}_{key}"] = value
+        return gauges
+
+    def snapshot(self):
+        """Return all metrics as a JSON-serializable dict."""
+        with self._lock:
+            operations = {}
+            for (kind, name, phase), histogram in self._histograms.items():
+                entry = operations.setdefault(f"{kind}:{name}", {"phases": {}})
+                entry["phases"][phase] = histogram.snapshot()
+            for (kind, name, counter), value in self._counters.items():
+                entry = operations.setdefault(f"{kind}:{name}", {"phases": {}})
+                entry[counter] = value
+        return {"operations": operations, "gauges": self._collect_gauges()}
+
+    def render_prometheus(self):
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP mssql_mcp_phase_seconds Time spent in each phase of a tool or resource call.",
+            "# TYPE mssql_mcp_phase_seconds histogram",
+        ]
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+            for (kind, name, phase), histogram in histograms:
+                labels = f'kind="{kind}",name="{name}",phase="{phase}"'
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'mssql_mcp_phase_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'mssql_mcp_phase_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f"mssql_mcp_phase_seconds_sum{{{labels}}} {histogram.sum}")
+                lines.append(f"mssql_mcp_phase_seconds_count{{{labels}}} {histogram.count}")
+
+        for counter in COUNTERS:
+            lines.append(f"# TYPE mssql_mcp_{counter}_total counter")
+            for (kind, name, name_counter), value in counters:
+                if name_counter == counter:
+                    lines.append(f'mssql_mcp_{counter}_total{{kind="{kind}",name="{name}"}} {value}')
+
+        for gauge, value in sorted(self._collect_gauges().items()):
+            lines.append(f"# TYPE mssql_mcp_{gauge} gauge")
+            lines.append(f"mssql_mcp_{gauge} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def start_metrics_server(registry, port, host="127.0.0.1"):
+    """Serve registry.render_prometheus() at /metrics on a background thread."""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # stdout carries the MCP protocol; keep request logs out of it
+            logger.debug(format % args)
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, name="mssql-metrics", daemon=True)
+    thread.start()
+    logger.info(f"Serving Prometheus metrics on http://{host}:{server.server_port}/metrics")
+    return server
@@ -0,0 +1,296 @@
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+import pyodbc
+
+logger = logging.getLogger("mssql_mcp_server.pool")
+
+# Session settings restored when a connection goes back to the pool, so the
+# next borrower never inherits isolation levels or timeouts set by a query.
+RESET_SESSION_SQL = """
+SET TRANSACTION ISOLATION LEVEL READ COMMITTED;
+SET LOCK_TIMEOUT -1;
+SET ROWCOUNT 0;
+SET NOCOUNT OFF;
+SET XACT_ABORT OFF;
+"""
+
+
+class PoolTimeoutError(RuntimeError):
+    """Raised when no pooled connection becomes available in time."""
+
+
+class StatementCache:
+    """LRU map of SQL text to a cursor that already holds its prepared statement.
+
+    pyodbc skips SQLPrepare when a cursor executes the same SQL text it ran
+    last, so keeping one cursor per parameterized statement shape lets
+    repeated queries reuse both the driver-side handle and the server plan.
+    A cursor keeps the query timeout it was created with, so cursors are
+    cached per (sql, timeout).
+    A connection is only used by one thread at a time, so no locking is needed.
+    """
+
+    def __init__(self, conn, max_size=32):
+        self._conn = conn
+        self.max_size = max_size
+        self._cursors = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._cursors)
+
+    def cursor_for(self, sql, timeout=0):
+        """Return the cursor prepared for sql under timeout (seconds, 0 for none), creating it on first use."""
+        key = (sql, timeout)
+        cursor = self._cursors.get(key)
+        if cursor is not None:
+            self._cursors.move_to_end(key)
+            self.hits += 1
+            return cursor
+        self.misses += 1
+        # pyodbc copies the connection timeout onto the cursor when it is created
+        self._conn.timeout = timeout
+        cursor = self._conn.cursor()
+        self._cursors[key] = cursor
+        while len(self._cursors) > self.max_size:
+            _, oldest = self._cursors.popitem(last=False)
+            self._close_cursor(oldest)
+        return cursor
+
+    def discard(self, sql, timeout=0):
+        """Drop the cursor for sql, e.g. when it still holds unread results."""
+        cursor = self._cursors.pop((sql, timeout), None)
+        if cursor is not None:
+            self._close_cursor(cursor)
+
+    def close(self):
+        """Close every cached cursor."""
+        while self._cursors:
+            _, cursor = self._cursors.popitem()
+            self._close_cursor(cursor)
+
+    @staticmethod
+    def _close_cursor(cursor):
+        try:
+            cursor.close()
+        except pyodbc.Error:
+            pass
+
+
+class ConnectionPool:
+    """Thread-safe pool of reusable pyodbc connections to one database."""
+
+    def __init__(
+        self,
+        connection_string,
+        min_size=1,
+        max_size=10,
+        acquire_timeout=30.0,
+        max_retries=3,
+        backoff_base=0.5,
+        backoff_max=10.0,
+        health_check_query="SELECT 1",
+        statement_cache_size=32,
+        connect=None,
+    ):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid pool size: min_size={min_size}, max_size={max_size}")
+
+        self.min_size = min_size
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.health_check_query = health_check_query
+        self.statement_cache_size = statement_cache_size
+        self._connection_string = connection_string
+        self._connect = connect or pyodbc.connect
+
+        self._idle = deque()
+        self._statement_caches = {}
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def warm_up(self):
+        """Open connections until the pool holds at least min_size of them."""
+        opened = 0
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    break
+                self._size += 1
+            try:
+                conn = self._open()
+            except Exception:
+                self._forget()
+                raise
+            with self._cond:
+                self._idle.append(conn)
+                self._cond.notify()
+            opened += 1
+        logger.info(f"Connection pool warmed up with {opened} new connection(s)")
+        return opened
+
+    def acquire(self, timeout=None):
+        """Borrow a healthy connection, opening a new one if the pool has room."""
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            conn = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Connection pool is closed")
+                    if self._idle:
+                        # LIFO keeps the most recently used (warmest) connections busy
+                        conn = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeoutError(
+                            f"Timed out after {timeout}s waiting for a database connection"
+                        )
+                    self._cond.wait(remaining)
+
+            if conn is None:
+                try:
+                    return self._open()
+                except Exception:
+                    self._forget()
+                    raise
+
+            if self._is_healthy(conn):
+                return conn
+            logger.warning("Discarding unhealthy pooled connection")
+            self._discard(conn)
+
+    def release(self, conn, discard=False):
+        """Return a connection to the pool, resetting its session state first."""
+        if not discard and not self._closed:
+            discard = not self._reset(conn)
+
+        with self._cond:
+            if not discard and not self._closed:
+                self._idle.append(conn)
+                self._cond.notify()
+                return
+        self._discard(conn)
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """Context manager that borrows a connection and always returns it."""
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        """Close all idle connections and refuse further borrowing."""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        for conn in idle:
+            self._discard(conn)
+
+    def statement_cache(self, conn):
+        """Return the prepared-statement cache of a borrowed connection, or None if disabled."""
+        if self.statement_cache_size <= 0:
+            return None
+        with self._cond:
+            cache = self._statement_caches.get(id(conn))
+            if cache is None:
+                cache = self._statement_caches[id(conn)] = StatementCache(conn, self.statement_cache_size)
+            return cache
+
+    def stats(self):
+        """Return a snapshot of the pool's size and usage."""
+        with self._cond:
+            caches = list(self._statement_caches.values())
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "statement_cache_hits": sum(cache.hits for cache in caches),
+                "statement_cache_misses": sum(cache.misses for cache in caches),
+            }
+
+    def _open(self):
+        """Open a new connection, retrying with exponential backoff and jitter."""
+        attempt = 0
+        while True:
+            try:
+                return self._connect(self._connection_string)
+            except pyodbc.Error as e:
+                attempt += 1
+                if attempt > self.max_retries:
+                    logger.error(f"Giving up connecting after {attempt} attempt(s): {e}")
+                    raise
+                delay = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+                delay *= random.uniform(0.5, 1.0)
+                logger.warning(f"Connection attempt {attempt} failed: {e}; retrying in {delay:.2f}s")
+                time.sleep(delay)
+
+    def _is_healthy(self, conn):
+        """Run the health-check query on a connection about to be borrowed."""
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(self.health_check_query)
+                cursor.fetchall()
+            finally:
+                cursor.close()
+            return True
+        except pyodbc.Error as e:
+            logger.warning(f"Health check failed: {e}")
+            return False
+
+    def _reset(self, conn):
+        """Roll back open work and restore default session settings."""
+        try:
+            conn.rollback()
+            conn.timeout = 0
+            cursor = conn.cursor()
+            try:
+                cursor.execute(RESET_SESSION_SQL)
+            finally:
+                cursor.close()
+            conn.rollback()
+            return True
+        except pyodbc.Error as e:
+            logger.warning(f"Failed to reset pooled connection: {e}")
+            return False
+
+    def _discard(self, conn):
+        """Close a connection and give its slot back to the pool."""
+        with self._cond:
+            cache = self._statement_caches.pop(id(conn), None)
+        if cache is not None:
+            cache.close()
+        try:
+            conn.close()
+        except pyodbc.Error:
+            pass
+        self._forget()
+
+    def _forget(self):
+        """Release a slot whose connection is gone or was never opened."""
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
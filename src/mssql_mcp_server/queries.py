@@ -0,0 +1,153 @@
+import json
+
+from .catalog import quote_identifier
+
+DEFAULT_LIMIT = 100
+SAMPLE_MODES = ("system", "hash")
+
+# Hash sampling keeps rows whose key hash falls in the first `percent` of this range
+_HASH_BUCKETS = 1_000_000
+
+
+def _parse_limit(value, max_limit):
+    if value is None:
+        return min(DEFAULT_LIMIT, max_limit)
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ValueError(f"Invalid limit: {value}")
+    if limit < 1:
+        raise ValueError(f"Invalid limit: {value}")
+    return min(limit, max_limit)
+
+
+def _parse_columns(table, value, required):
+    """Resolve a comma-separated projection against the table's columns."""
+    if not value:
+        return None
+    names = []
+    for raw in value.split(","):
+        column = table.column(raw.strip())
+        if column is None:
+            raise ValueError(f"Unknown column '{raw.strip()}' in table {table.qualified_name}")
+        if column.name not in names:
+            names.append(column.name)
+    # Key columns are always returned so the caller can continue with ?after=
+    missing = [name for name in required if name not in names]
+    return missing + names
+
+
+def _parse_sample(params):
+    value = params.get("sample")
+    if value is None:
+        return None
+    try:
+        percent = float(value)
+    except ValueError:
+        raise ValueError(f"Invalid sample percentage: {value}")
+    if not 0 < percent <= 100:
+        raise ValueError(f"Sample percentage must be in (0, 100]: {value}")
+    mode = params.get("sample_mode", "system").lower()
+    if mode not in SAMPLE_MODES:
+        raise ValueError(f"Unknown sample_mode: {mode}. Supported modes: {', '.join(SAMPLE_MODES)}")
+    seed = params.get("seed")
+    if seed is not None:
+        try:
+            seed = int(seed)
+        except ValueError:
+            raise ValueError(f"Invalid seed: {seed}")
+    return percent, mode, seed
+
+
+def _parse_after(table, key_columns, value):
+    """Decode the keyset cursor: a JSON array of key values, or one bare value for a single-column key."""
+    if not key_columns:
+        raise ValueError(f"Table {table.qualified_name} has no primary key; 'after' pagination is unavailable")
+    try:
+        values = json.loads(value)
+    except ValueError:
+        # A plain string key such as after=ACME
+        values = value
+    if not isinstance(values, list):
+        values = [values]
+    if len(values) != len(key_columns) or any(isinstance(v, (list, dict)) for v in values):
+        raise ValueError(
+            f"'after' needs {len(key_columns)} value(s) for primary key ({', '.join(key_columns)}), "
+            f"as a JSON array such as {json.dumps(list(range(1, len(key_columns) + 1)))}"
+        )
+    return values
+
+
+def _keyset_predicate(key_columns, values):
+    """Build '(k1 > ?) OR (k1 = ? AND k2 > ?) ...' for a composite key."""
+    clauses = []
+    args = []
+    for i, column in enumerate(key_columns):
+        parts = [f"{quote_identifier(c)} = ?" for c in key_columns[:i]]
+        parts.append(f"{quote_identifier(column)} > ?")
+        clauses.append("(" + " AND ".join(parts) + ")")
+        args.extend(values[:i + 1])
+    return "(" + " OR ".join(clauses) + ")", args
+
+
+def build_table_read(table, params, max_limit=10_000):
+    """Build the SELECT for a table resource read from its URI query parameters.
+
+    Supported parameters:
+      limit        rows to return (default 100, capped at max_limit)
+      columns      comma-separated projection
+      after        primary-key value(s) of the last row already seen, as a JSON
+                   array (or one bare value for a single-column key); the read
+                   continues from there with a keyset seek instead of OFFSET
+      sample       percentage of the table to sample
+      sample_mode  'system' (TABLESAMPLE, page-based, fastest) or 'hash'
+                   (row-level, deterministic by primary key)
+      seed         makes either sampling mode repeatable
+
+    Rows are ordered by the primary key when the table has one, so reads can
+    be continued with `after`. Sampled reads are ordered by the key hash
+    instead, so TOP takes rows from across the whole key range rather than
+    the lowest keys; they cannot be continued with `after`.
+    Returns (sql, parameters).
+    """
+    key_columns = list(table.primary_key)
+    limit = _parse_limit(params.get("limit"), max_limit)
+    columns = _parse_columns(table, params.get("columns"), key_columns)
+    sample = _parse_sample(params)
+
+    projection = ", ".join(quote_identifier(c) for c in columns) if columns else "*"
+    sql = f"SELECT TOP ({limit}) {projection} FROM {table.sql_name}"
+    where = []
+    args = []
+
+    order_by = ", ".join(quote_identifier(c) for c in key_columns)
+    if sample is not None:
+        percent, mode, seed = sample
+        hash_columns = ", ".join(quote_identifier(c) for c in key_columns) or "*"
+        if seed is not None and key_columns:
+            hash_columns += f", {seed}"
+        bucket = f"ABS(CAST(CHECKSUM({hash_columns}) AS BIGINT)) % {_HASH_BUCKETS}"
+        if mode == "system":
+            if table.is_view:
+                raise ValueError(f"View {table.qualified_name} cannot use TABLESAMPLE; use sample_mode=hash")
+            sql += f" TABLESAMPLE SYSTEM ({percent!r} PERCENT)"
+            if seed is not None:
+                sql += f" REPEATABLE ({seed})"
+        else:
+            where.append(f"{bucket} < {int(percent / 100 * _HASH_BUCKETS)}")
+        order_by = bucket
+
+    after = params.get("after")
+    if after is not None:
+        if sample is not None:
+            raise ValueError("'after' cannot be combined with 'sample'; sampled reads are not ordered by key")
+        values = _parse_after(table, key_columns, after)
+        predicate, predicate_args = _keyset_predicate(key_columns, values)
+        where.append(predicate)
+        args.extend(predicate_args)
+
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    if order_by:
+        sql += " ORDER BY " + order_by
+    return sql, args
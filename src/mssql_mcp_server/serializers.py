@@ -0,0 +1,174 @@
+import base64
+import csv
+import datetime
+import decimal
+import io
+import json
+import uuid
+
+DEFAULT_FORMAT = "csv"
+
+SERIALIZERS = {}
+
+
+def register_serializer(cls):
+    """Class decorator that makes a serializer available under its format name."""
+    SERIALIZERS[cls.name] = cls
+    return cls
+
+
+def resolve_format(format_name):
+    """Normalize an output format name, rejecting unknown formats."""
+    format_name = (format_name or DEFAULT_FORMAT).lower()
+    if format_name not in SERIALIZERS:
+        raise ValueError(f"Unknown output format: {format_name}. Supported formats: {', '.join(sorted(SERIALIZERS))}")
+    return format_name
+
+
+def get_serializer(format_name, description):
+    """Create the serializer for an output format and a cursor description."""
+    return SERIALIZERS[resolve_format(format_name)](description)
+
+
+def _none_safe(convert):
+    """Wrap a converter so NULLs pass through untouched."""
+    return lambda value: None if value is None else convert(value)
+
+
+def _binary_to_hex(value):
+    return "0x" + bytes(value).hex()
+
+
+def _isoformat(value):
+    return value.isoformat()
+
+
+class Serializer:
+    """Formats pages of rows described by a pyodbc cursor.description.
+
+    Converters are chosen once per column from the description's type codes,
+    so formatting a page never inspects individual cell types. A converter of
+    None means the column's values can be used as-is.
+    """
+
+    name = None
+    converters_by_type = {}
+
+    def __init__(self, description):
+        self.columns = [column[0] for column in description]
+        self.type_codes = [column[1] for column in description]
+        self.converters = [self._converter_for(type_code) for type_code in self.type_codes]
+
+    def _converter_for(self, type_code):
+        convert = self.converters_by_type.get(type_code)
+        return _none_safe(convert) if convert is not None else None
+
+    def _convert_columns(self, rows):
+        """Transpose rows into per-column lists with converters applied."""
+        if not rows:
+            return [[] for _ in self.columns]
+        return [
+            list(values) if convert is None else list(map(convert, values))
+            for convert, values in zip(self.converters, zip(*rows))
+        ]
+
+    def dumps(self, rows):
+        """Serialize a page of rows (including the header) to a string."""
+        raise NotImplementedError
+
+
+@register_serializer
+class CsvSerializer(Serializer):
+    """RFC 4180 CSV: quoted fields, CRLF line endings, empty field for NULL."""
+
+    name = "csv"
+    converters_by_type = {
+        bytes: _binary_to_hex,
+        bytearray: _binary_to_hex,
+    }
+
+    def dumps(self, rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\r\n")
+        writer.writerow(self.columns)
+        if any(self.converters):
+            writer.writerows(zip(*self._convert_columns(rows)))
+        else:
+            writer.writerows(rows)
+        return buffer.getvalue()
+
+
+@register_serializer
+class ColumnarJsonSerializer(Serializer):
+    """JSON object holding one array per column instead of one object per row.
+
+    Decimals are written as strings so money and numeric columns keep their
+    exact value and scale.
+    """
+
+    name = "json"
+    converters_by_type = {
+        decimal.Decimal: str,
+        datetime.datetime: _isoformat,
+        datetime.date: _isoformat,
+        datetime.time: _isoformat,
+        uuid.UUID: str,
+        bytes: _binary_to_hex,
+        bytearray: _binary_to_hex,
+    }
+
+    def dumps(self, rows):
+        return json.dumps(
+            {
+                "columns": self.columns,
+                "types": [getattr(t, "__name__", str(t)) for t in self.type_codes],
+                "row_count": len(rows),
+                "data": self._convert_columns(rows),
+            },
+            separators=(",", ":"),
+        )
+
+
+@register_serializer
+class ArrowSerializer(Serializer):
+    """Base64-encoded Apache Arrow IPC stream (requires the optional pyarrow package)."""
+
+    name = "arrow"
+    converters_by_type = {
+        uuid.UUID: str,
+        bytearray: bytes,
+    }
+
+    def __init__(self, description):
+        try:
+            import pyarrow
+        except ImportError:
+            raise ValueError("The arrow format requires pyarrow: pip install 'mssql_mcp_server[arrow]'")
+        self._pa = pyarrow
+        super().__init__(description)
+        arrow_types = {
+            bool: pyarrow.bool_(),
+            int: pyarrow.int64(),
+            float: pyarrow.float64(),
+            str: pyarrow.string(),
+            uuid.UUID: pyarrow.string(),
+            bytes: pyarrow.binary(),
+            bytearray: pyarrow.binary(),
+            datetime.datetime: pyarrow.timestamp("us"),
+            datetime.date: pyarrow.date32(),
+            datetime.time: pyarrow.time64("us"),
+        }
+        # Types missing here (e.g. Decimal) are inferred from the data by pyarrow
+        self.arrow_types = [arrow_types.get(type_code) for type_code in self.type_codes]
+
+    def dumps(self, rows):
+        pa = self._pa
+        arrays = [
+            pa.array(values, type=arrow_type)
+            for arrow_type, values in zip(self.arrow_types, self._convert_columns(rows))
+        ]
+        table = pa.Table.from_arrays(arrays, names=self.columns)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return base64.b64encode(sink.getvalue().to_pybytes()).decode("ascii")
@@ -1,11 +1,23 @@
 import asyncio
+import json
 import logging
 import os
+import threading
+from urllib.parse import parse_qs, unquote, urlsplit
 import pyodbc
 from mcp.server import Server
 from mcp.types import Resource, Tool, TextContent
 from pydantic import AnyUrl
 
+from .cache import ResultCache, is_cacheable_query
+from .catalog import SchemaCatalog, describe_table
+from .cursors import CursorRegistry, OpenCursor, fetch_page
+from .executor import QueryCancelledError, QueryExecutor
+from .metrics import MetricsRegistry, start_metrics_server
+from .pool import ConnectionPool
+from .queries import build_table_read
+from .serializers import SERIALIZERS, get_serializer, resolve_format
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -33,37 +45,206 @@ def get_connection_string(config):
     """Create a connection string for pyodbc."""
     return f"DRIVER={{ODBC Driver 17 for SQL Server}};SERVER={config['server']};DATABASE={config['database']};UID={config['user']};PWD={config['password']}"
 
+def get_pool_config():
+    """Get connection pool settings from environment variables."""
+    return {
+        "min_size": int(os.getenv("MSSQL_POOL_MIN_SIZE", "1")),
+        "max_size": int(os.getenv("MSSQL_POOL_MAX_SIZE", "10")),
+        "acquire_timeout": float(os.getenv("MSSQL_POOL_TIMEOUT", "30")),
+        "max_retries": int(os.getenv("MSSQL_CONNECT_RETRIES", "3")),
+        "backoff_base": float(os.getenv("MSSQL_CONNECT_BACKOFF", "0.5")),
+        "statement_cache_size": int(os.getenv("MSSQL_STATEMENT_CACHE_SIZE", "32")),
+    }
+
+def get_executor_config():
+    """Get query executor settings from environment variables."""
+    timeout = float(os.getenv("MSSQL_QUERY_TIMEOUT", "0"))
+    return {
+        "max_concurrency": int(os.getenv("MSSQL_MAX_CONCURRENCY", os.getenv("MSSQL_POOL_MAX_SIZE", "10"))),
+        "query_timeout": timeout or None,
+    }
+
+def get_paging_config():
+    """Get result paging settings from environment variables."""
+    return {
+        "page_size": int(os.getenv("MSSQL_PAGE_SIZE", "1000")),
+        "cursor_ttl": float(os.getenv("MSSQL_CURSOR_TTL", "120")),
+        "max_open_cursors": int(os.getenv("MSSQL_MAX_OPEN_CURSORS", "4")),
+    }
+
+def get_catalog_config():
+    """Get schema catalog settings from environment variables."""
+    return {
+        "refresh_interval": float(os.getenv("MSSQL_CATALOG_REFRESH_INTERVAL", "10")),
+    }
+
+def get_cache_config():
+    """Get result cache settings from environment variables."""
+    return {
+        "max_bytes": int(os.getenv("MSSQL_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+        "ttl": float(os.getenv("MSSQL_CACHE_TTL", "60")),
+    }
+
+def get_resource_config():
+    """Get table resource read limits from environment variables."""
+    return {
+        "max_limit": int(os.getenv("MSSQL_RESOURCE_MAX_ROWS", "10000")),
+    }
+
+def get_metrics_config():
+    """Get Prometheus endpoint settings from environment variables."""
+    return {
+        "port": int(os.getenv("MSSQL_METRICS_PORT", "0")),
+        "host": os.getenv("MSSQL_METRICS_HOST", "127.0.0.1"),
+    }
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Return the shared connection pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(get_connection_string(get_db_config()), **get_pool_config())
+        return _pool
+
+_executor = None
+
+def get_executor():
+    """Return the shared query executor, creating it on first use."""
+    global _executor
+    if _executor is None:
+        _executor = QueryExecutor(get_pool(), metrics=get_metrics(), **get_executor_config())
+    return _executor
+
+_cursors = None
+
+def get_cursor_registry():
+    """Return the registry of open result cursors, creating it on first use."""
+    global _cursors
+    if _cursors is None:
+        paging = get_paging_config()
+        _cursors = CursorRegistry(ttl=paging["cursor_ttl"], max_open=paging["max_open_cursors"])
+    return _cursors
+
+async def _close_cursors(open_cursors):
+    """Close detached statements and return their connections to the pool."""
+    for open_cursor in open_cursors:
+        try:
+            await get_executor().call(open_cursor.statement.close)
+        except Exception as e:
+            logger.warning(f"Failed to close cursor {open_cursor.token}: {str(e)}")
+
+async def _expire_cursors_periodically(interval):
+    """Background task that closes cursors abandoned by clients."""
+    while True:
+        await asyncio.sleep(interval)
+        expired = get_cursor_registry().pop_expired()
+        if expired:
+            logger.info(f"Closing {len(expired)} expired cursor(s)")
+            await _close_cursors(expired)
+
+async def _page_response(text, open_cursor):
+    """Build the tool response for a page, registering the cursor if rows remain."""
+    contents = [TextContent(type="text", text=text)]
+    if open_cursor is None:
+        return contents
+    token, evicted = get_cursor_registry().put(open_cursor)
+    if evicted:
+        await _close_cursors(evicted)
+    contents.append(TextContent(
+        type="text",
+        text=f"More rows available. Call fetch_next_page with continuation_token: {token}"
+    ))
+    return contents
+
+_result_cache = None
+
+def get_result_cache():
+    """Return the shared read-query result cache, creating it on first use."""
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = ResultCache(**get_cache_config())
+    return _result_cache
+
+CACHE_STATS_URI = "mssql://_cache/stats"
+METRICS_URI = "mssql://_metrics"
+
+_metrics = None
+
+def get_metrics():
+    """Return the shared metrics registry, creating it on first use."""
+    global _metrics
+    if _metrics is None:
+        _metrics = MetricsRegistry()
+        # Gauges only report components that already exist
+        _metrics.register_gauges("pool", lambda: _pool.stats() if _pool is not None else {})
+        _metrics.register_gauges("cache", lambda: _result_cache.stats() if _result_cache is not None else {})
+        _metrics.register_gauges("cursors", lambda: {"open": len(_cursors) if _cursors is not None else 0})
+    return _metrics
+
+def _resource_operation(uri_str):
+    """Name a resource for metrics without one series per table."""
+    if uri_str == CACHE_STATS_URI:
+        return "_cache/stats"
+    if uri_str == METRICS_URI:
+        return "_metrics"
+    return "table_data"
+
+_catalog = None
+_catalog_lock = asyncio.Lock()
+
+def get_catalog():
+    """Return the shared schema catalog without refreshing it."""
+    global _catalog
+    if _catalog is None:
+        _catalog = SchemaCatalog(**get_catalog_config())
+    return _catalog
+
+async def current_catalog():
+    """Return the schema catalog, reloading it first if the schema has changed."""
+    catalog = get_catalog()
+    if catalog.is_stale():
+        async with _catalog_lock:
+            if catalog.is_stale():
+                await get_executor().run(lambda statement: catalog.refresh(statement.cursor))
+    return catalog
+
 # Initialize server
 app = Server("mssql_mcp_server")
 
 @app.list_resources()
 async def list_resources() -> list[Resource]:
-    """List SQL Server tables as resources."""
-    config = get_db_config()
+    """List SQL Server tables and views as resources."""
     try:
-        conn = pyodbc.connect(get_connection_string(config))
-        cursor = conn.cursor()
-        # Query to get user tables from the current database
-        cursor.execute("""
-            SELECT TABLE_NAME 
-            FROM INFORMATION_SCHEMA.TABLES 
-            WHERE TABLE_TYPE = 'BASE TABLE'
-        """)
-        tables = cursor.fetchall()
-        logger.info(f"Found tables: {tables}")
+        with get_metrics().track("resource", "list_resources"):
+            tables = (await current_catalog()).tables()
+        logger.info(f"Found {len(tables)} tables")
         
-        resources = []
+        resources = [
+            Resource(
+                uri=CACHE_STATS_URI,
+                name="Result cache statistics",
+                mimeType="application/json",
+                description="Hit, miss and eviction counters of the read-query result cache"
+            ),
+            Resource(
+                uri=METRICS_URI,
+                name="Server metrics",
+                mimeType="application/json",
+                description="Per-phase latencies (acquire, execute, fetch, serialize), row and byte counts, pool and cache statistics"
+            )
+        ]
         for table in tables:
             resources.append(
                 Resource(
-                    uri=f"mssql://{table[0]}/data",
-                    name=f"Table: {table[0]}",
+                    uri=f"mssql://{table.resource_name}/data",
+                    name=f"{table.kind}: {table.resource_name}",
                     mimeType="text/plain",
-                    description=f"Data in table: {table[0]}"
+                    description=f"Data in {table.kind.lower()}: {table.qualified_name}"
                 )
             )
-        cursor.close()
-        conn.close()
         return resources
     except Exception as e:
         logger.error(f"Failed to list resources: {str(e)}")
@@ -71,31 +252,55 @@ async def list_resources() -> list[Resource]:
 
 @app.read_resource()
 async def read_resource(uri: AnyUrl) -> str:
-    """Read table contents."""
-    config = get_db_config()
+    """Read table contents.
+    
+    mssql://<table>/data accepts limit, columns, after (keyset pagination on
+    the primary key), sample/sample_mode/seed and format query parameters.
+    """
     uri_str = str(uri)
     logger.info(f"Reading resource: {uri_str}")
     
     if not uri_str.startswith("mssql://"):
         raise ValueError(f"Invalid URI scheme: {uri_str}")
+    
+    metrics = get_metrics()
+    operation = _resource_operation(uri_str)
+    with metrics.track("resource", operation):
+        text = await _read_resource(uri_str)
+    metrics.increment("resource", operation, "bytes", len(text))
+    return text
+
+async def _read_resource(uri_str):
+    """Read a resource whose URI has already been validated."""
+    if uri_str == CACHE_STATS_URI:
+        return json.dumps(get_result_cache().stats())
+    if uri_str == METRICS_URI:
+        return json.dumps(get_metrics().snapshot())
         
-    parts = uri_str[8:].split('/')
-    table = parts[0]
+    parts = urlsplit(uri_str)
+    table_name = unquote(parts.netloc)
+    params = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+    output_format = resolve_format(params.get("format"))
+    
+    table = (await current_catalog()).get_table(table_name)
+    if table is None:
+        raise ValueError(f"Table not found: {table_name}")
+    query, query_params = build_table_read(table, params, **get_resource_config())
+    
+    def read_table(statement):
+        cursor = statement.execute(query, query_params)
+        serializer = get_serializer(output_format, cursor.description)
+        with statement.timed("fetch"):
+            rows = cursor.fetchall()
+        get_metrics().increment("resource", "table_data", "rows", len(rows))
+        with statement.timed("serialize"):
+            return serializer.dumps(rows)
     
     try:
-        conn = pyodbc.connect(get_connection_string(config))
-        cursor = conn.cursor()
-        # Use TOP 100 for MSSQL (equivalent to LIMIT in MySQL)
-        cursor.execute(f"SELECT TOP 100 * FROM {table}")
-        columns = [column[0] for column in cursor.description]
-        rows = cursor.fetchall()
-        result = [",".join(map(str, row)) for row in rows]
-        cursor.close()
-        conn.close()
-        return "\n".join([",".join(columns)] + result)
+        return await get_executor().run(read_table, operation=("resource", "table_data"))
                 
     except Exception as e:
-        logger.error(f"Database error reading resource {uri}: {str(e)}")
+        logger.error(f"Database error reading resource {uri_str}: {str(e)}")
         raise RuntimeError(f"Database error: {str(e)}")
 
 @app.list_tools()
@@ -112,61 +317,310 @@ async def list_tools() -> list[Tool]:
                     "query": {
                         "type": "string",
                         "description": "The SQL query to execute"
+                    },
+                    "params": {
+                        "type": "array",
+                        "description": "Values bound to the ? placeholders in query, in order"
+                    },
+                    "timeout": {
+                        "type": "number",
+                        "description": "Optional statement timeout in seconds"
+                    },
+                    "page_size": {
+                        "type": "integer",
+                        "description": "Maximum rows returned per page; remaining rows are fetched with fetch_next_page"
+                    },
+                    "format": {
+                        "type": "string",
+                        "enum": sorted(SERIALIZERS),
+                        "description": "Output format: csv (RFC 4180), json (one array per column) or arrow (base64 Arrow IPC stream)"
+                    },
+                    "bypass_cache": {
+                        "type": "boolean",
+                        "description": "Run the query even if a cached result exists"
                     }
                 },
                 "required": ["query"]
             }
+        ),
+        Tool(
+            name="fetch_next_page",
+            description="Fetch the next page of rows from a previous execute_sql result",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "continuation_token": {
+                        "type": "string",
+                        "description": "The continuation token returned with the previous page"
+                    },
+                    "page_size": {
+                        "type": "integer",
+                        "description": "Maximum rows returned in this page"
+                    }
+                },
+                "required": ["continuation_token"]
+            }
+        ),
+        Tool(
+            name="describe_table",
+            description="Describe a table's or view's columns, types, primary key and indexes from the cached schema catalog",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "table": {
+                        "type": "string",
+                        "description": "Table name, optionally schema-qualified (e.g. dbo.Transactions)"
+                    }
+                },
+                "required": ["table"]
+            }
+        ),
+        Tool(
+            name="execute_sql_batch",
+            description=(
+                "Execute several statements, or one parameterized statement with many parameter rows, "
+                "on one connection in a single transaction"
+            ),
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "statements": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "SQL statements to run in order"
+                    },
+                    "statement": {
+                        "type": "string",
+                        "description": "A parameterized statement using ? placeholders, run once per row of params"
+                    },
+                    "params": {
+                        "type": "array",
+                        "items": {"type": "array"},
+                        "description": "Parameter rows for statement, one array of values per execution"
+                    },
+                    "timeout": {
+                        "type": "number",
+                        "description": "Optional timeout in seconds for the whole batch"
+                    }
+                }
+            }
         )
     ]
 
 @app.call_tool()
 async def call_tool(name: str, arguments: dict) -> list[TextContent]:
     """Execute SQL commands."""
-    config = get_db_config()
     logger.info(f"Calling tool: {name} with arguments: {arguments}")
     
-    if name != "execute_sql":
+    handler = {
+        "execute_sql": execute_sql,
+        "fetch_next_page": fetch_next_page,
+        "describe_table": describe_table_tool,
+        "execute_sql_batch": execute_sql_batch,
+    }.get(name)
+    if handler is None:
         raise ValueError(f"Unknown tool: {name}")
-    
+    metrics = get_metrics()
+    with metrics.track("tool", name):
+        contents = await handler(arguments)
+    metrics.increment("tool", name, "bytes", sum(len(content.text) for content in contents))
+    return contents
+
+async def execute_sql(arguments: dict) -> list[TextContent]:
+    """Execute a single SQL statement, paging SELECT results."""
     query = arguments.get("query")
     if not query:
         raise ValueError("Query is required")
     
-    try:
-        conn = pyodbc.connect(get_connection_string(config))
-        cursor = conn.cursor()
-        cursor.execute(query)
+    params = arguments.get("params") or []
+    if not isinstance(params, list) or not all(
+        value is None or isinstance(value, (str, int, float, bool)) for value in params
+    ):
+        raise ValueError("params must be an array of scalar values")
+    
+    config = get_db_config()
+    page_size = int(arguments.get("page_size") or get_paging_config()["page_size"])
+    output_format = resolve_format(arguments.get("format"))
+    
+    cache = get_result_cache()
+    use_cache = cache.enabled and not arguments.get("bypass_cache") and is_cacheable_query(query)
+    if use_cache:
+        cache_key = cache.make_key(config["database"], query, params, format=output_format, page_size=page_size)
+        cached = cache.get(cache_key)
+        if cached is not None:
+            logger.info("Serving query result from cache")
+            return [TextContent(type="text", text=cached)]
+    
+    def execute(statement):
+        cursor = statement.execute(query, params)
         
         # Special handling for table listing
         if query.strip().upper().startswith("SELECT") and "INFORMATION_SCHEMA.TABLES" in query.upper():
             tables = cursor.fetchall()
             result = ["Tables_in_" + config["database"]]  # Header
             result.extend([table[0] for table in tables])
-            cursor.close()
-            conn.close()
-            return [TextContent(type="text", text="\n".join(result))]
+            return "\n".join(result), None
         
-        # Regular SELECT queries
+        # Regular SELECT queries, streamed one page at a time
         elif query.strip().upper().startswith("SELECT"):
-            columns = [column[0] for column in cursor.description]
-            rows = cursor.fetchall()
-            result = [",".join(map(str, row)) for row in rows]
-            cursor.close()
-            conn.close()
-            return [TextContent(type="text", text="\n".join([",".join(columns)] + result))]
+            if not is_cacheable_query(query):
+                # SELECT ... INTO, or a batch that also writes or runs DDL
+                get_catalog().invalidate()
+                cache.invalidate()
+            serializer = get_serializer(output_format, cursor.description)
+            with statement.timed("fetch"):
+                rows, carry = fetch_page(cursor, page_size)
+            get_metrics().increment("tool", "execute_sql", "rows", len(rows))
+            with statement.timed("serialize"):
+                text = serializer.dumps(rows)
+            if carry is None:
+                return text, None
+            # Keep the cursor open so fetch_next_page can continue from here
+            statement.detach()
+            return text, OpenCursor(statement, serializer, carry)
         
         # Non-SELECT queries
         else:
-            conn.commit()
+            statement.connection.commit()
+            # The statement may have been DDL; re-check the schema on next use
+            get_catalog().invalidate()
+            cache.invalidate()
             affected_rows = cursor.rowcount
-            cursor.close()
-            conn.close()
-            return [TextContent(type="text", text=f"Query executed successfully. Rows affected: {affected_rows}")]
-                
+            return f"Query executed successfully. Rows affected: {affected_rows}", None
+    
+    try:
+        text, open_cursor = await get_executor().run(
+            execute,
+            timeout=arguments.get("timeout"),
+            operation=("tool", "execute_sql")
+        )
+        # Only complete results are cached; paged results depend on an open cursor
+        if use_cache and open_cursor is None:
+            cache.put(cache_key, text)
+        return await _page_response(text, open_cursor)
     except Exception as e:
         logger.error(f"Error executing SQL '{query}': {e}")
+        get_metrics().increment("tool", "execute_sql", "errors")
         return [TextContent(type="text", text=f"Error executing query: {str(e)}")]
 
+async def execute_sql_batch(arguments: dict) -> list[TextContent]:
+    """Run a batch of statements in one transaction with a single commit."""
+    statements = arguments.get("statements")
+    statement_sql = arguments.get("statement")
+    parameter_rows = arguments.get("params")
+    
+    if statements and statement_sql:
+        raise ValueError("Provide either statements or statement with params, not both")
+    if statement_sql:
+        if not isinstance(statement_sql, str):
+            raise ValueError("statement must be a string")
+        if not isinstance(parameter_rows, list) or not parameter_rows or not all(
+            isinstance(row, list) and all(value is None or isinstance(value, (str, int, float, bool)) for value in row)
+            for row in parameter_rows
+        ):
+            raise ValueError("params must be a non-empty list of parameter rows of scalar values")
+    elif not statements:
+        raise ValueError("statements or statement with params is required")
+    elif not isinstance(statements, list) or not all(isinstance(sql, str) and sql.strip() for sql in statements):
+        # A bare string would otherwise run one statement per character
+        raise ValueError("statements must be an array of non-empty SQL strings")
+    
+    def run_batch(statement):
+        conn = statement.connection
+        cursor = statement.cursor
+        lines = []
+        try:
+            if statement_sql:
+                # Sends all parameter rows to the server in bulk instead of one round trip per row
+                cursor.fast_executemany = True
+                cursor.executemany(statement_sql, parameter_rows)
+                affected = cursor.rowcount if cursor.rowcount >= 0 else "unknown"
+                lines.append(f"Statement executed for {len(parameter_rows)} parameter rows. Rows affected: {affected}")
+            else:
+                for i, sql in enumerate(statements, start=1):
+                    try:
+                        cursor.execute(sql)
+                    except pyodbc.Error as e:
+                        raise RuntimeError(f"Statement {i} failed: {e}") from e
+                    lines.append(f"Statement {i}: rows affected: {cursor.rowcount}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            get_catalog().invalidate()
+            get_result_cache().invalidate()
+        return "Batch committed in one transaction.\n" + "\n".join(lines)
+    
+    try:
+        text = await get_executor().run(
+            run_batch,
+            timeout=arguments.get("timeout"),
+            operation=("tool", "execute_sql_batch")
+        )
+        return [TextContent(type="text", text=text)]
+    except Exception as e:
+        logger.error(f"Error executing SQL batch: {e}")
+        get_metrics().increment("tool", "execute_sql_batch", "errors")
+        return [TextContent(type="text", text=f"Error executing batch, all statements were rolled back: {str(e)}")]
+
+async def describe_table_tool(arguments: dict) -> list[TextContent]:
+    """Describe a table from the schema catalog."""
+    table_name = arguments.get("table")
+    if not table_name:
+        raise ValueError("table is required")
+    
+    table = (await current_catalog()).get_table(table_name)
+    if table is None:
+        return [TextContent(type="text", text=f"Table not found: {table_name}")]
+    return [TextContent(type="text", text=describe_table(table))]
+
+async def fetch_next_page(arguments: dict) -> list[TextContent]:
+    """Fetch the next page of rows from an open result cursor."""
+    token = arguments.get("continuation_token")
+    if not token:
+        raise ValueError("continuation_token is required")
+    page_size = int(arguments.get("page_size") or get_paging_config()["page_size"])
+    
+    open_cursor = get_cursor_registry().take(token)
+    statement = open_cursor.statement
+    
+    metrics = get_metrics()
+    
+    def next_page():
+        # The statement is closed here on the worker once the fetch is over, never
+        # from the event loop: a timed-out caller returns while the fetch may
+        # still be using the connection
+        try:
+            if statement.cancelled:
+                raise QueryCancelledError("Statement was cancelled before the fetch started")
+            with metrics.timer("tool", "fetch_next_page", "fetch"):
+                rows, carry = fetch_page(statement.cursor, page_size, open_cursor.carry)
+            metrics.increment("tool", "fetch_next_page", "rows", len(rows))
+            with metrics.timer("tool", "fetch_next_page", "serialize"):
+                text = open_cursor.serializer.dumps(rows)
+        except BaseException:
+            statement.close(keep_prepared=False)
+            raise
+        if carry is None or statement.cancelled:
+            statement.close()
+        return text, carry
+    
+    try:
+        text, open_cursor.carry = await get_executor().call(
+            next_page,
+            timeout=get_executor().query_timeout,
+            on_cancel=statement.cancel
+        )
+    except Exception as e:
+        logger.error(f"Error fetching next page for cursor {token}: {e}")
+        metrics.increment("tool", "fetch_next_page", "errors")
+        return [TextContent(type="text", text=f"Error fetching next page: {str(e)}")]
+    
+    if open_cursor.carry is None:
+        return await _page_response(text, None)
+    return await _page_response(text, open_cursor)
+
 async def main():
     """Main entry point to run the MCP server."""
     from mcp.server.stdio import stdio_server
@@ -175,6 +629,22 @@ async def main():
     config = get_db_config()
     logger.info(f"Database config: {config['server']}/{config['database']} as {config['user']}")
     
+    pool = get_pool()
+    executor = get_executor()
+    try:
+        await executor.call(pool.warm_up)
+    except pyodbc.Error as e:
+        # Keep serving; connections are retried lazily when tools are called
+        logger.warning(f"Connection pool warm-up failed: {str(e)}")
+    
+    paging = get_paging_config()
+    sweeper = asyncio.create_task(_expire_cursors_periodically(max(1.0, paging["cursor_ttl"] / 4)))
+    
+    metrics_config = get_metrics_config()
+    metrics_server = None
+    if metrics_config["port"]:
+        metrics_server = start_metrics_server(get_metrics(), metrics_config["port"], metrics_config["host"])
+    
     async with stdio_server() as (read_stream, write_stream):
         try:
             await app.run(
@@ -185,6 +655,13 @@ async def main():
         except Exception as e:
             logger.error(f"Server error: {str(e)}", exc_info=True)
             raise
+        finally:
+            sweeper.cancel()
+            if metrics_server is not None:
+                metrics_server.shutdown()
+            await _close_cursors(get_cursor_registry().clear())
+            executor.shutdown()
+            pool.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,64 @@
+import asyncio
+import json
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Tuple
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Encode one server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def natural_query_events(
+    question: str,
+    assistant,
+    execute_batches: Callable[[str], Iterator[List[Dict]]],
+    run_blocking: Callable = asyncio.to_thread,
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """Run the natural-language pipeline, yielding (event, payload) pairs as each stage produces output.
+
+    Events, in order:
+      sql       {"sql_query": ...} as soon as the SQL has been generated
+      rows      {"rows": [...]} for each batch fetched from the database
+      analysis  {"text": ...} for each chunk of the streamed analysis
+      done      {"row_count": ..., "truncated": ...}
+    An "error" event with {"error": ...} ends the stream early.
+
+    execute_batches(sql) runs the query and returns a blocking iterator of
+    row batches; the call and each batch fetch go through run_blocking so
+    the event loop stays free, and a failure in either is an error event. If
+    the iterator has a truncated attribute (a row or byte limit stopped the
+    fetch early), it is reported in the done event.
+    """
+    try:
+        sql_query = await assistant.agenerate_sql_query(question)
+    except Exception as e:
+        yield "error", {"error": str(e)}
+        return
+    yield "sql", {"sql_query": sql_query}
+
+    results: List[Dict] = []
+    batches = None
+    try:
+        batches = await run_blocking(execute_batches, sql_query)
+        while True:
+            batch = await run_blocking(next, batches, None)
+            if batch is None:
+                break
+            results.extend(batch)
+            yield "rows", {"rows": batch}
+    except Exception as e:
+        yield "error", {"error": f"Failed to execute query: {e}"}
+        return
+    finally:
+        # Releases the cursor and connection if the client went away mid-fetch
+        close = getattr(batches, "close", None)
+        if close is not None:
+            await run_blocking(close)
+
+    try:
+        async for text in assistant.astream_analysis(question, results):
+            yield "analysis", {"text": text}
+    except Exception as e:
+        yield "error", {"error": f"Failed to analyze results: {e}"}
+        return
+    yield "done", {"row_count": len(results), "truncated": bool(getattr(batches, "truncated", False))}
@@ -1,148 +1,204 @@
 import re
-from typing import Dict, List, Optional
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from schema_index import tokenize
+from translation_cache import normalize_question
+
+NGRAM_SIZE = 3
+# Phrases that mean "every column" in list/show/get questions
+_ALL_COLUMNS = {"", "*", "all", "all column", "column", "data", "all data", "everything", "record", "row", "all record", "all row"}
+# Counted nouns that stand for any row of the table ("count of records in Transactions")
+_ANY_ROW = {"record", "row", "entry", "item", "all record", "all row", "all entry", "all item"}
+
+_COUNT = r"(?:(?:get|give\s+me|what\s+is)\s+)?(?:the\s+)?(?:count(?:\s+of)?(?:\s+all)?|how\s+many|number\s+of)"
+_SELECT = r"(?:list|show|get)(?:\s+me)?(?:\s+all)?"
+
+
+def _table(group: str) -> str:
+    return rf"(?:the\s+)?(?P<{group}>.+?)(?:\s+table)?"
+
+
+# One alternative per question shape, tried in order as a single compiled
+# regex; match.lastgroup names the shape that matched.
+_PATTERNS = [
+    ("count_in", rf"{_COUNT}\s+(?P<count_in_noun>.+?)\s+(?:are\s+)?(?:in|from)\s+{_table('count_in_table')}"),
+    ("count", rf"{_COUNT}\s+{_table('count_table')}(?:\s+(?:are\s+there|do\s+we\s+have|exist|records|rows))?"),
+    ("distinct", (
+        r"what\s+are\s+the\s+(?:unique\s+|distinct\s+)?(?:values\s+(?:in|of)\s+)?(?P<distinct_column>.+?)"
+        rf"(?:\s+values)?\s+(?:in|from)\s+{_table('distinct_table')}"
+    )),
+    ("select", rf"{_SELECT}\s+(?P<select_columns>.+?)\s+from\s+{_table('select_table')}"),
+    ("select_all", rf"{_SELECT}\s+{_table('select_all_table')}"),
+]
+_DISPATCHER = re.compile("|".join(f"(?P<{intent}>{pattern})" for intent, pattern in _PATTERNS))
+_COLUMN_SEPARATOR = re.compile(r"\s*,\s*(?:and\s+)?|\s+and\s+")
+
+
+def _normalize(name: str) -> str:
+    """Stemmed words of a name or phrase run together: "customer names" and "CustomerName" both give "customername"."""
+    return "".join(tokenize(name)) or name.strip().lower()
+
+
+def _ngrams(key: str) -> set:
+    padded = f"#{key}#"
+    return {padded[i:i + NGRAM_SIZE] for i in range(max(len(padded) - NGRAM_SIZE + 1, 1))}
+
+
+def _quote(name: str) -> str:
+    return "[" + name.replace("]", "]]") + "]"
+
+
+class NameIndex:
+    """Trigram index over table or column names for fuzzy lookup without scanning every name.
+
+    An exact match of the normalized name scores 1.0; otherwise the score is
+    the Dice coefficient of the trigram sets of the best candidate.
+    """
+
+    def __init__(self, names: Iterable[str]):
+        self.names = list(names)
+        self._exact: Dict[str, str] = {}
+        self._sizes: List[int] = []
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        for i, name in enumerate(self.names):
+            key = _normalize(name)
+            self._exact.setdefault(key, name)
+            grams = _ngrams(key)
+            self._sizes.append(len(grams))
+            for gram in grams:
+                self._postings[gram].append(i)
+
+    def lookup(self, text: str) -> Tuple[Optional[str], float]:
+        """Return the best matching name and its score, or (None, 0.0)."""
+        key = _normalize(text)
+        exact = self._exact.get(key)
+        if exact is not None:
+            return exact, 1.0
+        grams = _ngrams(key)
+        overlap = Counter()
+        for gram in grams:
+            overlap.update(self._postings.get(gram, ()))
+        if not overlap:
+            return None, 0.0
+        best, score = max(
+            ((i, 2.0 * shared / (len(grams) + self._sizes[i])) for i, shared in overlap.items()),
+            key=lambda candidate: (candidate[1], -candidate[0])
+        )
+        return self.names[best], score
+
+
+class Translation(NamedTuple):
+    sql: str
+    intent: str
+    # Lowest match score of the table and columns the SQL refers to
+    confidence: float
+
 
 class NaturalLanguageToSQL:
-    def __init__(self):
+    """Rule-based translation of simple count, list and distinct questions.
+
+    Questions are matched against one precompiled dispatcher and names are
+    resolved through trigram indexes, so a question costs the same on a
+    schema of 50 or 5,000 columns. Translations at or above min_confidence
+    can be answered without the LLM. Queries that return rows are capped
+    with TOP (max_rows), as the LLM is asked to do; 0 leaves them unbounded.
+    """
+
+    def __init__(self, min_confidence: float = 0.85, max_rows: int = 1000):
         self.table_info: Dict[str, List[str]] = {}
-        self.common_patterns = {
-            r'list all (.*) from (.*)': lambda match: self._format_select_query(match.group(1), match.group(2)),
-            r'show all (.*) from (.*)': lambda match: self._format_select_query(match.group(1), match.group(2)),
-            r'get all (.*) from (.*)': lambda match: self._format_select_query(match.group(1), match.group(2)),
-            r'count (.*) in (.*)': lambda match: f"SELECT COUNT(*) FROM {self._format_table_name(match.group(2))}",
-            r'what are the (.*) in (.*)': lambda match: f"SELECT DISTINCT {self._format_column_name(match.group(1))} FROM {self._format_table_name(match.group(2))}",
-            r'how many (.*) in (.*)': lambda match: f"SELECT COUNT(*) FROM {self._format_table_name(match.group(2))}",
-            r'list (.*) from (.*)': lambda match: self._format_select_query(match.group(1), match.group(2)),
-            r'show (.*) from (.*)': lambda match: self._format_select_query(match.group(1), match.group(2)),
-            r'get (.*) from (.*)': lambda match: self._format_select_query(match.group(1), match.group(2)),
-        }
-
-    def _format_table_name(self, table_name: str) -> str:
-        """Format table name for SQL query."""
-        # Clean the table name
-        table_name = table_name.strip().lower()
-        
-        # Find the best matching table name from our known tables
-        best_match = None
-        best_score = 0
-        
-        for known_table in self.table_info.keys():
-            # Simple matching: check if the input is a substring of the table name
-            # or if the table name is a substring of the input
-            score = 0
-            if table_name in known_table.lower():
-                score = len(table_name) / len(known_table)
-            elif known_table.lower() in table_name:
-                score = len(known_table) / len(table_name)
-            
-            if score > best_score:
-                best_score = score
-                best_match = known_table
-        
-        # If we found a good match, use it
-        if best_match and best_score > 0.5:
-            return best_match
-        
-        # If no good match found, try to find a table that contains the input
-        for known_table in self.table_info.keys():
-            if table_name in known_table.lower():
-                return known_table
-        
-        # If still no match, return the original table name with proper formatting
-        return f'[{table_name}]'
-
-    def _format_column_name(self, column_name: str) -> str:
-        """Format column name for SQL query."""
-        # Clean the column name
-        column_name = column_name.strip().lower()
-        
-        # If the column name is "all" or empty, return *
-        if column_name == 'all' or not column_name:
-            return '*'
-        
-        # Find the best matching column name from our known columns
-        best_match = None
-        best_score = 0
-        
-        for table_name, columns in self.table_info.items():
-            for known_column in columns:
-                # Simple matching: check if the input is a substring of the column name
-                # or if the column name is a substring of the input
-                score = 0
-                if column_name in known_column.lower():
-                    score = len(column_name) / len(known_column)
-                elif known_column.lower() in column_name:
-                    score = len(known_column) / len(column_name)
-                
-                if score > best_score:
-                    best_score = score
-                    best_match = known_column
-        
-        # If we found a good match, use it
-        if best_match and best_score > 0.5:
-            return best_match
-        
-        # If no good match found, return the original column name with proper formatting
-        return f'[{column_name}]'
-
-    def _format_select_query(self, columns: str, table: str) -> str:
-        """Format a SELECT query with proper column and table names."""
-        table_name = self._format_table_name(table)
-        
-        # If columns is "all" or empty, use *
-        if columns.strip().lower() == 'all' or not columns.strip():
-            return f"SELECT * FROM {table_name}"
-        
-        # If we have table info and the table exists, validate columns
-        if table_name in self.table_info:
-            available_columns = self.table_info[table_name]
-            # Split columns by comma and clean them
-            requested_columns = [self._format_column_name(col.strip()) for col in columns.split(',')]
-            # Filter out invalid columns
-            valid_columns = [col for col in requested_columns if col == '*' or col in available_columns]
-            if valid_columns:
-                return f"SELECT {', '.join(valid_columns)} FROM {table_name}"
-        
-        # If no valid columns found, use *
-        return f"SELECT * FROM {table_name}"
+        self.min_confidence = min_confidence
+        self.max_rows = max_rows
+        self._tables: Optional[NameIndex] = None
+        self._columns: Dict[str, NameIndex] = {}
+
+    def load_schema(self, table_info: Dict[str, List[str]]):
+        """Replace all table information, e.g. with a schema snapshot's table_info()."""
+        if table_info is self.table_info:
+            return
+        self.table_info = table_info
+        self._tables = None
+        self._columns = {}
 
     def update_table_info(self, table_name: str, columns: List[str]):
         """Update the table information for better query generation."""
         self.table_info[table_name] = columns
+        self._tables = None
+        self._columns.pop(table_name, None)
+
+    def _table(self, text: str) -> Tuple[Optional[str], float]:
+        if self._tables is None:
+            self._tables = NameIndex(self.table_info)
+        return self._tables.lookup(text)
+
+    def _column(self, table: str, text: str) -> Tuple[Optional[str], float]:
+        index = self._columns.get(table)
+        if index is None:
+            index = self._columns[table] = NameIndex(self.table_info.get(table, ()))
+        return index.lookup(text)
+
+    def _select(self, columns: str, table: str, distinct: bool = False) -> str:
+        top = f"TOP ({self.max_rows}) " if self.max_rows else ""
+        return f"SELECT {'DISTINCT ' if distinct else ''}{top}{columns} FROM {_quote(table)};"
+
+    def translate(self, natural_language: str) -> Optional[Translation]:
+        """Translate a question into SQL with a confidence score, or None if no rule applies."""
+        match = _DISPATCHER.fullmatch(normalize_question(natural_language))
+        if match is None:
+            return None
+        intent = match.lastgroup
+        table, confidence = self._table(match.group(f"{intent}_table"))
+        if table is None:
+            return None
+
+        if intent == "count_in" and " ".join(tokenize(match.group("count_in_noun"))) not in _ANY_ROW:
+            # "How many transactions are from customers?" counts one table filtered
+            # by another; only a noun naming the same table is a plain count
+            noun_table, score = self._table(match.group("count_in_noun"))
+            if noun_table != table:
+                return None
+            confidence = min(confidence, score)
+        if intent in ("count", "count_in"):
+            return Translation(f"SELECT COUNT(*) AS [count] FROM {_quote(table)};", "count", confidence)
+        if intent == "distinct":
+            column, score = self._column(table, match.group("distinct_column"))
+            if column is None:
+                return None
+            return Translation(self._select(_quote(column), table, distinct=True), "distinct", min(confidence, score))
+
+        requested = match.group("select_columns") if intent == "select" else ""
+        if " ".join(tokenize(requested)) in _ALL_COLUMNS:
+            return Translation(self._select("*", table), "select", confidence)
+        columns = []
+        for part in _COLUMN_SEPARATOR.split(requested):
+            column, score = self._column(table, part)
+            if column is None:
+                return None
+            columns.append(column)
+            confidence = min(confidence, score)
+        return Translation(self._select(", ".join(map(_quote, dict.fromkeys(columns))), table), "select", confidence)
+
+    def confident_sql(self, natural_language: str) -> Optional[str]:
+        """SQL for the question if a rule matches it with at least min_confidence, otherwise None."""
+        translation = self.translate(natural_language)
+        if translation is None or translation.confidence < self.min_confidence:
+            return None
+        return translation.sql
 
     def convert_to_sql(self, natural_language: str) -> Optional[str]:
-        """Convert natural language to SQL query."""
-        natural_language = natural_language.lower().strip()
-        
-        # Try to match against common patterns
-        for pattern, converter in self.common_patterns.items():
-            match = re.match(pattern, natural_language)
-            if match:
-                return converter(match)
-        
-        # If no pattern matches, try to generate a basic SELECT query
-        words = natural_language.split()
-        if len(words) >= 3 and words[0] in ['list', 'show', 'get']:
-            # Try to extract table name (usually the last word)
-            table_name = self._format_table_name(words[-1])
-            if table_name in self.table_info:
-                # If we have table info, use all columns
-                columns = ', '.join(self.table_info[table_name])
-                return f"SELECT {columns} FROM {table_name}"
-            else:
-                # Otherwise use wildcard
-                return f"SELECT * FROM {table_name}"
-        
-        return None
+        """Convert natural language to SQL query, however weak the name matches."""
+        translation = self.translate(natural_language)
+        return None if translation is None else translation.sql
 
     def get_suggested_query(self, natural_language: str) -> str:
         """Get a suggested SQL query based on the natural language input."""
         sql = self.convert_to_sql(natural_language)
         if sql:
             return sql
-        
+
         # If no conversion is possible, return a helpful message
         return "Could not convert to SQL. Please try one of these formats:\n" + \
                "- List all columns from table_name\n" + \
                "- Show all data from table_name\n" + \
                "- Get count of records in table_name\n" + \
-               "- What are the unique values in column_name from table_name" 
\ No newline at end of file
+               "- What are the unique values in column_name from table_name"
@@ -0,0 +1,167 @@
+import math
+import os
+from typing import Any, Dict, List, Optional, Union
+
+from columnar import ColumnarResult, converters_for, dumps
+
+DEFAULT_MAX_ROWS = 10_000
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+DEFAULT_STATEMENT_TIMEOUT = 30.0
+DEFAULT_LOCK_TIMEOUT = 5.0
+
+
+class QueryLimits:
+    """Caps on how much a web query may fetch and how long it may run.
+
+    max_rows and max_bytes bound the result returned to the client; the
+    statement timeout bounds execution and the lock timeout bounds how long
+    the statement waits on another session's locks. 0 disables a limit.
+    """
+
+    def __init__(
+        self,
+        max_rows: int = DEFAULT_MAX_ROWS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        statement_timeout: float = DEFAULT_STATEMENT_TIMEOUT,
+        lock_timeout: float = DEFAULT_LOCK_TIMEOUT,
+    ):
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.statement_timeout = statement_timeout
+        self.lock_timeout = lock_timeout
+
+    @classmethod
+    def from_env(cls, endpoint: Optional[str] = None, **defaults) -> "QueryLimits":
+        """Read MSSQL_WEB_<ENDPOINT>_<LIMIT>, falling back to MSSQL_WEB_<LIMIT> and then the defaults.
+
+        Keyword arguments (max_rows=0, ...) are this endpoint's own defaults
+        and take precedence over the shared MSSQL_WEB_<LIMIT> settings.
+        """
+        def setting(name, default):
+            value = os.getenv(f"MSSQL_WEB_{endpoint}_{name}") if endpoint else None
+            if value is None:
+                value = defaults.get(name.lower())
+            if value is None:
+                value = os.getenv(f"MSSQL_WEB_{name}", default)
+            return value
+
+        return cls(
+            max_rows=int(setting("MAX_ROWS", DEFAULT_MAX_ROWS)),
+            max_bytes=int(setting("MAX_BYTES", DEFAULT_MAX_BYTES)),
+            statement_timeout=float(setting("STATEMENT_TIMEOUT", DEFAULT_STATEMENT_TIMEOUT)),
+            lock_timeout=float(setting("LOCK_TIMEOUT", DEFAULT_LOCK_TIMEOUT)),
+        )
+
+    def open_cursor(self, conn):
+        """Open a cursor on conn with the statement and lock timeouts set."""
+        # pyodbc copies the connection timeout onto a cursor when the cursor
+        # is created, so it has to be set first; later changes do not reach it
+        conn.timeout = int(math.ceil(self.statement_timeout)) if self.statement_timeout else 0
+        cursor = conn.cursor()
+        if self.lock_timeout:
+            cursor.execute(f"SET LOCK_TIMEOUT {int(self.lock_timeout * 1000)}")
+        return cursor
+
+
+# No row, byte or time limits
+UNLIMITED = QueryLimits(0, 0, 0, 0)
+
+
+def _record_overhead(columns: List[str]) -> int:
+    """Bytes a row object adds over its values: braces plus a quoted key and colon per column."""
+    return 2 + sum(len(dumps(column)) + 1 for column in columns)
+
+
+class LimitedFetch:
+    """Fetch an executed cursor in batches until it is exhausted or a limit is hit.
+
+    Iterating yields ColumnarResult batches (or lists of row dicts when
+    records is set). When the row or byte limit cuts the result short,
+    truncated is set and the statement is cancelled on the server rather
+    than left to run. Response bytes are estimated from the encoded values
+    plus the keys each row object repeats.
+    """
+
+    def __init__(self, cursor, limits: QueryLimits, batch_size: int = 500, records: bool = False, connection=None):
+        self.cursor = cursor
+        self.limits = limits
+        self.batch_size = batch_size
+        self.records = records
+        self.connection = connection
+        self.row_count = 0
+        self.byte_count = 0
+        self.truncated = False
+        self._done = False
+        self._description = cursor.description
+        self._converters = converters_for(self._description)
+        self._overhead = _record_overhead([column[0] for column in self._description])
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> Union[ColumnarResult, List[Dict[str, Any]]]:
+        batch = self._next_batch()
+        if batch is None:
+            raise StopIteration
+        return batch.to_records() if self.records else batch
+
+    def _next_batch(self) -> Optional[ColumnarResult]:
+        if self._done:
+            return None
+        size = self.batch_size
+        if self.limits.max_rows:
+            rows_left = self.limits.max_rows - self.row_count
+            if rows_left <= 0:
+                # One more row tells a result of exactly max_rows from a longer one
+                self._finish(self.cursor.fetchone() is not None)
+                return None
+            size = min(size, rows_left)
+
+        rows = self.cursor.fetchmany(size)
+        if not rows:
+            self._finish(False)
+            return None
+        batch = ColumnarResult.from_rows(self._description, rows, self._converters)
+
+        if self.limits.max_bytes:
+            batch_bytes = len(dumps(batch.data)) + self._overhead * batch.row_count
+            if self.byte_count + batch_bytes > self.limits.max_bytes:
+                keep = batch.row_count * (self.limits.max_bytes - self.byte_count) // batch_bytes
+                self._finish(True)
+                if keep <= 0:
+                    return None
+                batch = batch.head(keep)
+                batch_bytes = batch_bytes * keep // len(rows)
+            self.byte_count += batch_bytes
+        self.row_count += batch.row_count
+        return batch
+
+    def _finish(self, truncated: bool):
+        self._done = True
+        self.truncated = truncated
+        if truncated:
+            self.cursor.cancel()
+
+    def result(self) -> ColumnarResult:
+        """Fetch everything the limits allow as one ColumnarResult."""
+        batches = []
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                break
+            batches.append(batch)
+        if not batches:
+            empty = ColumnarResult.from_rows(self._description, [], self._converters)
+            empty.truncated = self.truncated
+            return empty
+        return ColumnarResult.concat(batches, self.truncated)
+
+    def close(self):
+        """Cancel the statement if it is still running and release the cursor and connection."""
+        try:
+            if not self._done:
+                self._finish(True)
+            self.cursor.close()
+        finally:
+            if self.connection is not None:
+                self.connection.close()
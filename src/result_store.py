@@ -0,0 +1,118 @@
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+# How date and datetime columns are shown in pages, as the chat always has
+DISPLAY_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class _Entry:
+    __slots__ = ("df", "nbytes", "expires", "order")
+
+    def __init__(self, df: pd.DataFrame, nbytes: int, expires: float):
+        self.df = df
+        self.nbytes = nbytes
+        self.expires = expires
+        # (column, descending) and row positions of the last sort requested,
+        # reused while paging through it
+        self.order = None
+
+
+def _sort_order(column: pd.Series, descending: bool):
+    """Row positions of column in sorted order, missing values last."""
+    column = column.reset_index(drop=True)
+    try:
+        ordered = column.sort_values(ascending=not descending, kind="stable", na_position="last")
+    except TypeError:
+        # Mixed types, e.g. numbers and strings: compare as text
+        ordered = column.astype(str).sort_values(ascending=not descending, kind="stable")
+    return ordered.index.to_numpy()
+
+
+class ResultStore:
+    """Fetched results kept in memory under a result id so pages can be served later.
+
+    An entry expires ttl seconds after it was last read. Least recently used
+    entries are evicted when there are more than max_results or they take
+    more than max_bytes.
+    """
+
+    def __init__(self, ttl: float = 600, max_results: int = 32, max_bytes: int = 256 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_results = max_results
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def put(self, df: pd.DataFrame) -> str:
+        """Store a result and return its id."""
+        result_id = uuid.uuid4().hex
+        entry = _Entry(df, int(df.memory_usage(index=True, deep=True).sum()), time.monotonic() + self.ttl)
+        with self._lock:
+            self._entries[result_id] = entry
+            self._bytes += entry.nbytes
+            self._evict(time.monotonic())
+        return result_id
+
+    def _evict(self, now: float):
+        for result_id in [result_id for result_id, entry in self._entries.items() if entry.expires <= now]:
+            self._bytes -= self._entries.pop(result_id).nbytes
+        # Never evict the newest entry, even if it alone is over the byte budget
+        while len(self._entries) > 1 and (len(self._entries) > self.max_results or self._bytes > self.max_bytes):
+            self._bytes -= self._entries.popitem(last=False)[1].nbytes
+
+    def _get(self, result_id: str) -> Optional[_Entry]:
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            entry = self._entries.get(result_id)
+            if entry is not None:
+                entry.expires = now + self.ttl
+                self._entries.move_to_end(result_id)
+            return entry
+
+    def page(
+        self,
+        result_id: str,
+        offset: int = 0,
+        limit: int = 100,
+        sort: Optional[str] = None,
+        descending: bool = False,
+    ) -> Optional[Dict[str, Any]]:
+        """One page of rows, optionally sorted by a column, or None if the result has expired.
+
+        Rows are lists of values in column order, with dates as
+        "YYYY-MM-DD HH:MM:SS" text and missing values as null.
+        """
+        entry = self._get(result_id)
+        if entry is None:
+            return None
+        df = entry.df
+        if sort is not None:
+            if sort not in df.columns:
+                raise KeyError(sort)
+            key = (sort, descending)
+            if entry.order is None or entry.order[0] != key:
+                # Sorted once per column and direction, then sliced for each page
+                entry.order = (key, _sort_order(df[sort], descending))
+            rows = df.iloc[entry.order[1][offset:offset + limit]]
+        else:
+            rows = df.iloc[offset:offset + limit]
+        for i, dtype in enumerate(rows.dtypes):
+            if pd.api.types.is_datetime64_any_dtype(dtype):
+                rows.isetitem(i, rows.iloc[:, i].dt.strftime(DISPLAY_DATETIME_FORMAT))
+        return {
+            "result_id": result_id,
+            "columns": [str(column) for column in df.columns],
+            "rows": json.loads(rows.to_json(orient="values", date_format="iso")),
+            "offset": offset,
+            "row_count": len(df),
+            "sort": sort,
+            "descending": descending,
+        }
@@ -0,0 +1,190 @@
+import decimal
+import json
+import math
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Time bucket widths in seconds, finest first; the first that yields at most
+# MAX_TIME_BUCKETS buckets over the data's span is used.
+_BUCKET_FREQUENCIES = [
+    ("h", 3600),
+    ("D", 86400),
+    ("W", 7 * 86400),
+    ("MS", 30 * 86400),
+    ("QS", 91 * 86400),
+    ("YS", 365 * 86400),
+]
+MAX_TIME_BUCKETS = 24
+MAX_BUCKET_MEASURES = 3
+# Categorical columns with at most this many values can stratify the sample
+MAX_STRATA = 20
+
+
+def _coerce_column(series: pd.Series) -> pd.Series:
+    """Convert object columns holding Decimals or ISO date strings to numeric or datetime dtype."""
+    if not (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)):
+        return series
+    probe = series.dropna().head(20)
+    if probe.empty:
+        return series
+    if all(isinstance(value, (decimal.Decimal, int, float)) and not isinstance(value, bool) for value in probe):
+        return pd.to_numeric(series, errors="coerce")
+    if all(isinstance(value, str) for value in probe):
+        parsed = pd.to_datetime(probe, errors="coerce", format="ISO8601")
+        if parsed.notna().all():
+            return pd.to_datetime(series, errors="coerce", format="ISO8601")
+    return series
+
+
+def to_frame(results: List[Dict]) -> pd.DataFrame:
+    """Build a DataFrame from result rows with usable numeric and datetime dtypes."""
+    df = pd.DataFrame(results)
+    return df.apply(_coerce_column)
+
+
+def _clean(value: Any) -> Any:
+    """Make a pandas/NumPy scalar JSON-friendly and compact."""
+    if value is None:
+        return None
+    if isinstance(value, (np.integer,)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        value = float(value)
+        if math.isnan(value) or math.isinf(value):
+            return None
+        return float(f"{value:.6g}")
+    if isinstance(value, pd.Timestamp):
+        return None if pd.isna(value) else value.isoformat()
+    if isinstance(value, (np.bool_,)):
+        return bool(value)
+    if value is pd.NaT:
+        return None
+    return value if isinstance(value, (int, str, bool)) else str(value)
+
+
+def profile_columns(df: pd.DataFrame, top_k: int = 5) -> Dict[str, Dict[str, Any]]:
+    """Per-column type, null rate, quantiles or top values, computed column-wise in one pass per kind."""
+    profiles: Dict[str, Dict[str, Any]] = {}
+    null_rates = df.isna().mean()
+    numeric = df.select_dtypes(include="number").select_dtypes(exclude="bool")
+    if not numeric.empty:
+        quantiles = numeric.quantile([0.0, 0.25, 0.5, 0.75, 1.0])
+        means = numeric.mean()
+        stds = numeric.std()
+
+    for column in df.columns:
+        series = df[column]
+        profile: Dict[str, Any] = {"null_rate": _clean(null_rates[column])}
+        if column in numeric.columns:
+            q = quantiles[column]
+            profile.update({
+                "type": "numeric",
+                "min": _clean(q[0.0]),
+                "p25": _clean(q[0.25]),
+                "median": _clean(q[0.5]),
+                "p75": _clean(q[0.75]),
+                "max": _clean(q[1.0]),
+                "mean": _clean(means[column]),
+                "std": _clean(stds[column]),
+            })
+        elif pd.api.types.is_datetime64_any_dtype(series):
+            profile.update({"type": "datetime", "min": _clean(series.min()), "max": _clean(series.max())})
+        else:
+            counts = series.astype(str).where(series.notna()).value_counts()
+            profile.update({
+                "type": "categorical",
+                "distinct": int(len(counts)),
+                "top": {str(value): int(count) for value, count in counts.head(top_k).items()},
+            })
+        profiles[str(column)] = profile
+    return profiles
+
+
+def time_buckets(df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+    """Row counts and sums of the first numeric columns per time bucket of the first datetime column."""
+    datetimes = [column for column in df.columns if pd.api.types.is_datetime64_any_dtype(df[column])]
+    if not datetimes:
+        return None
+    column = datetimes[0]
+    dates = df[column].dropna()
+    if dates.empty:
+        return None
+    span = (dates.max() - dates.min()).total_seconds()
+    freq = next((freq for freq, seconds in _BUCKET_FREQUENCIES if span / seconds <= MAX_TIME_BUCKETS), "YS")
+
+    measures = list(df.select_dtypes(include="number").select_dtypes(exclude="bool").columns[:MAX_BUCKET_MEASURES])
+    grouped = df.groupby(pd.Grouper(key=column, freq=freq))
+    table = grouped.size().to_frame("rows")
+    if measures:
+        table = table.join(grouped[measures].sum().add_prefix("sum_"))
+    table = table[table["rows"] > 0].tail(MAX_TIME_BUCKETS)
+    rows = table.rename_axis("start").reset_index().to_dict(orient="records")
+    return {
+        "column": str(column),
+        "bucket": freq,
+        "buckets": [{str(key): _clean(value) for key, value in row.items()} for row in rows],
+    }
+
+
+def stratified_sample(df: pd.DataFrame, n: int, seed: int = 0) -> pd.DataFrame:
+    """Sample about n rows, proportionally from each value of the lowest-cardinality categorical column."""
+    if len(df) <= n:
+        return df
+    candidates = [
+        column for column in df.columns
+        if not pd.api.types.is_numeric_dtype(df[column])
+        and not pd.api.types.is_datetime64_any_dtype(df[column])
+        and 1 < df[column].nunique() <= MAX_STRATA
+    ]
+    if not candidates:
+        # Evenly spaced rows keep the shape of ordered results
+        return df.iloc[np.linspace(0, len(df) - 1, n).astype(int)]
+
+    stratum = min(candidates, key=lambda column: df[column].nunique())
+    keys = df[stratum].astype(str)
+    sizes = keys.map(keys.value_counts())
+    quota = np.maximum(1, np.round(n * sizes / len(df)))
+    rank = pd.Series(np.random.default_rng(seed).random(len(df)), index=df.index).groupby(keys).rank(method="first")
+    return df[rank <= quota]
+
+
+def _records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    return [{str(key): _clean(value) for key, value in row.items()} for row in df.to_dict(orient="records")]
+
+
+def _dumps(summary: Dict[str, Any]) -> str:
+    return json.dumps(summary, separators=(",", ":"), default=str)
+
+
+def summarize_results(results: List[Dict], max_bytes: int = 16_000, sample_rows: int = 20, top_k: int = 5) -> str:
+    """Summarize a result set as compact JSON no larger than max_bytes.
+
+    The summary holds the row count, per-column profiles, time-bucket
+    aggregates and a stratified sample of rows. When it is over budget the
+    sample is shrunk first, then the top values and time buckets dropped,
+    then columns.
+    """
+    df = to_frame(results)
+    sample = stratified_sample(df, sample_rows)
+    summary: Dict[str, Any] = {
+        "row_count": len(df),
+        "columns": profile_columns(df, top_k),
+        "time_buckets": time_buckets(df),
+        "sample": _records(sample),
+    }
+    text = _dumps(summary)
+    while len(text.encode("utf-8")) > max_bytes and summary["sample"]:
+        summary["sample"] = summary["sample"][:len(summary["sample"]) // 2]
+        text = _dumps(summary)
+    if len(text.encode("utf-8")) > max_bytes:
+        for profile in summary["columns"].values():
+            profile.pop("top", None)
+        summary["time_buckets"] = None
+        text = _dumps(summary)
+    while len(text.encode("utf-8")) > max_bytes and summary["columns"]:
+        summary["columns"].popitem()
+        summary["columns_omitted"] = summary.get("columns_omitted", 0) + 1
+        text = _dumps(summary)
+    return text
@@ -0,0 +1,131 @@
+import math
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence
+
+# Words analysts use for the concepts in a transactions schema. Every word in
+# a group matches the others, so "revenue" finds an Amount column.
+DEFAULT_SYNONYMS = [
+    ["customer", "client", "buyer", "user", "account"],
+    ["transaction", "payment", "sale", "purchase", "order"],
+    ["amount", "total", "value", "revenue", "price", "spend", "sum"],
+    ["date", "time", "day", "month", "year", "when", "period"],
+    ["product", "item", "sku", "article"],
+    ["merchant", "vendor", "store", "seller", "shop"],
+    ["status", "state"],
+    ["category", "type", "kind", "segment"],
+]
+
+_STOPWORDS = {
+    "a", "an", "and", "are", "by", "did", "do", "for", "from", "get", "give", "has", "have", "how",
+    "in", "is", "list", "many", "me", "much", "of", "on", "or", "per", "show", "the", "to", "what",
+    "which", "who", "with",
+}
+
+TABLE_WEIGHT = 3.0
+COLUMN_WEIGHT = 1.0
+# Share of a table's score passed on to the tables it has foreign keys with
+NEIGHBOUR_WEIGHT = 0.5
+
+_WORD = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+
+
+def _stem(word: str) -> str:
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 4 and word.endswith(("sses", "xes", "ches", "shes")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Split identifiers and questions into stemmed lower-case words (CustomerID -> customer, id)."""
+    return [_stem(word.lower()) for word in _WORD.findall(text) if word.lower() not in _STOPWORDS]
+
+
+def _column_name(column) -> str:
+    return column if isinstance(column, str) else column[0]
+
+
+class SchemaIndex:
+    """Inverted index over table and column names for picking the tables a question needs.
+
+    schema maps table names to columns, given as names or (name, data type)
+    pairs. foreign_keys maps each table to the tables it references or is
+    referenced by.
+    """
+
+    def __init__(
+        self,
+        schema: Dict[str, Sequence],
+        foreign_keys: Optional[Dict[str, Iterable[str]]] = None,
+        synonyms: Iterable[Iterable[str]] = DEFAULT_SYNONYMS,
+    ):
+        self.schema = schema
+        self.foreign_keys = {table: set(related) for table, related in (foreign_keys or {}).items()}
+        self._synonyms: Dict[str, set] = defaultdict(set)
+        for group in synonyms:
+            stems = {_stem(word) for word in group}
+            for word in stems:
+                self._synonyms[word] |= stems
+
+        postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        for table, columns in schema.items():
+            for token in tokenize(table):
+                postings[token][table] = max(postings[token].get(table, 0.0), TABLE_WEIGHT)
+            for column in columns:
+                for token in tokenize(_column_name(column)):
+                    postings[token][table] = max(postings[token].get(table, 0.0), COLUMN_WEIGHT)
+        # Rare words say more about which table is meant than ones in every table
+        count = max(len(schema), 1)
+        self._postings = {
+            token: {table: weight * (1.0 + math.log(count / len(tables))) for table, weight in tables.items()}
+            for token, tables in postings.items()
+        }
+
+    def _expand(self, question: str) -> set:
+        tokens = set()
+        for token in tokenize(question):
+            tokens.add(token)
+            tokens |= self._synonyms.get(token, set())
+        return tokens
+
+    def search(self, question: str, k: int = 8) -> List[str]:
+        """Return up to k table names ranked by relevance to the question."""
+        scores: Dict[str, float] = defaultdict(float)
+        for token in self._expand(question):
+            for table, weight in self._postings.get(token, {}).items():
+                scores[table] += weight
+
+        # Pull in join partners of the best matches so the model can join them
+        for table, score in list(scores.items()):
+            for neighbour in self.foreign_keys.get(table, ()):
+                if neighbour in self.schema:
+                    scores[neighbour] += NEIGHBOUR_WEIGHT * score
+
+        if not scores:
+            # Nothing matched; the most connected tables are the best guess
+            ranked = sorted(self.schema, key=lambda table: (-len(self.foreign_keys.get(table, ())), table))
+            return ranked[:k]
+        return sorted(scores, key=lambda table: (-scores[table], table))[:k]
+
+    def compact(self, tables: Iterable[str]) -> str:
+        """Serialize tables one per line as Table(column type, ...)."""
+        lines = []
+        for table in tables:
+            columns = ", ".join(
+                column if isinstance(column, str) else f"{column[0]} {column[1]}"
+                for column in self.schema.get(table, ())
+            )
+            line = f"{table}({columns})"
+            related = sorted(self.foreign_keys.get(table, set()) & set(self.schema))
+            if related:
+                line += f" joins {', '.join(related)}"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def context(self, question: str, k: int = 8) -> str:
+        """Compact schema text for the k tables most relevant to the question."""
+        return self.compact(self.search(question, k))
@@ -0,0 +1,139 @@
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from schema_index import SchemaIndex
+
+# Every base table with its columns in one round trip. The LEFT JOIN keeps
+# tables the login can see but whose columns it cannot.
+SCHEMA_QUERY = """
+    SELECT t.TABLE_NAME, c.COLUMN_NAME, c.DATA_TYPE
+    FROM INFORMATION_SCHEMA.TABLES t
+    LEFT JOIN INFORMATION_SCHEMA.COLUMNS c
+        ON c.TABLE_SCHEMA = t.TABLE_SCHEMA AND c.TABLE_NAME = t.TABLE_NAME
+    WHERE t.TABLE_TYPE = 'BASE TABLE'
+    ORDER BY t.TABLE_NAME, c.ORDINAL_POSITION
+"""
+
+# Table pairs linked by a foreign key
+FOREIGN_KEYS_QUERY = """
+    SELECT OBJECT_NAME(parent_object_id), OBJECT_NAME(referenced_object_id)
+    FROM sys.foreign_keys
+"""
+
+# Changes whenever a user table is created, dropped or altered
+VERSION_QUERY = """
+    SELECT COUNT(*), MAX(modify_date), CHECKSUM_AGG(CHECKSUM(object_id, modify_date))
+    FROM sys.objects
+    WHERE type = 'U'
+"""
+
+Columns = List[Tuple[str, str]]
+
+
+class SchemaSnapshot:
+    """Table and column names loaded with a single query and shared across requests.
+
+    The snapshot is reloaded after ttl seconds. In between, a cheap version
+    query against sys.objects runs at most every check_interval seconds and
+    triggers a reload as soon as a table is created, dropped or altered.
+    connect returns a new DB-API connection, or None or raises if it cannot connect.
+    """
+
+    def __init__(self, connect: Callable, ttl: float = 300.0, check_interval: float = 10.0):
+        self.connect = connect
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._tables: Dict[str, Columns] = {}
+        self._table_info: Dict[str, List[str]] = {}
+        self._foreign_keys: Dict[str, Set[str]] = {}
+        self._index: Optional[SchemaIndex] = None
+        self._version = None
+        self._loaded_at: Optional[float] = None
+        self._checked_at = 0.0
+
+    def tables(self) -> List[str]:
+        """Return the names of all base tables."""
+        return list(self._current())
+
+    def columns(self, table_name: str) -> Columns:
+        """Return (column name, data type) pairs for a table."""
+        return self._current().get(table_name, [])
+
+    def schema(self) -> Dict[str, Columns]:
+        """Return every table with its (column name, data type) pairs."""
+        return self._current()
+
+    def table_info(self) -> Dict[str, List[str]]:
+        """Return column names per table, the shape ClaudeSQLAssistant.update_table_info expects."""
+        self._current()
+        return self._table_info
+
+    def foreign_keys(self) -> Dict[str, Set[str]]:
+        """Return, per table, the tables it shares a foreign key with in either direction."""
+        self._current()
+        return self._foreign_keys
+
+    def index(self) -> SchemaIndex:
+        """Return the relevance index for the current snapshot, built once per load."""
+        with self._lock:
+            self._current_locked()
+            if self._index is None:
+                self._index = SchemaIndex(self._tables, self._foreign_keys)
+            return self._index
+
+    def invalidate(self):
+        """Force a reload on next use."""
+        with self._lock:
+            self._loaded_at = None
+
+    def _current(self) -> Dict[str, Columns]:
+        with self._lock:
+            return self._current_locked()
+
+    def _current_locked(self) -> Dict[str, Columns]:
+        now = time.monotonic()
+        if self._loaded_at is None or now - self._loaded_at >= self.ttl or now - self._checked_at >= self.check_interval:
+            self._refresh(now)
+        return self._tables
+
+    def _refresh(self, now: float):
+        try:
+            conn = self.connect()
+        except Exception as e:
+            print(f"Error connecting to load schema snapshot: {e}")
+            conn = None
+        if conn is None:
+            # Keep serving the last snapshot; retry on the next request
+            return
+        try:
+            cursor = conn.cursor()
+            cursor.execute(VERSION_QUERY)
+            version = tuple(cursor.fetchone())
+            self._checked_at = now
+            if self._loaded_at is not None and now - self._loaded_at < self.ttl and version == self._version:
+                return
+            cursor.execute(SCHEMA_QUERY)
+            tables: Dict[str, Columns] = {}
+            for table_name, column_name, data_type in cursor.fetchall():
+                columns = tables.setdefault(table_name, [])
+                if column_name is not None:
+                    columns.append((column_name, data_type))
+            cursor.execute(FOREIGN_KEYS_QUERY)
+            foreign_keys: Dict[str, Set[str]] = {}
+            for parent, referenced in cursor.fetchall():
+                if parent != referenced:
+                    foreign_keys.setdefault(parent, set()).add(referenced)
+                    foreign_keys.setdefault(referenced, set()).add(parent)
+            cursor.close()
+            self._tables = tables
+            self._table_info = {name: [column for column, _ in columns] for name, columns in tables.items()}
+            self._foreign_keys = foreign_keys
+            self._index = None
+            self._version = version
+            self._loaded_at = now
+        except Exception as e:
+            print(f"Error loading schema snapshot: {e}")
+        finally:
+            conn.close()
@@ -0,0 +1,97 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_question(question: str) -> str:
+    """Lower-case, collapse whitespace and drop trailing punctuation so rephrasings of case and spacing share a key."""
+    return _WHITESPACE.sub(" ", question.strip().lower()).rstrip("?.! ")
+
+
+def schema_fingerprint(table_info: Dict[str, List[str]]) -> str:
+    """Hash the tables and columns a translation was generated against."""
+    canonical = json.dumps(table_info, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class TranslationCache:
+    """Natural-language to SQL translations stored in SQLite so they survive restarts.
+
+    Entries are keyed by the normalized question and the schema fingerprint.
+    When the schema changes, entries for other fingerprints are deleted, and
+    the least recently used entries are evicted beyond max_entries.
+    """
+
+    def __init__(self, path: str = "translation_cache.sqlite3", max_entries: int = 1000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._fingerprint: Optional[str] = None
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS translations (
+                question TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                sql_query TEXT NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (question, fingerprint)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS translations_last_used ON translations (last_used)")
+
+    def use_schema(self, fingerprint: str):
+        """Switch to a schema fingerprint, dropping translations made for any other schema."""
+        with self._lock:
+            if fingerprint == self._fingerprint:
+                return
+            self._fingerprint = fingerprint
+            self._conn.execute("DELETE FROM translations WHERE fingerprint <> ?", (fingerprint,))
+
+    def get(self, question: str, fingerprint: str) -> Optional[str]:
+        """Return the cached SQL for a question, or None."""
+        key = (normalize_question(question), fingerprint)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sql_query FROM translations WHERE question = ? AND fingerprint = ?", key
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE translations SET last_used = ? WHERE question = ? AND fingerprint = ?",
+                (time.time(),) + key
+            )
+            self.hits += 1
+            return row[0]
+
+    def put(self, question: str, fingerprint: str, sql_query: str):
+        """Store a translation, evicting the least recently used entries beyond max_entries."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO translations (question, fingerprint, sql_query, last_used) VALUES (?, ?, ?, ?)",
+                (normalize_question(question), fingerprint, sql_query, time.time())
+            )
+            self._conn.execute(
+                """DELETE FROM translations WHERE rowid IN (
+                       SELECT rowid FROM translations ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                   )""",
+                (self.max_entries,)
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,69 @@
+import time
+
+from mssql_mcp_server.cache import ResultCache, is_cacheable_query, normalize_query
+
+
+def test_normalize_query_collapses_whitespace_outside_literals():
+    assert normalize_query("SELECT  *\n  FROM t -- note\n WHERE a = 'x  y';") == "SELECT * FROM t WHERE a = 'x  y'"
+
+
+def test_equivalent_queries_share_a_key():
+    first = ResultCache.make_key("db", "SELECT * FROM t", format="csv")
+    second = ResultCache.make_key("db", "SELECT *\n FROM t;", format="csv")
+    assert first == second
+    assert first != ResultCache.make_key("other", "SELECT * FROM t", format="csv")
+    assert first != ResultCache.make_key("db", "SELECT * FROM t", format="json")
+
+
+def test_only_plain_selects_are_cacheable():
+    assert is_cacheable_query("SELECT * FROM t WHERE note = 'insert into'")
+    assert not is_cacheable_query("SELECT * INTO backup FROM t")
+    assert not is_cacheable_query("UPDATE t SET a = 1")
+    assert not is_cacheable_query("SELECT 1; TRUNCATE TABLE t")
+    assert not is_cacheable_query("SELECT 1; DROP TABLE t")
+    assert not is_cacheable_query("select 1 create table t (a int)")
+
+
+def test_parameter_types_are_part_of_the_key():
+    key = ResultCache.make_key("db", "SELECT * FROM t WHERE flag = ?", [True])
+    assert key != ResultCache.make_key("db", "SELECT * FROM t WHERE flag = ?", [1])
+    assert key != ResultCache.make_key("db", "SELECT * FROM t WHERE flag = ?", [1.0])
+    assert key == ResultCache.make_key("db", "SELECT * FROM t WHERE flag = ?", (True,))
+
+
+def test_hits_and_misses_are_counted():
+    cache = ResultCache()
+    key = cache.make_key("db", "SELECT 1")
+    assert cache.get(key) is None
+    cache.put(key, "1")
+    assert cache.get(key) == "1"
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_lru_eviction_is_bounded_by_bytes():
+    value = "x" * 1000
+    cache = ResultCache(max_bytes=3500)
+    for i in range(3):
+        cache.put(i, value)
+    cache.get(0)
+    cache.put(3, value)
+    assert cache.get(1) is None
+    assert cache.get(0) == value
+    assert cache.stats()["bytes"] <= 3500
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl():
+    cache = ResultCache(ttl=0.01)
+    cache.put("k", "v")
+    time.sleep(0.02)
+    assert cache.get("k") is None
+
+
+def test_invalidate_clears_everything():
+    cache = ResultCache()
+    cache.put("k", "v")
+    cache.invalidate()
+    assert cache.get("k") is None
+    assert cache.stats()["bytes"] == 0
@@ -0,0 +1,91 @@
+import datetime
+
+from mssql_mcp_server.catalog import (
+    COLUMNS_SQL, FINGERPRINT_SQL, INDEXES_SQL, TABLES_SQL, SchemaCatalog, describe_table
+)
+
+
+class CatalogCursor:
+    def __init__(self):
+        self.fingerprint = (2, datetime.datetime(2024, 1, 1), 12345)
+        self.executed = []
+        self.results = {
+            TABLES_SQL: [(1, "dbo", "Transactions", "U "), (2, "sales", "Orders", "U "), (4, "dbo", "DailyTotals", "V ")],
+            COLUMNS_SQL: [
+                (1, "TransactionID", "int", 4, 10, 0, False, True),
+                (1, "Amount", "decimal", 9, 18, 2, True, False),
+                (1, "Note", "nvarchar", 100, 0, 0, True, False),
+                (2, "OrderID", "int", 4, 10, 0, False, False),
+                (4, "Day", "date", 3, 10, 0, True, False),
+            ],
+            INDEXES_SQL: [
+                (1, "PK_Transactions", "CLUSTERED", True, True, "TransactionID"),
+                (1, "IX_Amount", "NONCLUSTERED", False, False, "Amount"),
+            ],
+        }
+
+    def execute(self, sql):
+        self.executed.append(sql)
+        self._rows = [self.fingerprint] if sql == FINGERPRINT_SQL else self.results[sql]
+
+    def fetchone(self):
+        return self._rows[0]
+
+    def fetchall(self):
+        return self._rows
+
+
+def test_refresh_loads_tables_columns_and_indexes():
+    catalog = SchemaCatalog()
+    assert catalog.refresh(CatalogCursor())
+    table = catalog.get_table("Transactions")
+    assert table.qualified_name == "dbo.Transactions"
+    assert table.primary_key == ("TransactionID",)
+    assert [c.type_display for c in table.columns] == ["int", "decimal(18,2)", "nvarchar(50)"]
+    assert catalog.get_table("[sales].[Orders]").resource_name == "sales.Orders"
+    assert catalog.get_table("missing") is None
+
+
+def test_views_are_listed_and_described():
+    catalog = SchemaCatalog()
+    catalog.refresh(CatalogCursor())
+    view = catalog.get_table("DailyTotals")
+    assert view.is_view and not catalog.get_table("Transactions").is_view
+    assert [c.name for c in view.columns] == ["Day"]
+    assert describe_table(view).startswith("View: dbo.DailyTotals")
+
+
+def test_unchanged_fingerprint_skips_reload():
+    cursor = CatalogCursor()
+    catalog = SchemaCatalog(refresh_interval=60)
+    catalog.refresh(cursor)
+    assert not catalog.is_stale()
+    cursor.executed.clear()
+    assert not catalog.refresh(cursor)
+    assert cursor.executed == [FINGERPRINT_SQL]
+
+
+def test_changed_fingerprint_reloads():
+    cursor = CatalogCursor()
+    catalog = SchemaCatalog()
+    catalog.refresh(cursor)
+    cursor.fingerprint = (3, datetime.datetime(2024, 2, 1), 999)
+    cursor.results[TABLES_SQL] = cursor.results[TABLES_SQL] + [(3, "dbo", "Refunds", "U ")]
+    assert catalog.refresh(cursor)
+    assert len(catalog.tables()) == 4
+
+
+def test_invalidate_marks_catalog_stale():
+    catalog = SchemaCatalog(refresh_interval=60)
+    catalog.refresh(CatalogCursor())
+    catalog.invalidate()
+    assert catalog.is_stale()
+
+
+def test_describe_table_lists_keys_and_indexes():
+    catalog = SchemaCatalog()
+    catalog.refresh(CatalogCursor())
+    text = describe_table(catalog.get_table("dbo.Transactions"))
+    assert "Primary key: TransactionID" in text
+    assert "TransactionID int NOT NULL IDENTITY" in text
+    assert "IX_Amount (Amount) NONCLUSTERED" in text
@@ -0,0 +1,78 @@
+import base64
+import json
+
+import numpy as np
+import pandas as pd
+
+from chart_prep import chart_figure, lttb, top_categories, typed_array
+
+
+def decode(array):
+    return np.frombuffer(base64.b64decode(array["bdata"]), dtype="<f8")
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+    x = np.arange(10_000, dtype=float)
+    y = np.sin(x / 500)
+    y[4321] = 50.0
+    keep = lttb(x, y, 200)
+    assert len(keep) == 200
+    assert keep[0] == 0 and keep[-1] == 9_999
+    assert 4321 in keep
+    assert np.all(np.diff(keep) > 0)
+    assert len(lttb(x[:50], y[:50], 200)) == 50
+
+
+def test_top_categories_fold_the_tail_into_other():
+    labels = pd.Series([f"merchant {i}" for i in range(100)] + ["merchant 0"])
+    values = pd.Series(list(range(100)) + [1000])
+    names, totals = top_categories(labels, values, top_n=5)
+    assert names == ["merchant 0", "merchant 99", "merchant 98", "merchant 97", "Other (96 more)"]
+    assert totals.sum() == sum(range(100)) + 1000
+
+
+def test_categories_keep_query_order_when_not_collapsed():
+    df = pd.DataFrame({"month": ["2024-01", "2024-02", "2024-03", "2024-04"], "amount": [50, 10, 40, 30]})
+    names, totals = top_categories(df["month"], df["amount"])
+    assert names == ["2024-01", "2024-02", "2024-03", "2024-04"]
+    assert totals.tolist() == [50, 10, 40, 30]
+    figure = chart_figure(df, "bar")
+    assert figure["data"][0]["x"] == names
+
+
+def test_line_payload_size_does_not_grow_with_rows():
+    def payload(rows):
+        df = pd.DataFrame({
+            "day": pd.date_range("2020-01-01", periods=rows, freq="min").strftime("%Y-%m-%d %H:%M:%S"),
+            "amount": np.random.default_rng(0).normal(size=rows),
+        })
+        return json.dumps(chart_figure(df, "line", max_points=500))
+
+    small, large = payload(10_000), payload(200_000)
+    assert len(large) == len(small) < 20_000
+    figure = json.loads(large)
+    assert figure["layout"]["xaxis"]["type"] == "date"
+    assert len(decode(figure["data"][0]["x"])) == 500
+
+
+def test_line_with_month_names_is_categorical_in_row_order():
+    df = pd.DataFrame({"month": ["Jan", "Feb", "Mar", "Apr"], "sales": [10, 30, 20, 40]})
+    figure = chart_figure(df, "line")
+    trace, xaxis = figure["data"][0], figure["layout"]["xaxis"]
+    assert decode(trace["x"]).tolist() == [0, 1, 2, 3]
+    assert decode(trace["y"]).tolist() == [10, 30, 20, 40]
+    assert xaxis["tickvals"] == [0, 1, 2, 3]
+    assert xaxis["ticktext"] == ["Jan", "Feb", "Mar", "Apr"]
+
+
+def test_line_with_free_text_x_keeps_every_point():
+    df = pd.DataFrame({"product": [f"Widget {chr(65 + i)}" for i in range(5)] + ["Q1"], "units": range(6)})
+    figure = chart_figure(df, "line")
+    assert len(decode(figure["data"][0]["y"])) == 6
+    assert figure["layout"]["xaxis"]["ticktext"][-1] == "Q1"
+    assert figure["layout"]["xaxis"]["type"] == "linear"
+
+
+def test_typed_array_round_trip():
+    values = np.array([1.5, -2.25, 1e12])
+    assert decode(typed_array(values)).tolist() == values.tolist()
@@ -0,0 +1,72 @@
+import datetime
+import decimal
+import json
+import uuid
+
+import columnar
+from columnar import ColumnarResult
+
+DESCRIPTION = [
+    ("id", int, None, 10, 10, 0, False),
+    ("amount", decimal.Decimal, None, 18, 18, 2, True),
+    ("created", datetime.datetime, None, 23, 23, 3, True),
+    ("token", uuid.UUID, None, 16, 16, 0, True),
+]
+ROWS = [
+    (1, decimal.Decimal("12.50"), datetime.datetime(2024, 1, 2, 3, 4, 5), uuid.UUID(int=1)),
+    (2, None, None, None),
+]
+
+
+def test_columns_are_converted_once_per_type():
+    result = ColumnarResult.from_rows(DESCRIPTION, ROWS)
+    assert result.row_count == 2
+    assert result.data == [
+        [1, 2],
+        [12.5, None],
+        ["2024-01-02T03:04:05", None],
+        [str(uuid.UUID(int=1)), None],
+    ]
+    assert result.types == ["int", "Decimal", "datetime", "UUID"]
+
+
+def test_records_keep_the_row_of_dicts_shape():
+    result = ColumnarResult.from_rows(DESCRIPTION, ROWS)
+    assert result.to_records()[1] == {"id": 2, "amount": None, "created": None, "token": None}
+
+
+def test_empty_result():
+    result = ColumnarResult.from_rows(DESCRIPTION, [])
+    assert result.to_dict() == {
+        "columns": ["id", "amount", "created", "token"],
+        "types": ["int", "Decimal", "datetime", "UUID"],
+        "row_count": 0,
+        "truncated": False,
+        "data": [[], [], [], []],
+    }
+    assert result.to_records() == []
+
+
+def test_converters_by_type_can_be_overridden():
+    converters = columnar.converters_for(DESCRIPTION, {datetime.datetime: lambda value: value.year})
+    result = ColumnarResult.from_rows(DESCRIPTION, ROWS, converters)
+    assert result.data[2] == [2024, None]
+    # Types without a converter, Decimal here, pass through as-is
+    assert result.data[1] == [decimal.Decimal("12.50"), None]
+
+
+def test_concat_and_head():
+    result = ColumnarResult.concat([
+        ColumnarResult.from_rows(DESCRIPTION, ROWS[:1]),
+        ColumnarResult.from_rows(DESCRIPTION, ROWS[1:]),
+    ], truncated=True)
+    assert result.row_count == 2 and result.truncated
+    assert result.data == ColumnarResult.from_rows(DESCRIPTION, ROWS).data
+    assert result.head(1).to_records() == ColumnarResult.from_rows(DESCRIPTION, ROWS[:1]).to_records()
+
+
+def test_dumps_with_and_without_orjson(monkeypatch):
+    payload = ColumnarResult.from_rows(DESCRIPTION, ROWS).to_dict()
+    fast = columnar.dumps(payload)
+    monkeypatch.setattr(columnar, "orjson", None)
+    assert json.loads(fast) == json.loads(columnar.dumps(payload)) == payload
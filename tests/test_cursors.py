@@ -0,0 +1,57 @@
+import time
+
+import pytest
+from mssql_mcp_server.cursors import CursorRegistry, OpenCursor, fetch_page
+
+
+class ListCursor:
+    def __init__(self, rows):
+        self.rows = list(rows)
+
+    def fetchmany(self, size):
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+
+def test_fetch_page_carries_lookahead_row():
+    cursor = ListCursor(range(5))
+    rows, carry = fetch_page(cursor, 2)
+    assert rows == [0, 1] and carry == 2
+    rows, carry = fetch_page(cursor, 2, carry)
+    assert rows == [2, 3] and carry == 4
+    rows, carry = fetch_page(cursor, 2, carry)
+    assert rows == [4] and carry is None
+
+
+def test_fetch_page_exact_fit_has_no_carry():
+    rows, carry = fetch_page(ListCursor(range(3)), 3)
+    assert rows == [0, 1, 2] and carry is None
+
+
+def test_take_removes_cursor_for_exclusive_use():
+    registry = CursorRegistry(ttl=60)
+    token, evicted = registry.put(OpenCursor("stmt", None, 1))
+    assert evicted == []
+    assert registry.take(token).statement == "stmt"
+    with pytest.raises(ValueError, match="Unknown or expired"):
+        registry.take(token)
+
+
+def test_put_evicts_least_recently_used():
+    registry = CursorRegistry(ttl=60, max_open=2)
+    first, _ = registry.put(OpenCursor("a", None, 1))
+    registry.put(OpenCursor("b", None, 1))
+    _, evicted = registry.put(OpenCursor("c", None, 1))
+    assert [c.statement for c in evicted] == ["a"]
+    with pytest.raises(ValueError):
+        registry.take(first)
+
+
+def test_expired_cursors_are_swept():
+    registry = CursorRegistry(ttl=60)
+    token, _ = registry.put(OpenCursor("stmt", None, 1))
+    with pytest.raises(ValueError):
+        registry.take("missing")
+    expired = registry.pop_expired(now=time.monotonic() + 120)
+    assert [c.token for c in expired] == [token]
+    assert len(registry) == 0
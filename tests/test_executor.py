@@ -0,0 +1,175 @@
+import asyncio
+import threading
+import time
+
+import pytest
+import pyodbc
+from mssql_mcp_server.executor import QueryExecutor, QueryTimeoutError
+from mssql_mcp_server.pool import StatementCache
+
+
+class SlowCursor:
+    def __init__(self, delay, timeout=0):
+        self.delay = delay
+        self.timeout = timeout
+        self.cancelled = threading.Event()
+
+    def execute(self, sql, *params):
+        if self.cancelled.wait(self.delay):
+            raise pyodbc.OperationalError("HY008", "Operation canceled")
+
+    def fetchall(self):
+        return [(1,)]
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, delay):
+        self.delay = delay
+        self.timeout = 0
+        self.cursors = []
+
+    def cursor(self):
+        cursor = SlowCursor(self.delay, self.timeout)
+        self.cursors.append(cursor)
+        return cursor
+
+
+class FakeStatementCache:
+    def __init__(self, conn):
+        self.conn = conn
+        self.cursors = {}
+        self.discarded = []
+
+    def cursor_for(self, sql, timeout=0):
+        if sql not in self.cursors:
+            self.cursors[sql] = self.conn.cursor()
+        return self.cursors[sql]
+
+    def discard(self, sql, timeout=0):
+        self.discarded.append(sql)
+        self.cursors.pop(sql, None)
+
+
+class FakePool:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.connections = []
+        self.caches = {}
+        self.released = 0
+
+    def statement_cache(self, conn):
+        return self.caches.setdefault(id(conn), FakeStatementCache(conn))
+
+    def acquire(self, timeout=None):
+        conn = FakeConnection(self.delay)
+        self.connections.append(conn)
+        return conn
+
+    def release(self, conn, discard=False):
+        self.released += 1
+
+
+def run_query(statement):
+    statement.cursor.execute("SELECT 1")
+    return statement.cursor.fetchall()
+
+
+async def test_run_returns_result_and_releases_connection():
+    pool = FakePool()
+    executor = QueryExecutor(pool, max_concurrency=2)
+    assert await executor.run(run_query) == [(1,)]
+    assert pool.released == 1
+
+
+async def test_concurrent_queries_overlap():
+    executor = QueryExecutor(FakePool(delay=0.2), max_concurrency=4)
+    start = time.monotonic()
+    await asyncio.gather(*(executor.run(run_query) for _ in range(4)))
+    assert time.monotonic() - start < 0.6
+
+
+async def test_timeout_cancels_running_statement():
+    pool = FakePool(delay=5)
+    executor = QueryExecutor(pool, max_concurrency=1)
+    with pytest.raises(QueryTimeoutError):
+        await executor.run(run_query, timeout=0.1)
+    assert pool.connections[0].cursors[0].cancelled.is_set()
+    assert pool.connections[0].timeout == 1
+
+
+async def test_task_cancellation_cancels_running_statement():
+    pool = FakePool(delay=5)
+    executor = QueryExecutor(pool, max_concurrency=1)
+    task = asyncio.create_task(executor.run(run_query))
+    await asyncio.sleep(0.1)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert pool.connections[0].cursors[0].cancelled.is_set()
+
+
+async def test_parameterized_execute_uses_prepared_cursor():
+    pool = FakePool()
+    executor = QueryExecutor(pool, max_concurrency=1)
+
+    def work(statement):
+        return statement.execute("SELECT * FROM t WHERE id = ?", [1])
+
+    cursor = await executor.run(work)
+    cache = pool.statement_cache(pool.connections[0])
+    assert cache.cursors["SELECT * FROM t WHERE id = ?"] is cursor
+    assert cache.discarded == []
+
+
+async def test_prepared_cursor_is_not_reused_across_timeouts():
+    # A real StatementCache on one connection, reused by every statement
+    pool = FakePool()
+    conn = FakeConnection(0.0)
+    cache = StatementCache(conn)
+    pool.acquire = lambda timeout=None: conn
+    pool.statement_cache = lambda c: cache
+    executor = QueryExecutor(pool, max_concurrency=1)
+
+    def work(statement):
+        return statement.execute("SELECT * FROM t WHERE id = ?", [1])
+
+    short = await executor.run(work, timeout=2)
+    assert await executor.run(work, timeout=2) is short
+    long = await executor.run(work, timeout=30)
+    unlimited = await executor.run(work)
+    assert (short.timeout, long.timeout, unlimited.timeout) == (2, 30, 0)
+
+
+async def test_failed_statement_discards_prepared_cursor():
+    pool = FakePool()
+    executor = QueryExecutor(pool, max_concurrency=1)
+
+    def work(statement):
+        statement.execute("SELECT * FROM t WHERE id = ?", [1])
+        raise RuntimeError("serialization failed")
+
+    with pytest.raises(RuntimeError):
+        await executor.run(work)
+    assert pool.statement_cache(pool.connections[0]).discarded == ["SELECT * FROM t WHERE id = ?"]
+
+
+async def test_run_records_phase_timings():
+    observed = []
+
+    class Recorder:
+        def observe(self, kind, name, phase, seconds):
+            observed.append((kind, name, phase))
+
+    executor = QueryExecutor(FakePool(), max_concurrency=1, metrics=Recorder())
+
+    def work(statement):
+        return statement.execute("SELECT 1")
+
+    await executor.run(work, operation=("tool", "execute_sql"))
+    assert observed == [("tool", "execute_sql", "acquire"), ("tool", "execute_sql", "execute")]
@@ -0,0 +1,58 @@
+import gzip
+import json
+
+from export_stream import export_chunks
+from query_limits import LimitedFetch, QueryLimits
+
+DESCRIPTION = [("id", int, None, 10, 10, 0, False), ("note", str, None, 50, 50, 0, True)]
+
+
+class FakeCursor:
+    description = DESCRIPTION
+
+    def __init__(self, rows):
+        self.rows = iter(rows)
+        self.fetched = 0
+
+    def fetchmany(self, size):
+        batch = [row for _, row in zip(range(size), self.rows)]
+        self.fetched += len(batch)
+        return batch
+
+    def fetchone(self):
+        return next(self.rows, None)
+
+
+def batches(rows, batch_size=2):
+    return LimitedFetch(FakeCursor(rows), QueryLimits(0, 0, 0, 0), batch_size)
+
+
+ROWS = [(1, "plain"), (2, 'has "quotes", commas'), (3, None)]
+
+
+def test_ndjson_one_object_per_line():
+    body = b"".join(export_chunks(batches(ROWS), ["id", "note"], "ndjson"))
+    assert [json.loads(line) for line in body.splitlines()] == [
+        {"id": 1, "note": "plain"},
+        {"id": 2, "note": 'has "quotes", commas'},
+        {"id": 3, "note": None},
+    ]
+
+
+def test_csv_header_quoting_and_nulls():
+    body = b"".join(export_chunks(batches(ROWS), ["id", "note"], "csv"))
+    assert body.decode() == 'id,note\r\n1,plain\r\n2,"has ""quotes"", commas"\r\n3,\r\n'
+
+
+def test_gzip_round_trip_and_no_empty_chunks():
+    chunks = list(export_chunks(batches(ROWS), ["id", "note"], "csv", compress=True))
+    assert all(chunks)
+    assert gzip.decompress(b"".join(chunks)).startswith(b"id,note\r\n1,plain")
+
+
+def test_rows_are_fetched_lazily():
+    cursor = FakeCursor((i, "x") for i in range(1_000_000))
+    chunks = export_chunks(LimitedFetch(cursor, QueryLimits(0, 0, 0, 0), 100), ["id", "note"])
+    next(chunks)
+    next(chunks)
+    assert cursor.fetched == 200
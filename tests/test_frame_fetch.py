@@ -0,0 +1,77 @@
+import datetime
+import decimal
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from frame_fetch import fetch_frame
+
+DESCRIPTION = [
+    ("id", int, None, 10, 10, 0, False),
+    ("amount", decimal.Decimal, None, 18, 18, 2, True),
+    ("created", datetime.datetime, None, 23, 23, 3, True),
+    ("day", datetime.date, None, 10, 10, 0, True),
+    ("token", uuid.UUID, None, 16, 16, 0, True),
+    ("flag", bool, None, 1, 1, 0, True),
+]
+
+
+class FakeCursor:
+    def __init__(self, description, rows):
+        self.description = description
+        self._rows = list(rows)
+        self.batch_sizes = []
+
+    def fetchmany(self, size):
+        self.batch_sizes.append(size)
+        batch, self._rows = self._rows[:size], self._rows[size:]
+        return batch
+
+
+def rows(count):
+    return [
+        (
+            i,
+            decimal.Decimal(i) / 4 if i % 3 else None,
+            datetime.datetime(2024, 1, 1, 12) + datetime.timedelta(hours=i),
+            datetime.date(2024, 1, 1) + datetime.timedelta(days=i) if i % 5 else None,
+            uuid.UUID(int=i),
+            None if i % 4 == 0 else bool(i % 2),
+        )
+        for i in range(count)
+    ]
+
+
+def test_columns_are_typed_arrays():
+    df = fetch_frame(FakeCursor(DESCRIPTION, rows(10)), batch_size=3)
+    assert list(df.columns) == ["id", "amount", "created", "day", "token", "flag"]
+    assert str(df["id"].dtype) == "Int64"
+    assert df["amount"].dtype == np.float64
+    assert np.isnan(df["amount"][0]) and df["amount"][1] == 0.25
+    assert pd.api.types.is_datetime64_dtype(df["created"]) and df["created"][1] == pd.Timestamp("2024-01-01 13:00")
+    assert pd.isna(df["day"][0]) and df["day"][1] == pd.Timestamp("2024-01-02")
+    assert df["token"][2] == str(uuid.UUID(int=2))
+    assert str(df["flag"].dtype) == "boolean"
+    assert pd.isna(df["flag"][0]) and df["flag"][1]
+
+
+def test_reads_in_batches_until_exhausted():
+    cursor = FakeCursor(DESCRIPTION, rows(10))
+    df = fetch_frame(cursor, batch_size=4)
+    assert cursor.batch_sizes == [4, 4, 4, 4]
+    assert df["id"].tolist() == list(range(10))
+
+
+def test_null_integers_stay_missing():
+    description = [("quantity", int, None, 10, 10, 0, True)]
+    df = fetch_frame(FakeCursor(description, [(1,), (None,), (3,)]))
+    assert df["quantity"].isna().tolist() == [False, True, False]
+    assert df["quantity"].sum() == 4
+
+
+def test_empty_result_and_duplicate_names():
+    description = [("n", int, None, 10, 10, 0, True), ("n", str, None, 10, 10, 0, True)]
+    df = fetch_frame(FakeCursor(description, []))
+    assert list(df.columns) == ["n", "n"]
+    assert len(df) == 0
@@ -0,0 +1,57 @@
+import urllib.request
+
+import pytest
+from mssql_mcp_server.metrics import Histogram, MetricsRegistry, start_metrics_server
+
+
+def test_histogram_buckets_and_quantiles():
+    histogram = Histogram(buckets=(0.01, 0.1, 1.0))
+    for value in (0.005, 0.05, 0.05, 0.5):
+        histogram.observe(value)
+    assert histogram.counts == [1, 2, 1, 0]
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(0.99) == 1.0
+    assert histogram.snapshot()["count"] == 4
+
+
+def test_track_counts_calls_errors_and_total_time():
+    metrics = MetricsRegistry()
+    with metrics.track("tool", "execute_sql"):
+        pass
+    with pytest.raises(RuntimeError):
+        with metrics.track("tool", "execute_sql"):
+            raise RuntimeError("boom")
+    entry = metrics.snapshot()["operations"]["tool:execute_sql"]
+    assert entry["calls"] == 2
+    assert entry["errors"] == 1
+    assert entry["phases"]["total"]["count"] == 2
+
+
+def test_snapshot_includes_phases_counters_and_gauges():
+    metrics = MetricsRegistry()
+    metrics.observe("resource", "table_data", "fetch", 0.02)
+    metrics.increment("resource", "table_data", "rows", 100)
+    metrics.register_gauges("pool", lambda: {"in_use": 2, "label": "ignored"})
+    snapshot = metrics.snapshot()
+    assert snapshot["operations"]["resource:table_data"]["rows"] == 100
+    assert snapshot["operations"]["resource:table_data"]["phases"]["fetch"]["p50"] == 0.025
+    assert snapshot["gauges"] == {"pool_in_use": 2}
+
+
+def test_prometheus_rendering_and_endpoint():
+    metrics = MetricsRegistry(buckets=(0.1, 1.0))
+    metrics.observe("tool", "execute_sql", "execute", 0.5)
+    metrics.increment("tool", "execute_sql", "bytes", 42)
+    text = metrics.render_prometheus()
+    assert 'mssql_mcp_phase_seconds_bucket{kind="tool",name="execute_sql",phase="execute",le="0.1"} 0' in text
+    assert 'mssql_mcp_phase_seconds_bucket{kind="tool",name="execute_sql",phase="execute",le="+Inf"} 1' in text
+    assert 'mssql_mcp_bytes_total{kind="tool",name="execute_sql"} 42' in text
+
+    server = start_metrics_server(metrics, 0)
+    try:
+        port = server.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+            assert response.read().decode() == metrics.render_prometheus()
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,108 @@
+import json
+
+from natural_query_stream import format_sse, natural_query_events
+
+
+class StubAssistant:
+    def __init__(self, sql="SELECT a FROM t;", error=None):
+        self.sql = sql
+        self.error = error
+        self.analyzed = None
+
+    async def agenerate_sql_query(self, question):
+        if self.error:
+            raise ValueError(self.error)
+        return self.sql
+
+    async def astream_analysis(self, question, results):
+        self.analyzed = results
+        for chunk in ("Two ", "rows."):
+            yield chunk
+
+
+class StubDatabase:
+    def __init__(self, batches, fail_after=None, execute_error=None):
+        self.batches = batches
+        self.fail_after = fail_after
+        self.execute_error = execute_error
+        self.closed = False
+        self.queries = []
+
+    def execute_batches(self, sql):
+        # Connects and executes eagerly, like app.iter_query_batches
+        self.queries.append(sql)
+        if self.execute_error:
+            raise RuntimeError(self.execute_error)
+        return self._fetch()
+
+    def _fetch(self):
+        try:
+            for i, batch in enumerate(self.batches):
+                if i == self.fail_after:
+                    raise RuntimeError("connection reset")
+                yield batch
+        finally:
+            self.closed = True
+
+
+async def run_inline(fn, *args):
+    return fn(*args)
+
+
+async def collect(question, assistant, db):
+    return [event async for event in natural_query_events(question, assistant, db.execute_batches, run_inline)]
+
+
+async def test_streams_sql_then_row_batches_then_analysis():
+    assistant = StubAssistant()
+    db = StubDatabase([[{"a": 1}], [{"a": 2}]])
+    events = await collect("how many?", assistant, db)
+    assert events == [
+        ("sql", {"sql_query": "SELECT a FROM t;"}),
+        ("rows", {"rows": [{"a": 1}]}),
+        ("rows", {"rows": [{"a": 2}]}),
+        ("analysis", {"text": "Two "}),
+        ("analysis", {"text": "rows."}),
+        ("done", {"row_count": 2, "truncated": False}),
+    ]
+    assert db.queries == ["SELECT a FROM t;"]
+    assert assistant.analyzed == [{"a": 1}, {"a": 2}]
+    assert db.closed
+
+
+async def test_generation_error_ends_stream_before_querying():
+    db = StubDatabase([])
+    events = await collect("q", StubAssistant(error="ERROR: Table 'x' does not exist"), db)
+    assert events == [("error", {"error": "ERROR: Table 'x' does not exist"})]
+    assert db.queries == []
+
+
+async def test_database_error_after_first_batch():
+    db = StubDatabase([[{"a": 1}], [{"a": 2}]], fail_after=1)
+    events = await collect("q", StubAssistant(), db)
+    assert [event for event, _ in events] == ["sql", "rows", "error"]
+    assert "connection reset" in events[-1][1]["error"]
+    assert db.closed
+
+
+async def test_execution_error_becomes_error_event():
+    db = StubDatabase([[{"a": 1}]], execute_error="Could not connect to the database")
+    events = await collect("q", StubAssistant(), db)
+    assert [event for event, _ in events] == ["sql", "error"]
+    assert "Could not connect to the database" in events[-1][1]["error"]
+
+
+async def test_closing_stream_early_closes_database_iterator():
+    db = StubDatabase([[{"a": 1}], [{"a": 2}]])
+    stream = natural_query_events("q", StubAssistant(), db.execute_batches, run_inline)
+    assert (await stream.__anext__())[0] == "sql"
+    assert (await stream.__anext__())[0] == "rows"
+    await stream.aclose()
+    assert db.closed
+
+
+def test_format_sse():
+    text = format_sse("rows", {"rows": [{"a": 1}]})
+    assert text.startswith("event: rows\ndata: ")
+    assert text.endswith("\n\n")
+    assert json.loads(text.split("data: ", 1)[1]) == {"rows": [{"a": 1}]}
@@ -0,0 +1,66 @@
+from nl_to_sql import NameIndex, NaturalLanguageToSQL
+
+SCHEMA = {
+    "Transactions": ["TransactionID", "CustomerID", "Amount", "TransactionDate", "Status"],
+    "Customers": ["CustomerID", "CustomerName", "Country"],
+}
+
+
+def rules():
+    translator = NaturalLanguageToSQL()
+    translator.load_schema(SCHEMA)
+    return translator
+
+
+def test_simple_questions_are_answered_confidently():
+    translator = rules()
+    assert translator.confident_sql("How many transactions are there?") == "SELECT COUNT(*) AS [count] FROM [Transactions];"
+    assert translator.confident_sql("Get count of records in Transactions") == "SELECT COUNT(*) AS [count] FROM [Transactions];"
+    assert translator.confident_sql("what are the distinct countries in the customers table") == "SELECT DISTINCT TOP (1000) [Country] FROM [Customers];"
+    assert translator.confident_sql("list customer names and country from customers") == "SELECT TOP (1000) [CustomerName], [Country] FROM [Customers];"
+    assert translator.confident_sql("show all data from transactions") == "SELECT TOP (1000) * FROM [Transactions];"
+
+
+def test_questions_beyond_the_rules_are_left_for_the_llm():
+    translator = rules()
+    assert translator.translate("what is the average amount per customer") is None
+    assert translator.translate("how many transactions in 2024") is None
+    # Matches a rule shape, but the table name is only a loose match
+    weak = translator.translate("show transactions where amount > 100")
+    assert weak is not None and weak.confidence < translator.min_confidence
+    assert translator.confident_sql("show transactions where amount > 100") is None
+
+
+def test_counts_across_tables_are_left_for_the_llm():
+    translator = rules()
+    assert translator.translate("How many transactions are from customers?") is None
+    assert translator.translate("count of customers in transactions") is None
+    assert translator.confident_sql("number of transactions in the customers table") is None
+    assert translator.confident_sql("how many transactions are in the transactions table") == \
+        "SELECT COUNT(*) AS [count] FROM [Transactions];"
+    assert translator.confident_sql("count of rows in customers") == "SELECT COUNT(*) AS [count] FROM [Customers];"
+
+
+def test_row_cap_is_configurable():
+    translator = NaturalLanguageToSQL(max_rows=50)
+    translator.load_schema(SCHEMA)
+    assert translator.confident_sql("show me the transactions") == "SELECT TOP (50) * FROM [Transactions];"
+    translator.max_rows = 0
+    assert translator.confident_sql("show me the transactions") == "SELECT * FROM [Transactions];"
+
+
+def test_name_index_scores_exact_and_fuzzy_matches():
+    index = NameIndex(["TransactionDate", "TransactionID", "CustomerName"])
+    assert index.lookup("transaction dates") == ("TransactionDate", 1.0)
+    name, score = index.lookup("custname")
+    assert name == "CustomerName" and 0 < score < 1
+    assert index.lookup("zzz") == (None, 0.0)
+
+
+def test_update_table_info_rebuilds_the_index():
+    translator = rules()
+    assert translator.confident_sql("count products") is None
+    translator.update_table_info("Products", ["ProductID", "ProductName"])
+    assert translator.confident_sql("count products") == "SELECT COUNT(*) AS [count] FROM [Products];"
+    assert translator.convert_to_sql("what are the unique values in product name from products") == \
+        "SELECT DISTINCT TOP (1000) [ProductName] FROM [Products];"
@@ -0,0 +1,155 @@
+import pytest
+import pyodbc
+from mssql_mcp_server.pool import ConnectionPool, PoolTimeoutError
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, sql, *params):
+        if self.conn.broken:
+            raise pyodbc.OperationalError("08S01", "Communication link failure")
+        self.conn.executed.append(sql)
+
+    def fetchall(self):
+        return [(1,)]
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.broken = False
+        self.closed = False
+        self.rollbacks = 0
+        self.timeout = 0
+        self.executed = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnector:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.attempts = 0
+        self.connections = []
+
+    def __call__(self, connection_string):
+        self.attempts += 1
+        if self.failures:
+            self.failures -= 1
+            raise pyodbc.OperationalError("08001", "Login timeout expired")
+        conn = FakeConnection()
+        self.connections.append(conn)
+        return conn
+
+
+def make_pool(connector, **kwargs):
+    kwargs.setdefault("backoff_base", 0)
+    return ConnectionPool("DSN=test", connect=connector, **kwargs)
+
+
+def test_warm_up_opens_min_size():
+    connector = FakeConnector()
+    pool = make_pool(connector, min_size=3, max_size=5)
+    assert pool.warm_up() == 3
+    assert pool.stats()["idle"] == 3
+    assert connector.attempts == 3
+
+
+def test_connection_is_reused():
+    connector = FakeConnector()
+    pool = make_pool(connector, min_size=0, max_size=2)
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+    assert first is second
+    assert connector.attempts == 1
+
+
+def test_release_resets_session():
+    pool = make_pool(FakeConnector(), min_size=0)
+    conn = pool.acquire()
+    conn.timeout = 30
+    pool.release(conn)
+    assert conn.timeout == 0
+    assert conn.rollbacks >= 1
+    assert any("ISOLATION LEVEL" in sql for sql in conn.executed)
+
+
+def test_unhealthy_connection_is_replaced():
+    connector = FakeConnector()
+    pool = make_pool(connector, min_size=1)
+    pool.warm_up()
+    connector.connections[0].broken = True
+    conn = pool.acquire()
+    assert conn is connector.connections[1]
+    assert connector.connections[0].closed
+    assert pool.stats()["size"] == 1
+
+
+def test_connect_retries_with_backoff():
+    connector = FakeConnector(failures=2)
+    pool = make_pool(connector, min_size=0, max_retries=3)
+    pool.acquire()
+    assert connector.attempts == 3
+
+
+def test_connect_gives_up_after_max_retries():
+    connector = FakeConnector(failures=5)
+    pool = make_pool(connector, min_size=0, max_retries=1)
+    with pytest.raises(pyodbc.OperationalError):
+        pool.acquire()
+    assert pool.stats()["size"] == 0
+
+
+def test_acquire_times_out_when_exhausted():
+    pool = make_pool(FakeConnector(), min_size=0, max_size=1)
+    pool.acquire()
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire(timeout=0.01)
+
+
+def test_invalid_sizes_rejected():
+    with pytest.raises(ValueError):
+        make_pool(FakeConnector(), min_size=5, max_size=2)
+
+
+def test_statement_cache_reuses_cursor_per_sql():
+    pool = make_pool(FakeConnector(), min_size=0, statement_cache_size=2)
+    conn = pool.acquire()
+    cache = pool.statement_cache(conn)
+    first = cache.cursor_for("SELECT * FROM t WHERE id = ?")
+    assert cache.cursor_for("SELECT * FROM t WHERE id = ?") is first
+    cache.cursor_for("SELECT 2")
+    cache.cursor_for("SELECT 3")
+    assert len(cache) == 2
+    assert cache.cursor_for("SELECT * FROM t WHERE id = ?") is not first
+    assert pool.stats()["statement_cache_hits"] == 1
+
+
+def test_statement_cache_survives_release_and_is_dropped_on_discard():
+    pool = make_pool(FakeConnector(), min_size=0)
+    conn = pool.acquire()
+    cache = pool.statement_cache(conn)
+    cache.cursor_for("SELECT 1")
+    pool.release(conn)
+    assert pool.statement_cache(pool.acquire()) is cache
+    assert pool.stats()["statement_cache_misses"] == 1
+    pool.release(conn, discard=True)
+    assert pool.stats()["statement_cache_misses"] == 0
+
+
+def test_statement_cache_can_be_disabled():
+    pool = make_pool(FakeConnector(), min_size=0, statement_cache_size=0)
+    assert pool.statement_cache(pool.acquire()) is None
@@ -0,0 +1,105 @@
+import pytest
+from mssql_mcp_server.catalog import ColumnInfo, IndexInfo, TableInfo
+from mssql_mcp_server.queries import build_table_read
+
+TRANSACTIONS = TableInfo(
+    schema="dbo",
+    name="Transactions",
+    columns=(
+        ColumnInfo("TransactionID", "int", 4, 10, 0, False, True),
+        ColumnInfo("Amount", "decimal", 9, 18, 2, True, False),
+        ColumnInfo("Status", "varchar", 20, 0, 0, True, False),
+    ),
+    indexes=(IndexInfo("PK_Transactions", "CLUSTERED", True, True, ("TransactionID",)),),
+)
+
+LINES = TableInfo(
+    schema="sales",
+    name="OrderLines",
+    columns=(
+        ColumnInfo("OrderID", "int", 4, 10, 0, False, False),
+        ColumnInfo("LineNo", "int", 4, 10, 0, False, False),
+    ),
+    indexes=(IndexInfo("PK_OrderLines", "CLUSTERED", True, True, ("OrderID", "LineNo")),),
+)
+
+HEAP = TableInfo(schema="dbo", name="Staging", columns=(ColumnInfo("Payload", "nvarchar", -1, 0, 0, True, False),))
+
+
+def test_default_read_is_ordered_top_100():
+    sql, args = build_table_read(TRANSACTIONS, {})
+    assert sql == "SELECT TOP (100) * FROM [dbo].[Transactions] ORDER BY [TransactionID]"
+    assert args == []
+
+
+def test_keyset_pagination_seeks_past_last_key():
+    sql, args = build_table_read(TRANSACTIONS, {"after": "500", "limit": "50"})
+    assert sql == (
+        "SELECT TOP (50) * FROM [dbo].[Transactions] "
+        "WHERE (([TransactionID] > ?)) ORDER BY [TransactionID]"
+    )
+    assert args == [500]
+
+
+def test_composite_keyset_pagination():
+    sql, args = build_table_read(LINES, {"after": "[7, 3]"})
+    assert "(([OrderID] > ?) OR ([OrderID] = ? AND [LineNo] > ?))" in sql
+    assert args == [7, 7, 3]
+
+
+def test_keyset_values_may_contain_commas():
+    _, args = build_table_read(LINES, {"after": '["Smith, J", "A,B"]'})
+    assert args == ["Smith, J", "Smith, J", "A,B"]
+    _, args = build_table_read(TRANSACTIONS, {"after": "ACME"})
+    assert args == ["ACME"]
+    with pytest.raises(ValueError, match="JSON array"):
+        build_table_read(LINES, {"after": "7,3"})
+
+
+def test_projection_keeps_primary_key():
+    sql, _ = build_table_read(TRANSACTIONS, {"columns": "amount,status"})
+    assert sql.startswith("SELECT TOP (100) [TransactionID], [Amount], [Status] FROM")
+
+
+def test_unknown_column_rejected():
+    with pytest.raises(ValueError, match="Unknown column"):
+        build_table_read(TRANSACTIONS, {"columns": "Amount; DROP TABLE x"})
+
+
+def test_limit_is_capped():
+    sql, _ = build_table_read(TRANSACTIONS, {"limit": "1000000"}, max_limit=5000)
+    assert "TOP (5000)" in sql
+
+
+def test_system_and_hash_sampling_are_ordered_by_key_hash():
+    sql, _ = build_table_read(TRANSACTIONS, {"sample": "1.5", "seed": "42"})
+    assert sql == (
+        "SELECT TOP (100) * FROM [dbo].[Transactions] TABLESAMPLE SYSTEM (1.5 PERCENT) REPEATABLE (42) "
+        "ORDER BY ABS(CAST(CHECKSUM([TransactionID], 42) AS BIGINT)) % 1000000"
+    )
+    sql, _ = build_table_read(TRANSACTIONS, {"sample": "10", "sample_mode": "hash"})
+    assert sql == (
+        "SELECT TOP (100) * FROM [dbo].[Transactions] "
+        "WHERE ABS(CAST(CHECKSUM([TransactionID]) AS BIGINT)) % 1000000 < 100000 "
+        "ORDER BY ABS(CAST(CHECKSUM([TransactionID]) AS BIGINT)) % 1000000"
+    )
+
+
+def test_sampled_reads_cannot_continue_with_after():
+    with pytest.raises(ValueError, match="cannot be combined"):
+        build_table_read(TRANSACTIONS, {"sample": "10", "after": "5"})
+
+
+def test_after_requires_primary_key():
+    with pytest.raises(ValueError, match="no primary key"):
+        build_table_read(HEAP, {"after": "1"})
+    sql, _ = build_table_read(HEAP, {})
+    assert "ORDER BY" not in sql
+
+
+def test_views_sample_by_hash_only():
+    view = TableInfo(schema="dbo", name="DailyTotals", columns=(ColumnInfo("Day", "date", 3, 10, 0, True, False),), is_view=True)
+    with pytest.raises(ValueError, match="sample_mode=hash"):
+        build_table_read(view, {"sample": "10"})
+    sql, _ = build_table_read(view, {"sample": "10", "sample_mode": "hash"})
+    assert "CHECKSUM(*)" in sql
@@ -0,0 +1,90 @@
+from columnar import dumps
+from query_limits import LimitedFetch, QueryLimits
+
+DESCRIPTION = [("id", int, None, 10, 10, 0, False), ("name", str, None, 50, 50, 0, True)]
+
+
+class FakeCursor:
+    def __init__(self, count):
+        self.description = DESCRIPTION
+        self.rows = [(i, f"row{i}") for i in range(count)]
+        self.position = 0
+        self.cancelled = False
+        self.closed = False
+        self.executed = []
+
+    def execute(self, sql):
+        self.executed.append(sql)
+
+    def fetchmany(self, size):
+        rows = self.rows[self.position:self.position + size]
+        self.position += len(rows)
+        return rows
+
+    def fetchone(self):
+        rows = self.fetchmany(1)
+        return rows[0] if rows else None
+
+    def cancel(self):
+        self.cancelled = True
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    timeout = 0
+
+    def __init__(self):
+        self.cursor_timeouts = []
+
+    def cursor(self):
+        # pyodbc takes the cursor's timeout from the connection at this point
+        self.cursor_timeouts.append(self.timeout)
+        self.last_cursor = FakeCursor(0)
+        return self.last_cursor
+
+
+def test_row_limit_truncates_and_cancels():
+    cursor = FakeCursor(25)
+    result = LimitedFetch(cursor, QueryLimits(max_rows=10, max_bytes=0), batch_size=4).result()
+    assert result.row_count == 10 and result.truncated
+    assert result.data[0] == list(range(10))
+    assert cursor.cancelled
+
+
+def test_result_of_exactly_max_rows_is_not_truncated():
+    cursor = FakeCursor(10)
+    result = LimitedFetch(cursor, QueryLimits(max_rows=10, max_bytes=0), batch_size=4).result()
+    assert result.row_count == 10 and not result.truncated
+    assert not cursor.cancelled
+
+
+def test_byte_limit_keeps_response_under_budget():
+    cursor = FakeCursor(1000)
+    fetch = LimitedFetch(cursor, QueryLimits(max_rows=0, max_bytes=2000), batch_size=100)
+    result = fetch.result()
+    assert result.truncated and 0 < result.row_count < 1000
+    assert len(dumps(result.to_records())) <= 2000
+    assert cursor.cancelled
+
+
+def test_record_batches_and_close_cancels_an_unfinished_fetch():
+    cursor = FakeCursor(100)
+    fetch = LimitedFetch(cursor, QueryLimits(max_rows=0, max_bytes=0), batch_size=3, records=True)
+    assert next(fetch) == [{"id": 0, "name": "row0"}, {"id": 1, "name": "row1"}, {"id": 2, "name": "row2"}]
+    fetch.close()
+    assert cursor.cancelled and cursor.closed and fetch.truncated
+    assert list(fetch) == []
+
+
+def test_cursor_is_created_with_statement_and_lock_timeouts_set(monkeypatch):
+    monkeypatch.setenv("MSSQL_WEB_STATEMENT_TIMEOUT", "2.5")
+    monkeypatch.setenv("MSSQL_WEB_QUERY_LOCK_TIMEOUT", "0.25")
+    limits = QueryLimits.from_env("QUERY")
+    conn = FakeConnection()
+    cursor = limits.open_cursor(conn)
+    assert cursor is conn.last_cursor
+    assert conn.cursor_timeouts == [3]
+    assert cursor.executed == ["SET LOCK_TIMEOUT 250"]
+    assert limits.max_rows == 10_000
@@ -0,0 +1,54 @@
+import pandas as pd
+import pytest
+
+import result_store
+from result_store import ResultStore
+
+
+def frame(rows=250):
+    return pd.DataFrame({
+        "id": range(rows),
+        "amount": [float(i % 7) if i % 10 else None for i in range(rows)],
+        "day": pd.date_range("2024-01-01", periods=rows, freq="D"),
+    })
+
+
+def test_pages_and_total_count():
+    store = ResultStore()
+    result_id = store.put(frame())
+    page = store.page(result_id, offset=200, limit=100)
+    assert page["row_count"] == 250
+    assert page["columns"] == ["id", "amount", "day"]
+    assert [row[0] for row in page["rows"]] == list(range(200, 250))
+    assert page["rows"][0][1] is None
+    assert page["rows"][0][2] == "2024-07-19 00:00:00"
+
+
+def test_sorting_is_server_side_with_missing_values_last():
+    store = ResultStore()
+    result_id = store.put(frame())
+    first = store.page(result_id, 0, 5, sort="amount", descending=True)
+    assert [row[1] for row in first["rows"]] == [6.0] * 5
+    last = store.page(result_id, 245, 5, sort="amount", descending=True)
+    assert [row[1] for row in last["rows"]] == [None] * 5
+    with pytest.raises(KeyError):
+        store.page(result_id, sort="missing")
+
+
+def test_mixed_type_columns_sort_as_text():
+    store = ResultStore()
+    result_id = store.put(pd.DataFrame({"value": [3, "NULL", 1]}))
+    assert store.page(result_id, sort="value")["rows"] == [[1], [3], ["NULL"]]
+
+
+def test_expiry_and_eviction(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(result_store.time, "monotonic", lambda: clock[0])
+    store = ResultStore(ttl=60, max_results=2)
+    first, second = store.put(frame(10)), store.put(frame(10))
+    assert store.page(first) is not None
+    third = store.put(frame(10))
+    # second was least recently used
+    assert store.page(second) is None
+    clock[0] += 61
+    assert store.page(first) is None and store.page(third) is None
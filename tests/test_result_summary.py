@@ -0,0 +1,54 @@
+import datetime
+import decimal
+import json
+
+from result_summary import profile_columns, stratified_sample, summarize_results, time_buckets, to_frame
+
+
+def make_rows(n):
+    start = datetime.datetime(2024, 1, 1)
+    return [
+        {
+            "TransactionID": i,
+            "Amount": decimal.Decimal(f"{i % 100}.50"),
+            "Status": "failed" if i % 10 == 0 else "ok",
+            "TransactionDate": (start + datetime.timedelta(days=i % 90)).isoformat(),
+            "Note": None if i % 2 else "manual",
+        }
+        for i in range(n)
+    ]
+
+
+def test_profiles_are_typed_from_driver_values():
+    profiles = profile_columns(to_frame(make_rows(1000)))
+    assert profiles["Amount"]["type"] == "numeric"
+    assert profiles["Amount"]["max"] == 99.5
+    assert profiles["TransactionDate"]["type"] == "datetime"
+    assert profiles["Status"]["top"] == {"ok": 900, "failed": 100}
+    assert profiles["Note"]["null_rate"] == 0.5
+
+
+def test_time_buckets_pick_a_width_that_fits():
+    buckets = time_buckets(to_frame(make_rows(1000)))
+    assert buckets["column"] == "TransactionDate"
+    assert buckets["bucket"] == "W"
+    assert sum(bucket["rows"] for bucket in buckets["buckets"]) == 1000
+
+
+def test_stratified_sample_keeps_rare_values():
+    df = to_frame(make_rows(1000))
+    sample = stratified_sample(df, 10)
+    assert set(sample["Status"]) == {"ok", "failed"}
+    assert len(sample) == 10
+
+
+def test_summary_respects_byte_budget_regardless_of_size():
+    small = summarize_results(make_rows(100), max_bytes=4000)
+    large = summarize_results(make_rows(50_000), max_bytes=4000)
+    assert len(large.encode()) <= 4000
+    assert json.loads(large)["row_count"] == 50_000
+    assert abs(len(large) - len(small)) < 1000
+
+    tight = json.loads(summarize_results(make_rows(1000), max_bytes=600))
+    assert tight["sample"] == []
+    assert "top" not in next(iter(tight["columns"].values()))
@@ -0,0 +1,36 @@
+from schema_index import SchemaIndex, tokenize
+
+SCHEMA = {
+    "Customers": [("CustomerID", "int"), ("Name", "nvarchar"), ("Country", "nvarchar")],
+    "Transactions": [("TransactionID", "int"), ("CustomerID", "int"), ("Amount", "decimal"), ("TransactionDate", "datetime")],
+    "Products": [("ProductID", "int"), ("ProductName", "nvarchar")],
+    "AuditLog": [("LogID", "int"), ("Message", "nvarchar")],
+}
+FOREIGN_KEYS = {"Transactions": {"Customers"}, "Customers": {"Transactions"}}
+
+
+def test_tokenize_splits_identifiers_and_stems():
+    assert tokenize("CustomerID") == ["customer", "id"]
+    assert tokenize("How many purchases per category?") == ["purchase", "category"]
+
+
+def test_search_ranks_table_name_matches_first():
+    index = SchemaIndex(SCHEMA, FOREIGN_KEYS)
+    assert index.search("list all products", k=1) == ["Products"]
+
+
+def test_synonyms_and_foreign_key_neighbours():
+    index = SchemaIndex(SCHEMA, FOREIGN_KEYS)
+    # "revenue" reaches Amount through synonyms; Customers comes in as a join partner
+    assert index.search("total revenue", k=2) == ["Transactions", "Customers"]
+
+
+def test_unmatched_question_falls_back_to_connected_tables():
+    index = SchemaIndex(SCHEMA, FOREIGN_KEYS)
+    assert index.search("zzz", k=2) == ["Customers", "Transactions"]
+
+
+def test_compact_serialization():
+    index = SchemaIndex(SCHEMA, FOREIGN_KEYS)
+    assert index.compact(["Customers"]) == "Customers(CustomerID int, Name nvarchar, Country nvarchar) joins Transactions"
+    assert SchemaIndex({"T": ["a", "b"]}).context("a") == "T(a, b)"
@@ -0,0 +1,103 @@
+from schema_snapshot import FOREIGN_KEYS_QUERY, SCHEMA_QUERY, VERSION_QUERY, SchemaSnapshot
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.result = None
+
+    def execute(self, sql, *params):
+        self.db.queries.append(sql)
+        if sql == VERSION_QUERY:
+            self.result = [self.db.version]
+        elif sql == SCHEMA_QUERY:
+            self.result = self.db.rows
+        elif sql == FOREIGN_KEYS_QUERY:
+            self.result = self.db.foreign_keys
+        else:
+            raise AssertionError(f"Unexpected query: {sql}")
+
+    def fetchone(self):
+        return self.result[0]
+
+    def fetchall(self):
+        return self.result
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, db):
+        self.db = db
+
+    def cursor(self):
+        return FakeCursor(self.db)
+
+    def close(self):
+        pass
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.version = (2, "2024-01-01", 1)
+        self.rows = [
+            ("Customers", "CustomerID", "int"),
+            ("Customers", "Name", "nvarchar"),
+            ("Empty", None, None),
+            ("Transactions", "TransactionID", "int"),
+        ]
+        self.foreign_keys = [("Transactions", "Customers")]
+        self.queries = []
+        self.connections = 0
+
+    def connect(self):
+        self.connections += 1
+        return FakeConnection(self)
+
+
+def test_loads_all_tables_with_one_schema_query():
+    db = FakeDatabase()
+    snapshot = SchemaSnapshot(db.connect)
+    assert snapshot.tables() == ["Customers", "Empty", "Transactions"]
+    assert snapshot.columns("Customers") == [("CustomerID", "int"), ("Name", "nvarchar")]
+    assert snapshot.table_info()["Empty"] == []
+    assert db.connections == 1
+    assert db.queries.count(SCHEMA_QUERY) == 1
+
+
+def test_foreign_keys_are_symmetric_and_indexed():
+    db = FakeDatabase()
+    snapshot = SchemaSnapshot(db.connect, check_interval=60)
+    assert snapshot.foreign_keys() == {"Transactions": {"Customers"}, "Customers": {"Transactions"}}
+    assert snapshot.index() is snapshot.index()
+    assert snapshot.index().search("customer names", k=1) == ["Customers"]
+
+
+def test_reuses_snapshot_within_check_interval():
+    db = FakeDatabase()
+    snapshot = SchemaSnapshot(db.connect, check_interval=60)
+    first = snapshot.table_info()
+    assert snapshot.table_info() is first
+    assert db.connections == 1
+
+
+def test_reloads_only_when_version_changes():
+    db = FakeDatabase()
+    snapshot = SchemaSnapshot(db.connect, check_interval=0)
+    snapshot.tables()
+    snapshot.tables()
+    assert db.queries.count(SCHEMA_QUERY) == 1
+
+    db.version = (3, "2024-01-02", 7)
+    db.rows = db.rows + [("Refunds", "RefundID", "int")]
+    assert "Refunds" in snapshot.tables()
+    assert db.queries.count(SCHEMA_QUERY) == 2
+
+
+def test_keeps_last_snapshot_when_connection_fails():
+    db = FakeDatabase()
+    snapshot = SchemaSnapshot(db.connect, check_interval=0)
+    snapshot.tables()
+    snapshot.connect = lambda: None
+    assert snapshot.tables() == ["Customers", "Empty", "Transactions"]
@@ -0,0 +1,63 @@
+import base64
+import datetime
+import decimal
+import json
+
+import pytest
+from mssql_mcp_server.serializers import get_serializer, resolve_format
+
+DESCRIPTION = [
+    ("id", int, None, 10, 10, 0, False),
+    ("note", str, None, 50, 50, 0, True),
+    ("amount", decimal.Decimal, None, 18, 18, 2, True),
+    ("created", datetime.datetime, None, 23, 23, 3, True),
+]
+
+ROWS = [
+    (1, 'comma, "quote"', decimal.Decimal("10.50"), datetime.datetime(2024, 1, 2, 3, 4, 5)),
+    (2, "multi\nline", None, None),
+]
+
+
+def test_csv_quotes_special_characters():
+    text = get_serializer("csv", DESCRIPTION).dumps(ROWS)
+    assert text.split("\r\n")[0] == "id,note,amount,created"
+    assert '"comma, ""quote"""' in text
+    assert '"multi\nline"' in text
+    assert text.endswith("2,\"multi\nline\",,\r\n")
+
+
+def test_json_keeps_decimal_precision():
+    description = [("amount", decimal.Decimal, None, 38, 38, 4, False)]
+    rows = [(decimal.Decimal("12345678901234567890.1234"),)]
+    payload = json.loads(get_serializer("json", description).dumps(rows))
+    assert payload["data"] == [["12345678901234567890.1234"]]
+
+
+def test_json_is_columnar():
+    payload = json.loads(get_serializer("json", DESCRIPTION).dumps(ROWS))
+    assert payload["columns"] == ["id", "note", "amount", "created"]
+    assert payload["row_count"] == 2
+    assert payload["data"][0] == [1, 2]
+    assert payload["data"][2] == ["10.50", None]
+    assert payload["data"][3] == ["2024-01-02T03:04:05", None]
+
+
+def test_empty_page_keeps_header():
+    assert get_serializer("csv", DESCRIPTION).dumps([]) == "id,note,amount,created\r\n"
+    assert json.loads(get_serializer("json", DESCRIPTION).dumps([]))["data"] == [[], [], [], []]
+
+
+def test_arrow_round_trip():
+    pa = pytest.importorskip("pyarrow")
+    encoded = get_serializer("arrow", DESCRIPTION).dumps(ROWS)
+    table = pa.ipc.open_stream(base64.b64decode(encoded)).read_all()
+    assert table.column_names == ["id", "note", "amount", "created"]
+    assert table.column("id").to_pylist() == [1, 2]
+
+
+def test_unknown_format_rejected():
+    assert resolve_format(None) == "csv"
+    assert resolve_format("JSON") == "json"
+    with pytest.raises(ValueError, match="Unknown output format"):
+        resolve_format("xml")
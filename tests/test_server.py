@@ -1,4 +1,12 @@
+import asyncio
+import time
+import types
+
 import pytest
+from mssql_mcp_server import server
+from mssql_mcp_server.cursors import OpenCursor
+from mssql_mcp_server.executor import QueryExecutor, Statement
+from mssql_mcp_server.serializers import get_serializer
 from mssql_mcp_server.server import app, list_tools, list_resources, read_resource, call_tool
 from pydantic import AnyUrl
 
@@ -10,9 +18,11 @@ def test_server_initialization():
 async def test_list_tools():
     """Test that list_tools returns expected tools."""
     tools = await list_tools()
-    assert len(tools) == 1
-    assert tools[0].name == "execute_sql"
+    assert [tool.name for tool in tools] == [
+        "execute_sql", "fetch_next_page", "describe_table", "execute_sql_batch"
+    ]
     assert "query" in tools[0].inputSchema["properties"]
+    assert "continuation_token" in tools[1].inputSchema["required"]
 
 @pytest.mark.asyncio
 async def test_call_tool_invalid_name():
@@ -26,6 +36,31 @@ async def test_call_tool_missing_query():
     with pytest.raises(ValueError, match="Query is required"):
         await call_tool("execute_sql", {})
 
+@pytest.mark.asyncio
+async def test_call_tool_batch_requires_statements():
+    """Test calling execute_sql_batch without statements."""
+    with pytest.raises(ValueError, match="statements or statement with params is required"):
+        await call_tool("execute_sql_batch", {})
+
+@pytest.mark.asyncio
+async def test_call_tool_batch_rejects_mixed_modes():
+    """Test calling execute_sql_batch with both batch modes."""
+    with pytest.raises(ValueError, match="not both"):
+        await call_tool("execute_sql_batch", {"statements": ["SELECT 1"], "statement": "SELECT ?", "params": [[1]]})
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("arguments, message", [
+    ({"statements": "DELETE FROM t"}, "statements must be an array"),
+    ({"statements": ["UPDATE t SET a = 1", 5]}, "statements must be an array"),
+    ({"statements": ["UPDATE t SET a = 1", " "]}, "statements must be an array"),
+    ({"statement": "INSERT INTO t VALUES (?)", "params": [[1], [{"a": 1}]]}, "scalar values"),
+    ({"statement": "INSERT INTO t VALUES (?)", "params": "[[1]]"}, "parameter rows"),
+])
+async def test_call_tool_batch_validates_argument_types(arguments, message):
+    """Test execute_sql_batch rejects arguments of the wrong type before running anything."""
+    with pytest.raises(ValueError, match=message):
+        await call_tool("execute_sql_batch", arguments)
+
 # Skip database-dependent tests if no database connection
 @pytest.mark.asyncio
 @pytest.mark.skipif(
@@ -44,3 +79,58 @@ async def test_list_resources():
         if "Missing required database configuration" in str(e):
             pytest.skip("Database configuration not available")
         raise
+
+class SlowFetchCursor:
+    """A cursor whose fetch ignores cancel and keeps the connection busy."""
+
+    description = [("id", int, None, 10, 10, 0, False)]
+
+    def __init__(self, events):
+        self.events = events
+
+    def fetchmany(self, size):
+        self.events.append("fetch started")
+        time.sleep(0.4)
+        self.events.append("fetch ended")
+        return [(1,), (2,)]
+
+    def cancel(self):
+        self.events.append("cancel")
+
+    def close(self):
+        pass
+
+
+class SlowFetchPool:
+    def __init__(self):
+        self.events = []
+
+    def acquire(self, timeout=None):
+        conn = types.SimpleNamespace(timeout=0, cursor=lambda: SlowFetchCursor(self.events))
+        return conn
+
+    def release(self, conn, discard=False):
+        self.events.append("release")
+
+    def statement_cache(self, conn):
+        return None
+
+
+@pytest.mark.asyncio
+async def test_timed_out_fetch_releases_connection_only_after_fetch_ends(monkeypatch):
+    pool = SlowFetchPool()
+    monkeypatch.setattr(server, "_executor", QueryExecutor(pool, max_concurrency=1, query_timeout=0.1))
+    statement = Statement(pool).open()
+    statement.detach()
+    open_cursor = OpenCursor(statement, get_serializer("csv", SlowFetchCursor.description), None)
+    token, _ = server.get_cursor_registry().put(open_cursor)
+
+    result = await call_tool("fetch_next_page", {"continuation_token": token})
+    assert "timed out" in result[0].text
+    assert pool.events == ["fetch started", "cancel"]
+
+    for _ in range(100):
+        if "release" in pool.events:
+            break
+        await asyncio.sleep(0.01)
+    assert pool.events == ["fetch started", "cancel", "fetch ended", "release"]
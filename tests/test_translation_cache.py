@@ -0,0 +1,65 @@
+import threading
+
+from claude_integration import ClaudeSQLAssistant
+from translation_cache import TranslationCache, normalize_question, schema_fingerprint
+
+
+def test_normalize_question():
+    assert normalize_question("  How many   Transactions?  ") == "how many transactions"
+
+
+def test_schema_fingerprint_ignores_key_order():
+    assert schema_fingerprint({"a": ["x"], "b": ["y"]}) == schema_fingerprint({"b": ["y"], "a": ["x"]})
+    assert schema_fingerprint({"a": ["x"]}) != schema_fingerprint({"a": ["x", "z"]})
+
+
+def test_hit_survives_reopen(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = TranslationCache(path)
+    cache.put("Total sales?", "v1", "SELECT SUM(Amount) FROM Sales;")
+    cache.close()
+
+    reopened = TranslationCache(path)
+    assert reopened.get("total sales", "v1") == "SELECT SUM(Amount) FROM Sales;"
+    assert reopened.get("total sales", "v2") is None
+    assert (reopened.hits, reopened.misses) == (1, 1)
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = TranslationCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+    cache.put("a", "v1", "SELECT 1;")
+    cache.put("b", "v1", "SELECT 2;")
+    cache.get("a", "v1")
+    cache.put("c", "v1", "SELECT 3;")
+    assert len(cache) == 2
+    assert cache.get("b", "v1") is None
+    assert cache.get("a", "v1") == "SELECT 1;"
+
+
+def test_schema_change_drops_old_translations(tmp_path):
+    cache = TranslationCache(str(tmp_path / "cache.sqlite3"))
+    cache.use_schema("v1")
+    cache.put("a", "v1", "SELECT 1;")
+    cache.use_schema("v2")
+    assert len(cache) == 0
+
+
+class RecordingCache(TranslationCache):
+    """Records the thread each lookup and write runs on."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.threads = []
+
+    def get(self, question, fingerprint):
+        self.threads.append(threading.current_thread())
+        return super().get(question, fingerprint)
+
+
+async def test_async_cache_lookup_runs_off_the_event_loop(tmp_path):
+    cache = RecordingCache(str(tmp_path / "cache.sqlite3"))
+    assistant = ClaudeSQLAssistant(api_key="test", translation_cache=cache)
+    assistant.update_table_info({"Sales": ["Amount"]})
+    cache.put("total sales", assistant._schema_fingerprint, "SELECT SUM(Amount) FROM Sales;")
+    assert await assistant.agenerate_sql_query("Total sales?") == "SELECT SUM(Amount) FROM Sales;"
+    assert cache.threads and threading.current_thread() not in cache.threads